@@ -0,0 +1,151 @@
+"""
+Benchmark: memory and throughput of CalendarEvent on 100k events.
+
+Compares the previous CalendarEvent (a plain object that copied every field
+and re-parsed start/end on each access) with the slotted, parse-once
+version, both keeping the raw payload and dropping it behind a raw_loader.
+Memory is what stays allocated per event once the list of payloads the
+events were built from is gone: the event object plus whatever part of its
+payload it keeps alive, which is what raw_loader saves.
+
+Usage:
+    python benchmarks/bench_calendar_event.py [count]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from calendar_api.events import CalendarEvent
+
+
+class LegacyCalendarEvent:
+    """CalendarEvent as it was before the slotted rewrite"""
+
+    def __init__(self, event_data):
+        self.raw_data = event_data
+        self.id = event_data.get('id')
+        self.summary = event_data.get('summary', 'Untitled Event')
+        self.description = event_data.get('description', '')
+        self.location = event_data.get('location', '')
+        self.start = event_data.get('start', {})
+        self.end = event_data.get('end', {})
+        self.attendees = event_data.get('attendees', [])
+        self.created = event_data.get('created')
+        self.updated = event_data.get('updated')
+        self.status = event_data.get('status', 'confirmed')
+        self.html_link = event_data.get('htmlLink')
+
+    @staticmethod
+    def _parse(value):
+        time_str = value.get('dateTime') or value.get('date')
+        if not time_str:
+            return None
+        try:
+            if 'T' in time_str:
+                return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+            return datetime.fromisoformat(time_str)
+        except ValueError:
+            return None
+
+    @property
+    def start_time(self):
+        return self._parse(self.start)
+
+    @property
+    def end_time(self):
+        return self._parse(self.end)
+
+    @property
+    def is_today(self):
+        start = self.start_time
+        return bool(start) and start.date() == datetime.now().date()
+
+    def formatted_time_range(self):
+        start, end = self.start_time, self.end_time
+        if not start:
+            return "No time specified"
+        if 'date' in self.start:
+            return "All day"
+        if end and start.date() == end.date():
+            return f"{start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}"
+        return start.strftime("%I:%M %p")
+
+
+def make_payload(i):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=30 * i)
+    return {
+        'id': f'event{i}',
+        'status': 'confirmed',
+        'summary': f'Meeting {i}',
+        'location': 'Room 4',
+        'updated': '2024-01-01T00:00:00.000Z',
+        'start': {'dateTime': start.isoformat().replace('+00:00', 'Z')},
+        'end': {'dateTime': (start + timedelta(minutes=25)).isoformat().replace('+00:00', 'Z')},
+    }
+
+
+def make_payloads(count):
+    return [make_payload(i) for i in range(count)]
+
+
+def load_raw(event_id):
+    # Stands in for a store lookup: rebuilds the payload instead of keeping it
+    return make_payload(int(event_id[len('event'):]))
+
+
+def measure(label, factory, count, is_upcoming, rounds=3):
+    payloads = make_payloads(count)
+    started = time.perf_counter()
+    events = [factory(payload) for payload in payloads]
+    build_s = time.perf_counter() - started
+    del events, payloads
+
+    # Memory is measured in a separate pass; tracing slows allocation down.
+    # Dropping the payload list leaves only what the events keep alive.
+    gc.collect()
+    tracemalloc.start()
+    payloads = make_payloads(count)
+    events = [factory(payload) for payload in payloads]
+    del payloads
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Time checks done on every refresh
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            is_upcoming(event)
+            event.is_today
+    check_s = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            event.formatted_time_range()
+    format_s = (time.perf_counter() - started) / rounds
+
+    print(f"{label:<22} {memory / count:>6.0f} B/event {build_s * 1000:>6.0f} ms build "
+          f"{check_s * 1000:>6.0f} ms checks {format_s * 1000:>6.0f} ms format")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} events")
+    # The old is_upcoming compared against a naive now(), which fails for
+    # timed events; compare the way it was meant to
+    now = datetime.now(timezone.utc)
+    measure("legacy", LegacyCalendarEvent, count, lambda event: event.start_time > now)
+    measure("slotted, raw kept", CalendarEvent, count, lambda event: event.is_upcoming)
+    measure("slotted, raw_loader", lambda p: CalendarEvent(p, raw_loader=load_raw), count,
+            lambda event: event.is_upcoming)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: cost of obtaining a Calendar service object per sync tick.
+
+Compares the old behaviour (a fresh googleapiclient.discovery.build for every
+GoogleCalendarClient) with the shared CalendarServiceProvider. No network
+access is needed: both paths use the discovery document bundled with
+google-api-python-client and anonymous credentials.
+
+Usage:
+    python benchmarks/bench_service_build.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build
+
+from calendar_api.service import CalendarServiceProvider
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    credentials = AnonymousCredentials()
+
+    def build_each_time():
+        build('calendar', 'v3', credentials=credentials, static_discovery=True, cache_discovery=False)
+
+    provider = CalendarServiceProvider()
+
+    def shared_provider():
+        provider.get_service(credentials)
+
+    # The first provider call pays for the single build
+    first_ms = time_per_call(shared_provider, 1)
+    before_ms = time_per_call(build_each_time, iterations)
+    after_ms = time_per_call(shared_provider, iterations)
+
+    print(f"iterations:                 {iterations}")
+    print(f"build() per client:         {before_ms:8.3f} ms")
+    print(f"provider, first call:       {first_ms:8.3f} ms")
+    print(f"provider, subsequent calls: {after_ms:8.3f} ms")
+    if after_ms > 0:
+        print(f"speedup:                    {before_ms / after_ms:8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
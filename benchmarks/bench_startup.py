@@ -0,0 +1,107 @@
+"""
+Benchmark: cold start to the first overlay frame, against Config.STARTUP_TARGET_MS.
+
+Measures what the app does before it can draw the overlay from cache: open
+events.db, load today's events on the overlay feed thread, index them and
+find the current and next event. The store is pre-filled with a few months
+of events. Window creation (Qt/Tk) needs a display and is not included; at
+runtime main.py reports 'tray_ready' after the tray's first paint and the
+overlay reports 'overlay_rendered' against the same target.
+
+Exits with status 1 if the median run is over the target.
+
+Usage:
+    python benchmarks/bench_startup.py [events] [runs]
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from calendar_api.events import EventIndex
+from calendar_api.snapshot import EventFeed
+from calendar_api.store import EventStore
+from config.settings import Config
+from utils.timeparse import clear_caches
+
+
+def make_events(count):
+    # Spread over about three months around today, 30-60 minutes each
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=45)
+    events = []
+    for i in range(count):
+        start = base + timedelta(minutes=97 * i % (90 * 24 * 60))
+        end = start + timedelta(minutes=30 + 30 * (i % 2))
+        events.append({
+            'id': f'event{i}',
+            'status': 'confirmed',
+            'summary': f'Event {i}',
+            'etag': f'"{i}"',
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': end.isoformat()},
+        })
+    return events
+
+
+def first_frame_ms(app_data_dir):
+    """Milliseconds from opening the store to knowing what the overlay shows"""
+    clear_caches()
+    started = time.perf_counter()
+    store = EventStore(app_data_dir)
+
+    def load_today():
+        local_now = datetime.now().astimezone()
+        start_of_day = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return store.get_events_between(start_of_day, start_of_day + timedelta(days=1))
+
+    loaded = threading.Event()
+    feed = EventFeed(load_today, name='BenchFeed')
+    feed.subscribe(lambda snapshot: loaded.set())
+    feed.start()
+    loaded.wait(10)
+    index = EventIndex.from_events(feed.snapshot.events)
+    now = time.time()
+    index.at(now)
+    index.next_after(now)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    feed.stop()
+    store.close()
+    return elapsed_ms
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    app_data_dir = tempfile.mkdtemp()
+    try:
+        store = EventStore(app_data_dir)
+        store.replace_calendar('primary', make_events(count), sync_token='bench')
+        store.close()
+
+        timings = [first_frame_ms(app_data_dir) for _ in range(runs)]
+    finally:
+        shutil.rmtree(app_data_dir, ignore_errors=True)
+
+    median_ms = statistics.median(timings)
+    target_ms = Config.STARTUP_TARGET_MS
+    print(f"stored events:        {count}")
+    print(f"runs:                 {runs}")
+    print(f"first frame, median:  {median_ms:8.1f} ms")
+    print(f"first frame, worst:   {max(timings):8.1f} ms")
+    print(f"target:               {target_ms:8.1f} ms")
+    if median_ms > target_ms:
+        print("FAIL: over the startup target")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
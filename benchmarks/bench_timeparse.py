@@ -0,0 +1,79 @@
+"""
+Benchmark: parsing event times the old ways vs utils.timeparse.
+
+Simulates repeated refreshes over the same events, which is what the app
+does: each sync/overlay/notification tick re-parses the start and end of
+every event it looks at. Compares dateutil's isoparse (overlay, Calendar
+View), fromisoformat with 'Z' replacement (store, events, notifications)
+and the memoized parse_event_time.
+
+Usage:
+    python benchmarks/bench_timeparse.py [events] [ticks]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.timeparse import clear_caches, parse_event_time
+
+
+def make_values(count):
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    values = []
+    for i in range(count):
+        start = base + timedelta(minutes=30 * i)
+        if i % 10 == 0:
+            values.append({'date': start.date().isoformat()})
+        elif i % 3 == 0:
+            values.append({'dateTime': start.astimezone(timezone(timedelta(hours=-5))).isoformat()})
+        else:
+            values.append({'dateTime': start.isoformat().replace('+00:00', 'Z')})
+    return values
+
+
+def old_fromisoformat(value):
+    time_str = value.get('dateTime') or value.get('date')
+    if 'T' in time_str:
+        return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+    return datetime.fromisoformat(time_str).astimezone()
+
+
+def old_isoparse(value):
+    from dateutil import parser, tz
+    if 'dateTime' in value:
+        return parser.isoparse(value['dateTime'])
+    return parser.isoparse(value['date']).replace(tzinfo=tz.tzutc()).astimezone(tz.tzlocal())
+
+
+def run(label, parse, values, ticks):
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for value in values:
+            parse(value)
+    elapsed = time.perf_counter() - started
+    per_parse = elapsed / (ticks * len(values)) * 1e9
+    print(f"{label:<32} {elapsed * 1000:>8.1f} ms total {per_parse:>8.0f} ns/parse")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    values = make_values(count)
+    print(f"{count} times x {ticks} ticks")
+    try:
+        run("dateutil isoparse", old_isoparse, values, ticks)
+    except ImportError:
+        print("dateutil isoparse                (python-dateutil not installed)")
+    run("fromisoformat + replace", old_fromisoformat, values, ticks)
+    clear_caches()
+    run("timeparse (first tick only)", parse_event_time, values, 1)
+    clear_caches()
+    run("timeparse (memoized ticks)", parse_event_time, values, ticks)
+
+
+if __name__ == '__main__':
+    main()
@@ -116,6 +116,9 @@ setup(
             'pywin32>=227',
             'winshell>=0.6',
         ],
+        'analytics': [
+            'numpy>=1.20',
+        ],
     },
     
     # Data files (for system-wide installation)
@@ -29,7 +29,7 @@ class CredentialsManager:
         else:  # macOS/Linux
             base_dir = Path.home() / '.local' / 'share'
         
-    return base_dir / 'CalendarNow'
+        return base_dir / 'CalendarNow'
     
     def _init_encryption_key(self):
         """Initialize or load encryption key"""
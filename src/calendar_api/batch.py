@@ -0,0 +1,122 @@
+"""
+Batched HTTP requests for the Calendar API.
+
+The API accepts up to 50 calls in a single multipart batch request. These
+helpers split any number of unexecuted requests into batches, run each batch
+in one round trip and report a result or an error for every item, so a
+single failing call does not abort the others. SyncEngine.sync_calendars
+uses them to pull the incremental changes of several calendars at once, and
+GoogleCalendarClient.batch_modify_events to apply several edits at once.
+"""
+
+from typing import Callable, Dict, Hashable, List, Optional
+
+# Calendar API limit on calls per batch request
+MAX_BATCH_SIZE = 50
+
+
+class BatchResult:
+    """Result of one call inside a batch: either a response or an error"""
+
+    def __init__(self, key: Hashable, response: Optional[Dict] = None, error: Optional[Exception] = None):
+        self.key = key
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = 'ok' if self.ok else f'error={self.error!r}'
+        return f"BatchResult({self.key!r}, {state})"
+
+
+def execute_batch(new_batch_request: Callable, requests: Dict[Hashable, object],
+                  max_batch_size: int = MAX_BATCH_SIZE) -> Dict[Hashable, BatchResult]:
+    """Execute {key: request} using as few batch round trips as possible.
+
+    new_batch_request is service.new_batch_http_request. Returns a
+    BatchResult for every key.
+    """
+    results: Dict[Hashable, BatchResult] = {}
+    items = list(requests.items())
+    for offset in range(0, len(items), max_batch_size):
+        chunk = items[offset:offset + max_batch_size]
+        # Batch request ids must be strings; map them back to the caller's keys
+        keys = {str(index): key for index, (key, _) in enumerate(chunk)}
+
+        def callback(request_id, response, exception, keys=keys):
+            key = keys[request_id]
+            results[key] = BatchResult(key, response=response, error=exception)
+
+        batch = new_batch_request(callback=callback)
+        for index, (_, request) in enumerate(chunk):
+            batch.add(request, request_id=str(index))
+        batch.execute()
+    return results
+
+
+def batch_list_pages(new_batch_request: Callable, list_method: Callable,
+                     params_by_key: Dict[Hashable, Dict],
+                     max_batch_size: int = MAX_BATCH_SIZE) -> Dict[Hashable, BatchResult]:
+    """Run several list queries in batches and follow each one's pages.
+
+    The first page of every query goes out in one round trip; queries with a
+    nextPageToken are re-batched until all are complete. Each successful
+    result's response is the list of that query's pages, in order.
+    """
+    pages: Dict[Hashable, List[Dict]] = {key: [] for key in params_by_key}
+    errors: Dict[Hashable, Exception] = {}
+    page_tokens: Dict[Hashable, Optional[str]] = {key: None for key in params_by_key}
+
+    while page_tokens:
+        requests = {}
+        for key, page_token in page_tokens.items():
+            params = dict(params_by_key[key])
+            if page_token:
+                params['pageToken'] = page_token
+            requests[key] = list_method(**params)
+
+        page_tokens = {}
+        for key, result in execute_batch(new_batch_request, requests, max_batch_size).items():
+            if not result.ok:
+                errors[key] = result.error
+                continue
+            pages[key].append(result.response)
+            if result.response.get('nextPageToken'):
+                page_tokens[key] = result.response['nextPageToken']
+
+    return {
+        key: BatchResult(key, error=errors[key]) if key in errors else BatchResult(key, response=pages[key])
+        for key in params_by_key
+    }
+
+
+def batch_modify(new_batch_request: Callable, events_resource, operations: List[Dict],
+                 max_batch_size: int = MAX_BATCH_SIZE) -> List[BatchResult]:
+    """Apply create/update/delete operations in as few round trips as possible.
+
+    Each operation is a dict with 'action' ('create', 'update' or 'delete')
+    and, as needed, 'calendar_id' (default 'primary'), 'event_id' and 'body'.
+    events_resource is service.events(). Returns one BatchResult per
+    operation, in the same order.
+    """
+    requests = {}
+    for index, operation in enumerate(operations):
+        action = operation.get('action')
+        calendar_id = operation.get('calendar_id', 'primary')
+        if action == 'create':
+            request = events_resource.insert(calendarId=calendar_id, body=operation['body'])
+        elif action == 'update':
+            request = events_resource.update(calendarId=calendar_id, eventId=operation['event_id'],
+                                             body=operation['body'])
+        elif action == 'delete':
+            request = events_resource.delete(calendarId=calendar_id, eventId=operation['event_id'])
+        else:
+            raise ValueError(f"Unknown batch action: {action}")
+        requests[index] = request
+
+    results = execute_batch(new_batch_request, requests, max_batch_size)
+    return [results.get(index, BatchResult(index, error=RuntimeError("No response in batch")))
+            for index in range(len(operations))]
@@ -1,8 +1,12 @@
 import os
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from calendar_api.batch import batch_modify
+from calendar_api.fields import CALENDAR_LIST_FIELDS, EVENT_FIELDS, list_fields
+from calendar_api.paging import iter_items, iter_pages
+from calendar_api.service import CalendarServiceProvider
+from config.settings import Config
 
 class GoogleCalendarClient:
     """Google Calendar API client for calendar operations"""
@@ -12,19 +16,54 @@ class GoogleCalendarClient:
         self.service = self.create_service()
 
     def create_service(self):
-        """Create Google Calendar service"""
+        """Get the shared Google Calendar service"""
         try:
             # Refresh credentials if needed
             if self.credentials.expired and self.credentials.refresh_token:
                 self.credentials.refresh(Request())
             
-            service = build('calendar', 'v3', credentials=self.credentials)
-            return service
+            # Built once per process from the bundled discovery document
+            return CalendarServiceProvider.instance().get_service(self.credentials)
         except Exception as e:
             print(f"Failed to create calendar service: {e}")
             raise
 
-    def list_events(self, calendar_id='primary', max_results=10, days_ahead=7):
+    def update_credentials(self, credentials):
+        """Use refreshed credentials without rebuilding the service"""
+        self.credentials = credentials
+        CalendarServiceProvider.instance().update_credentials(credentials)
+
+    def iter_event_pages(self, calendar_id='primary', page_size=Config.MAX_EVENTS_PER_REQUEST,
+                         event_fields=None, **params):
+        """Yield raw events().list responses one page at a time.
+        event_fields limits each event to the given mask (see calendar_api.fields)."""
+        if event_fields:
+            params['fields'] = list_fields(event_fields)
+        return iter_pages(self.service.events().list, page_size=page_size, calendarId=calendar_id, **params)
+
+    def iter_events(self, calendar_id='primary', page_size=Config.MAX_EVENTS_PER_REQUEST, limit=None,
+                    event_fields=None, **params):
+        """Stream events across all result pages.
+        Pages are fetched lazily; iteration stops after limit events if given."""
+        if limit is not None:
+            # Don't download a full page when only a few events are wanted
+            page_size = max(1, min(page_size, limit))
+        pages = self.iter_event_pages(calendar_id, page_size=page_size, event_fields=event_fields, **params)
+        return iter_items(pages, limit)
+
+    def get_event(self, event_id, calendar_id='primary', fields=None):
+        """Fetch a single event; the full resource unless a fields mask is given"""
+        try:
+            params = {'calendarId': calendar_id, 'eventId': event_id}
+            if fields:
+                params['fields'] = fields
+            return self.service.events().get(**params).execute()
+        except Exception as e:
+            print(f"Failed to get event: {e}")
+            return None
+
+    def list_events(self, calendar_id='primary', max_results=10, days_ahead=7,
+                    event_fields=EVENT_FIELDS['main_window']):
         """List upcoming events"""
         try:
             # Calculate time range
@@ -32,41 +71,39 @@ class GoogleCalendarClient:
             time_min = now.isoformat() + 'Z'
             time_max = (now + timedelta(days=days_ahead)).isoformat() + 'Z'
             
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
+            return list(self.iter_events(
+                calendar_id=calendar_id,
+                limit=max_results,
+                event_fields=event_fields,
                 timeMin=time_min,
                 timeMax=time_max,
-                maxResults=max_results,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
-            return events_result.get('items', [])
+            ))
         except Exception as e:
             print(f"Failed to list events: {e}")
             return []
 
-    def get_upcoming_events(self, calendar_id='primary', hours=1):
+    def get_upcoming_events(self, calendar_id='primary', hours=1, event_fields=EVENT_FIELDS['notifications']):
         """Get events coming up within specified hours"""
         try:
             now = datetime.utcnow()
             time_min = now.isoformat() + 'Z'
             time_max = (now + timedelta(hours=hours)).isoformat() + 'Z'
             
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
+            return list(self.iter_events(
+                calendar_id=calendar_id,
+                event_fields=event_fields,
                 timeMin=time_min,
                 timeMax=time_max,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
-            return events_result.get('items', [])
+            ))
         except Exception as e:
             print(f"Failed to get upcoming events: {e}")
             return []
 
-    def get_today_events(self, calendar_id='primary'):
+    def get_today_events(self, calendar_id='primary', event_fields=EVENT_FIELDS['overlay']):
         """Get today's events"""
         try:
             now = datetime.utcnow()
@@ -76,15 +113,14 @@ class GoogleCalendarClient:
             time_min = start_of_day.isoformat() + 'Z'
             time_max = end_of_day.isoformat() + 'Z'
             
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
+            return list(self.iter_events(
+                calendar_id=calendar_id,
+                event_fields=event_fields,
                 timeMin=time_min,
                 timeMax=time_max,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
-            return events_result.get('items', [])
+            ))
         except Exception as e:
             print(f"Failed to get today's events: {e}")
             return []
@@ -135,11 +171,16 @@ class GoogleCalendarClient:
             print(f"Failed to delete event: {e}")
             return False
 
+    def batch_modify_events(self, operations):
+        """Apply several create/update/delete operations in batched round trips.
+        See calendar_api.batch.batch_modify for the operation format.
+        Returns one BatchResult per operation, in the same order."""
+        return batch_modify(self.service.new_batch_http_request, self.service.events(), operations)
+
     def get_calendars(self):
         """Get list of user's calendars"""
         try:
-            calendars_result = self.service.calendarList().list().execute()
-            return calendars_result.get('items', [])
+            return list(iter_items(iter_pages(self.service.calendarList().list, fields=CALENDAR_LIST_FIELDS)))
         except Exception as e:
             print(f"Failed to get calendars: {e}")
             return []
@@ -158,18 +199,17 @@ class GoogleCalendarClient:
             print(f"Failed to get user info: {e}")
             return None
 
-    def search_events(self, query, calendar_id='primary', max_results=25):
+    def search_events(self, query, calendar_id='primary', max_results=25, event_fields=EVENT_FIELDS['main_window']):
         """Search for events by text query"""
         try:
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
+            return list(self.iter_events(
+                calendar_id=calendar_id,
+                limit=max_results,
+                event_fields=event_fields,
                 q=query,
-                maxResults=max_results,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
-            return events_result.get('items', [])
+            ))
         except Exception as e:
             print(f"Failed to search events: {e}")
             return []
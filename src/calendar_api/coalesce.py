@@ -0,0 +1,83 @@
+"""
+Request coalescing for Calendar API calls.
+
+The startup sync, the tray timer, "Sync Now" and the Calendar View's refresh
+button can all ask for the same sync within the same second. Instead of each
+caller issuing its own HTTP request, concurrent callers share a single
+in-flight call and its result.
+"""
+
+import threading
+import time
+from typing import Callable, Hashable
+
+
+class _Flight:
+    """One in-flight (or just finished) call shared by several callers"""
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result.
+
+    With ttl > 0 a successful result is also handed to callers that arrive
+    within ttl seconds after it finished.
+    """
+
+    def __init__(self, ttl: float = 0.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key: Hashable, fn: Callable):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None or not self._shareable(flight):
+                flight = _Flight(key)
+                self._flights[key] = flight
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+        finally:
+            flight.finished_at = time.monotonic()
+            with self._lock:
+                if flight.error is not None or not self.ttl:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+            flight.done.set()
+        return flight.wait()
+
+    def _shareable(self, flight: _Flight) -> bool:
+        if not flight.done.is_set():
+            return True
+        return (flight.error is None and self.ttl > 0 and
+                time.monotonic() - flight.finished_at < self.ttl)
+
+    def forget(self, key: Hashable = None):
+        """Drop any remembered result so the next call runs fresh"""
+        with self._lock:
+            if key is None:
+                self._flights.clear()
+            else:
+                self._flights.pop(key, None)
+
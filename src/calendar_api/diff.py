@@ -0,0 +1,82 @@
+"""
+Change sets between two versions of the event list.
+
+Consumers used to re-process every event after each sync. diff_events
+compares the previous and current events by id and by etag/updated, so
+only events whose version changed are looked at closely. It classifies
+them as:
+
+  added    new ids
+  removed  ids that are gone
+  moved    start or end changed (rescheduled)
+  changed  anything else changed (title, location...)
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from calendar_api.store import event_bounds
+
+
+def event_version(event: Dict) -> Optional[str]:
+    """What the API changes whenever an event changes"""
+    return event.get('etag') or event.get('updated')
+
+
+class ChangeSet:
+    """Differences between two event lists"""
+
+    __slots__ = ('added', 'changed', 'moved', 'removed')
+
+    def __init__(self, added: Optional[List[Dict]] = None, changed: Optional[List[Tuple[Dict, Dict]]] = None,
+                 moved: Optional[List[Tuple[Dict, Dict]]] = None, removed: Optional[List[Dict]] = None):
+        self.added = added or []
+        # (old, new) pairs
+        self.changed = changed or []
+        self.moved = moved or []
+        self.removed = removed or []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.moved or self.removed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.moved) + len(self.removed)
+
+    @property
+    def upserts(self) -> List[Dict]:
+        """Events to insert or replace, in their new version"""
+        return self.added + [new for _, new in self.changed] + [new for _, new in self.moved]
+
+    @property
+    def removed_ids(self) -> List[str]:
+        return [event.get('id') for event in self.removed]
+
+    def __repr__(self) -> str:
+        return (f"ChangeSet(added={len(self.added)}, changed={len(self.changed)}, "
+                f"moved={len(self.moved)}, removed={len(self.removed)})")
+
+
+def _same(old: Dict, new: Dict) -> bool:
+    old_version, new_version = event_version(old), event_version(new)
+    if old_version is not None and new_version is not None:
+        return old_version == new_version
+    return old == new
+
+
+def diff_events(previous: Dict[str, Dict], current: Iterable[Dict]) -> ChangeSet:
+    """Compare the previous events ({id: event}) with the current ones"""
+    changes = ChangeSet()
+    seen = set()
+    for event in current:
+        event_id = event.get('id')
+        seen.add(event_id)
+        old = previous.get(event_id)
+        if old is None:
+            changes.added.append(event)
+        elif old is event or _same(old, event):
+            continue
+        elif event_bounds(old) != event_bounds(event):
+            changes.moved.append((old, event))
+        else:
+            changes.changed.append((old, event))
+    changes.removed = [event for event_id, event in previous.items() if event_id not in seen]
+    return changes
@@ -1,95 +1,214 @@
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from calendar_api.store import event_bounds
+from utils.timeparse import offset_zone, parse_date, parse_datetime
+
+# (start_ts, end_ts) of the current local day
+_today_bounds = (0, 0)
+
+# Marks a CalendarEvent whose start/end strings have not been parsed yet
+_UNPARSED = object()
+
+_fromisoformat = datetime.fromisoformat
+
+def _event_time_string(value: Optional[Dict]) -> Optional[str]:
+    """The dateTime (or, for all-day events, date) string of an API start/end object"""
+    if not value:
+        return None
+    return value.get('dateTime') or value.get('date')
+
+def _parse_event_time(value: Optional[str], all_day: bool):
+    """Parse a start/end string into (epoch seconds, tzinfo).
+    An all-day date is local midnight and has no tzinfo.
+
+    Each event parses its own strings once, so timed values skip the
+    utils.timeparse memo (bulk loads of unique strings would only churn it)
+    unless the fast C parser rejects them."""
+    if not value:
+        return None, None
+    if all_day:
+        dt = parse_date(value)
+        return (int(dt.timestamp()), None) if dt else (None, None)
+    try:
+        dt = _fromisoformat(value)
+    except ValueError:
+        dt = parse_datetime(value)
+        if dt is None:
+            return None, None
+    tz = dt.tzinfo
+    if tz is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+        tz = timezone.utc
+    elif tz is not timezone.utc:
+        # Share one tzinfo per offset instead of one per event
+        tz = offset_zone(dt.utcoffset())
+    return int(dt.timestamp()), tz
+
+def _is_today_ts(ts: int) -> bool:
+    """Check if an epoch time falls on the current local day"""
+    global _today_bounds
+    now = time.time()
+    start, end = _today_bounds
+    if not start <= now < end:
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        _today_bounds = start, end = (midnight.timestamp(), (midnight + timedelta(days=1)).timestamp())
+    return start <= ts < end
+
+def _clock(seconds: int) -> str:
+    """Format seconds since midnight like strftime("%I:%M %p")"""
+    hour, minute = divmod(seconds // 60, 60)
+    return f"{hour % 12 or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
 
 class CalendarEvent:
-    """Represents a calendar event with helper methods"""
+    """Represents a calendar event with helper methods.
+
+    Construction only copies the fields the app reads often into slots and
+    keeps the start/end strings; they are parsed on first use, once, into
+    epoch seconds (start_ts/end_ts) plus a shared tzinfo. start_time/end_time
+    rebuild the datetimes from those without parsing. Everything else is read
+    from the raw payload. Pass raw_loader (called with the event id, e.g. a
+    store lookup) to drop the payload and load it again only if a rarely used
+    field is accessed.
+    """
     
-    def __init__(self, event_data: Dict):
-        self.raw_data = event_data
+    __slots__ = ('id', 'summary', 'location', 'status', 'updated', 'all_day',
+                 '_start_ts', '_end_ts', '_tz', '_raw', '_raw_loader')
+    
+    def __init__(self, event_data: Dict, raw_loader: Optional[Callable[[str], Optional[Dict]]] = None):
         self.id = event_data.get('id')
         self.summary = event_data.get('summary', 'Untitled Event')
-        self.description = event_data.get('description', '')
         self.location = event_data.get('location', '')
-        self.start = event_data.get('start', {})
-        self.end = event_data.get('end', {})
-        self.attendees = event_data.get('attendees', [])
-        self.created = event_data.get('created')
-        self.updated = event_data.get('updated')
         self.status = event_data.get('status', 'confirmed')
-        self.html_link = event_data.get('htmlLink')
+        self.updated = event_data.get('updated')
+        
+        start = event_data.get('start') or {}
+        self.all_day = 'date' in start and 'dateTime' not in start
+        # The raw strings wait in the timestamp slots until _parse_times()
+        self._start_ts = _event_time_string(start)
+        self._end_ts = _event_time_string(event_data.get('end'))
+        self._tz = _UNPARSED
+        
+        self._raw_loader = raw_loader
+        self._raw = None if raw_loader else event_data
+    
+    def _parse_times(self):
+        self._start_ts, tz = _parse_event_time(self._start_ts, self.all_day)
+        self._end_ts, end_tz = _parse_event_time(self._end_ts, self.all_day)
+        self._tz = tz or end_tz
+    
+    @property
+    def start_ts(self) -> Optional[int]:
+        """Start in epoch seconds"""
+        if self._tz is _UNPARSED:
+            self._parse_times()
+        return self._start_ts
+    
+    @property
+    def end_ts(self) -> Optional[int]:
+        """End in epoch seconds"""
+        if self._tz is _UNPARSED:
+            self._parse_times()
+        return self._end_ts
+    
+    @property
+    def raw_data(self) -> Dict:
+        """The full API payload (loaded on first access when a raw_loader was given)"""
+        if self._raw is None:
+            self._raw = (self._raw_loader(self.id) if self._raw_loader else None) or {}
+        return self._raw
+    
+    @property
+    def description(self) -> str:
+        return self.raw_data.get('description', '')
+    
+    @property
+    def start(self) -> Dict:
+        return self.raw_data.get('start', {})
+    
+    @property
+    def end(self) -> Dict:
+        return self.raw_data.get('end', {})
+    
+    @property
+    def attendees(self) -> List[Dict]:
+        return self.raw_data.get('attendees', [])
+    
+    @property
+    def created(self) -> Optional[str]:
+        return self.raw_data.get('created')
+    
+    @property
+    def html_link(self) -> Optional[str]:
+        return self.raw_data.get('htmlLink')
+    
+    def _to_datetime(self, ts: Optional[int]) -> Optional[datetime]:
+        # Callers pass start_ts/end_ts, so the times are parsed by now
+        if ts is None:
+            return None
+        # Timed events keep their own offset; all-day events are naive local dates
+        return datetime.fromtimestamp(ts, self._tz) if self._tz else datetime.fromtimestamp(ts)
     
     @property
     def start_time(self) -> Optional[datetime]:
         """Get event start time as datetime object"""
-        start_str = self.start.get('dateTime') or self.start.get('date')
-        if not start_str:
-            return None
-        
-        try:
-            if 'T' in start_str:  # DateTime format
-                return datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-            else:  # Date format (all-day event)
-                return datetime.fromisoformat(start_str)
-        except:
-            return None
+        return self._to_datetime(self.start_ts)
     
     @property
     def end_time(self) -> Optional[datetime]:
         """Get event end time as datetime object"""
-        end_str = self.end.get('dateTime') or self.end.get('date')
-        if not end_str:
-            return None
-        
-        try:
-            if 'T' in end_str:  # DateTime format
-                return datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-            else:  # Date format (all-day event)
-                return datetime.fromisoformat(end_str)
-        except:
-            return None
+        return self._to_datetime(self.end_ts)
     
     @property
     def is_all_day(self) -> bool:
         """Check if this is an all-day event"""
-        return 'date' in self.start and 'dateTime' not in self.start
+        return self.all_day
     
     @property
     def is_upcoming(self) -> bool:
         """Check if event is upcoming"""
-        start = self.start_time
-        if start:
-            return start > datetime.now()
+        start_ts = self.start_ts
+        if start_ts is not None:
+            return start_ts > time.time()
         return False
     
     @property
     def is_today(self) -> bool:
         """Check if event is today"""
-        start = self.start_time
-        if start:
-            today = datetime.now().date()
-            return start.date() == today
+        start_ts = self.start_ts
+        if start_ts is not None:
+            return _is_today_ts(start_ts)
         return False
     
     def formatted_time_range(self) -> str:
         """Get formatted time range string"""
-        start = self.start_time
-        end = self.end_time
-        
-        if not start:
+        start_ts = self.start_ts
+        if start_ts is None:
             return "No time specified"
         
-        if self.is_all_day:
+        if self.all_day:
             return "All day"
         
-        start_str = start.strftime("%I:%M %p")
-        if end:
-            end_str = end.strftime("%I:%M %p")
-            if start.date() == end.date():
-                return f"{start_str} - {end_str}"
-            else:
-                return f"{start.strftime('%m/%d %I:%M %p')} - {end.strftime('%m/%d %I:%M %p')}"
+        end_ts = self._end_ts
+        if end_ts is None:
+            return self.start_time.strftime("%I:%M %p")
+        
+        # Same-day ranges (the common case) are formatted from the epoch times
+        # directly, in the event's own offset, without building datetimes
+        offset = int(self._tz.utcoffset(None).total_seconds()) if self._tz else 0
+        start_local = start_ts + offset
+        end_local = end_ts + offset
+        if self._tz and start_local // 86400 == end_local // 86400:
+            return f"{_clock(start_local % 86400)} - {_clock(end_local % 86400)}"
+        
+        start = self.start_time
+        end = self.end_time
+        if start.date() == end.date():
+            return f"{start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}"
         else:
-            return start_str
+            return f"{start.strftime('%m/%d %I:%M %p')} - {end.strftime('%m/%d %I:%M %p')}"
     
     def __str__(self) -> str:
         return f"{self.summary} ({self.formatted_time_range()})"
@@ -102,14 +221,173 @@ class EventManager:
     
     def get_events_as_objects(self, calendar_id='primary', **kwargs) -> List[CalendarEvent]:
         """Get events as CalendarEvent objects"""
+        # CalendarEvent exposes every field, so request full resources
+        kwargs.setdefault('event_fields', None)
         events_data = self.calendar_client.list_events(calendar_id=calendar_id, **kwargs)
         return [CalendarEvent(event) for event in events_data]
     
     def get_upcoming_events(self, hours=24, calendar_id='primary') -> List[CalendarEvent]:
         """Get upcoming events within specified hours"""
-        events_data = self.calendar_client.get_upcoming_events(hours=hours, calendar_id=calendar_id)
+        events_data = self.calendar_client.get_upcoming_events(hours=hours, calendar_id=calendar_id,
+                                                               event_fields=None)
         return [CalendarEvent(event) for event in events_data]
 
+class _Node:
+    """Treap node ordered by (start, key), augmented with the subtree's latest end"""
+    
+    __slots__ = ('start', 'end', 'key', 'value', 'priority', 'left', 'right', 'max_end')
+    
+    def __init__(self, start, end, key, value):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.value = value
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = end
+    
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+def _split(node, start, key):
+    """Split a treap into nodes ordered before (start, key) and the rest"""
+    if node is None:
+        return None, None
+    if (node.start, node.key) < (start, key):
+        node.right, right = _split(node.right, start, key)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, start, key)
+    node.update()
+    return left, node
+
+def _split_after(node, start, key):
+    """Split a treap into nodes ordered at or before (start, key) and the rest"""
+    if node is None:
+        return None, None
+    if (node.start, node.key) <= (start, key):
+        node.right, right = _split_after(node.right, start, key)
+        node.update()
+        return node, right
+    left, node.left = _split_after(node.left, start, key)
+    node.update()
+    return left, node
+
+def _merge(left, right):
+    """Join two treaps where every node of left orders before right"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+class IntervalIndex:
+    """Interval index over event times (an augmented treap).
+
+    Each entry is a [start, end) interval with a unique key. Adding, removing,
+    "what is in progress at t", "what starts next after t" and "what overlaps
+    [t0, t1)" are all O(log n) (plus the number of results), so the index can
+    be kept up to date as sync deltas arrive instead of rebuilt.
+    """
+    
+    def __init__(self):
+        self._root = None
+        self._entries: Dict[str, tuple] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+    
+    def add(self, key: str, start: float, end: float, value=None):
+        """Insert or replace the interval stored under key"""
+        if key in self._entries:
+            self.remove(key)
+        left, right = _split(self._root, start, key)
+        self._root = _merge(_merge(left, _Node(start, end, key, value)), right)
+        self._entries[key] = (start, end)
+    
+    def remove(self, key: str) -> bool:
+        """Remove the interval stored under key; returns False if there was none"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        start = entry[0]
+        left, rest = _split(self._root, start, key)
+        # rest begins with the node for key; cut it off
+        _, right = _split_after(rest, start, key)
+        self._root = _merge(left, right)
+        return True
+    
+    def overlapping(self, time_min: float, time_max: float) -> List:
+        """Values of intervals overlapping [time_min, time_max), ordered by start"""
+        results = []
+        self._collect(self._root, time_min, time_max, False, results)
+        return results
+    
+    def at(self, when: float) -> List:
+        """Values of intervals in progress at the given time, ordered by start"""
+        results = []
+        self._collect(self._root, when, when, True, results)
+        return results
+    
+    def _collect(self, node, time_min, time_max, inclusive, results):
+        # Skip subtrees that end before the window; stop at starts past it
+        if node is None or node.max_end <= time_min:
+            return
+        self._collect(node.left, time_min, time_max, inclusive, results)
+        starts_in = node.start <= time_max if inclusive else node.start < time_max
+        if not starts_in:
+            return
+        if node.end > time_min:
+            results.append(node.value)
+        self._collect(node.right, time_min, time_max, inclusive, results)
+    
+    def next_after(self, when: float):
+        """Value of the first interval starting after the given time, or None"""
+        node = self._root
+        best = None
+        while node is not None:
+            if node.start > when:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best.value if best is not None else None
+
+class EventIndex(IntervalIndex):
+    """IntervalIndex of API events keyed by event id, in epoch seconds"""
+    
+    @classmethod
+    def from_events(cls, events: List[Dict]) -> 'EventIndex':
+        index = cls()
+        index.apply_changes(events, ())
+        return index
+    
+    def apply_changes(self, updated: List[Dict], deleted: List[str] = ()):
+        """Apply a sync delta: upsert updated events and drop deleted ids"""
+        for event_id in deleted:
+            self.remove(event_id)
+        for event in updated:
+            start, end = event_bounds(event)
+            if event.get('status') == 'cancelled' or start is None:
+                self.remove(event.get('id'))
+                continue
+            self.add(event['id'], start.timestamp(), end.timestamp(), event)
+
 # Legacy class for backward compatibility
 class CalendarEvents:
     def __init__(self, service):
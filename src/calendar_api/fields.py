@@ -0,0 +1,33 @@
+"""
+Partial-response field masks for Calendar API list calls.
+
+Full event resources carry descriptions, attendee lists, conference data and
+links that most views never show. Each consumer asks only for the fields it
+renders via the API's fields= parameter; the complete resource can still be
+fetched on demand with GoogleCalendarClient.get_event.
+"""
+
+EVENT_FIELDS = {
+    # Task display overlay: title and time range
+    'overlay': 'id,status,summary,start,end',
+    # Notifications: which event, when, what to call it, and its own reminders
+    'notifications': 'id,status,summary,start,end,reminders',
+    # Calendar View list rows and tooltips
+    'main_window': 'id,status,summary,start,end,location',
+}
+
+# Everything the local event store serves to the consumers above, plus the
+# fields used to track changes between syncs
+EVENT_FIELDS['sync'] = ('id,status,summary,start,end,location,reminders,updated,etag,'
+                        'recurringEventId,originalStartTime')
+
+# Syncing series masters (singleEvents=False) also needs the recurrence rules
+EVENT_FIELDS['sync_series'] = EVENT_FIELDS['sync'] + ',recurrence'
+
+CALENDAR_LIST_FIELDS = 'nextPageToken,items(id,summary,primary,selected,timeZone,backgroundColor,defaultReminders)'
+
+
+def list_fields(event_fields: str) -> str:
+    """Wrap a per-event mask so list responses keep their paging and sync tokens
+    and the calendar's default reminders"""
+    return f'nextPageToken,nextSyncToken,defaultReminders,items({event_fields})'
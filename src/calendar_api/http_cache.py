@@ -0,0 +1,85 @@
+"""
+Size-bounded HTTP cache for conditional Calendar API requests.
+
+httplib2 accepts a cache object with get/set/delete. When a cached response
+carries an ETag, httplib2 revalidates it with If-None-Match and serves the
+cached body when the server answers 304 Not Modified. Calendar API responses
+are marked must-revalidate, so every repeat call still reaches Google, but
+unchanged metadata comes back as an empty 304 instead of the full resource.
+
+Only calendar metadata (calendar list, calendar resources, settings) is
+cached. Event list URLs carry ever-changing sync and page tokens and would
+just churn the cache.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+_METADATA_URL = re.compile(r'/calendar/v3/(users/me/(calendarList|settings)|calendars/[^/?]+(\?|$))')
+
+
+def is_metadata_url(key: str) -> bool:
+    """True for calendar metadata resources worth revalidating by ETag"""
+    return bool(_METADATA_URL.search(key))
+
+
+class BoundedHttpCache:
+    """Thread-safe in-memory LRU cache for httplib2, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int = 2 * 1024 * 1024,
+                 cacheable: Optional[Callable[[str], bool]] = is_metadata_url):
+        self.max_bytes = max_bytes
+        self.cacheable = cacheable
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes):
+        if self.cacheable and not self.cacheable(key):
+            return
+        if len(value) > self.max_bytes:
+            # Never let a single huge response flush everything else
+            self.delete(key)
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def delete(self, key: str):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,44 @@
+"""
+Streaming pagination over Google API list methods.
+
+List calls return at most maxResults items per page plus a nextPageToken.
+These generators follow the tokens lazily, so callers can stream arbitrarily
+large result sets page by page and stop early without fetching the rest.
+"""
+
+from typing import Dict, Iterable, Iterator, Optional
+
+
+def iter_pages(list_method, page_size: Optional[int] = None, **params) -> Iterator[Dict]:
+    """Yield every response of a list query, following nextPageToken.
+
+    list_method is an unexecuted API method such as service.events().list.
+    The next page is only requested when the caller asks for it.
+    """
+    if page_size:
+        params['maxResults'] = page_size
+    while True:
+        response = list_method(**params).execute()
+        yield response
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+        params['pageToken'] = page_token
+
+
+def iter_items(pages: Iterable[Dict], limit: Optional[int] = None) -> Iterator[Dict]:
+    """Flatten the 'items' of each page, stopping after limit items if given"""
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    try:
+        for page in pages:
+            for item in page.get('items', []):
+                yield item
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        close = getattr(pages, 'close', None)
+        if close:
+            close()
@@ -0,0 +1,213 @@
+"""
+Local expansion of recurring events.
+
+With singleEvents=True the Calendar API expands every recurring series on
+the server and sends each instance as its own payload. Listing with
+singleEvents=False instead returns each series once (its master event with
+RRULE/EXDATE/RDATE lines) plus only the instances that were modified or
+cancelled. RecurrenceExpander turns those back into the instances the rest
+of the app expects, using dateutil's rrule.
+
+Generated instances follow the API's conventions: the id is
+<master id>_<original start> (YYYYMMDDTHHMMSSZ, or YYYYMMDD for all-day
+events), and recurringEventId/originalStartTime point back to the series.
+Modified instances replace the generated ones with the same original start
+and cancelled ones remove them.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dateutil import rrule
+
+from calendar_api.store import event_bounds
+from utils.timeparse import get_zone, parse_date, parse_datetime
+
+# Expanded occurrence lists kept per (series version, window)
+EXPANSION_CACHE_SIZE = 256
+
+_DATE_UNTIL = re.compile(r'(UNTIL=)(\d{8})(?=;|$)')
+
+
+def is_series_master(event: Dict) -> bool:
+    return bool(event.get('recurrence'))
+
+
+def is_series_exception(event: Dict) -> bool:
+    return bool(event.get('recurringEventId'))
+
+
+def _parse_time(value: Dict) -> Tuple[Optional[datetime], bool]:
+    """(datetime, all_day) of an API start/end object. All-day dates are naive."""
+    if value.get('dateTime'):
+        dt = parse_datetime(value['dateTime'])
+        zone = get_zone(value['timeZone']) if value.get('timeZone') else None
+        # Recur in the series' own zone so wall-clock times survive DST changes
+        return (dt.astimezone(zone) if dt and zone else dt), False
+    if value.get('date'):
+        dt = parse_date(value['date'])
+        return (dt.replace(tzinfo=None) if dt else None), True
+    return None, False
+
+
+def _parse_date_list(line: str, start: datetime, all_day: bool) -> List[datetime]:
+    """Datetimes of an RDATE/EXDATE line, comparable with the series' start"""
+    head, _, values = line.partition(':')
+    params = dict(p.split('=', 1) for p in head.split(';')[1:] if '=' in p)
+    zone = get_zone(params['TZID']) if 'TZID' in params else None
+    dates = []
+    for value in values.split(','):
+        value = value.strip()
+        if not value:
+            continue
+        if 'T' not in value:
+            dt = datetime.strptime(value, '%Y%m%d')
+            if not all_day:
+                # A date on a timed series means that day's occurrence
+                dt = dt.replace(hour=start.hour, minute=start.minute, second=start.second,
+                                tzinfo=start.tzinfo)
+        elif value.endswith('Z'):
+            dt = datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+        else:
+            dt = datetime.strptime(value, '%Y%m%dT%H%M%S').replace(tzinfo=zone or start.tzinfo)
+        if all_day:
+            dt = dt.replace(hour=0, minute=0, second=0, tzinfo=None)
+        dates.append(dt)
+    return dates
+
+
+def _overlaps(event: Dict, time_min: datetime, time_max: datetime) -> bool:
+    start, all_day = _parse_time(event.get('start') or {})
+    end, _ = _parse_time(event.get('end') or {})
+    if start is None or end is None:
+        return False
+    if all_day:
+        time_min = time_min.astimezone().replace(tzinfo=None)
+        time_max = time_max.astimezone().replace(tzinfo=None)
+    return start < time_max and end > time_min
+
+
+def original_start_key(dt: datetime, all_day: bool) -> str:
+    """The suffix the API uses in instance ids for an original start time"""
+    if all_day:
+        return dt.strftime('%Y%m%d')
+    return dt.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _time_value(dt: datetime, all_day: bool, time_zone: Optional[str]) -> Dict:
+    if all_day:
+        return {'date': dt.date().isoformat()}
+    value = {'dateTime': dt.isoformat()}
+    if time_zone:
+        value['timeZone'] = time_zone
+    return value
+
+
+class RecurrenceExpander:
+    """Expands series masters into instances, memoizing expanded windows"""
+
+    def __init__(self, cache_size: int = EXPANSION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def occurrences(self, master: Dict, time_min: datetime, time_max: datetime) -> List[datetime]:
+        """Original start times of a series overlapping [time_min, time_max)"""
+        start, all_day = _parse_time(master.get('start') or {})
+        end, _ = _parse_time(master.get('end') or {})
+        if start is None or end is None:
+            return []
+        duration = end - start
+        if all_day:
+            # All-day series recur on naive local dates
+            time_min = time_min.astimezone().replace(tzinfo=None)
+            time_max = time_max.astimezone().replace(tzinfo=None)
+
+        version = master.get('etag') or master.get('updated') or (tuple(master['recurrence']), start)
+        key = (master.get('id'), version, time_min, time_max)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        rules = self._rule_set(master['recurrence'], start, all_day)
+        # Occurrences that start before the window can still overlap it
+        occurrences = rules.between(time_min - duration, time_max, inc=False)
+        if duration:
+            occurrences = [dt for dt in occurrences if dt + duration > time_min]
+        else:
+            occurrences = [dt for dt in occurrences if dt >= time_min]
+
+        with self._lock:
+            self._cache[key] = occurrences
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return occurrences
+
+    @staticmethod
+    def _rule_set(lines: Iterable[str], start: datetime, all_day: bool) -> rrule.rruleset:
+        rules = rrule.rruleset()
+        for line in lines:
+            name = line.split(':', 1)[0].split(';', 1)[0].upper()
+            if name in ('RRULE', 'EXRULE'):
+                if not all_day:
+                    # dateutil needs UNTIL in UTC when DTSTART is aware
+                    line = _DATE_UNTIL.sub(r'\g<1>\g<2>T235959Z', line)
+                rule = rrule.rrulestr(line.split(':', 1)[1], dtstart=start)
+                (rules.rrule if name == 'RRULE' else rules.exrule)(rule)
+            elif name in ('RDATE', 'EXDATE'):
+                # Parsed here: dateutil's rrulestr rejects TZID on RDATE
+                for dt in _parse_date_list(line, start, all_day):
+                    (rules.rdate if name == 'RDATE' else rules.exdate)(dt)
+        return rules
+
+    def expand(self, master: Dict, time_min: datetime, time_max: datetime,
+               exceptions: Iterable[Dict] = ()) -> List[Dict]:
+        """Instances of one series overlapping [time_min, time_max), ordered by start.
+        exceptions are the modified or cancelled instances of the series."""
+        start, all_day = _parse_time(master.get('start') or {})
+        end, _ = _parse_time(master.get('end') or {})
+        if start is None or end is None:
+            return []
+        duration = end - start
+        time_zone = (master.get('start') or {}).get('timeZone')
+        master_id = master.get('id')
+
+        overrides = {}
+        for exception in exceptions:
+            original, original_all_day = _parse_time(exception.get('originalStartTime') or {})
+            if original is not None:
+                overrides[original_start_key(original, original_all_day)] = exception
+
+        base = {k: v for k, v in master.items() if k not in ('recurrence', 'id', 'start', 'end')}
+        instances = []
+        for occurrence in self.occurrences(master, time_min, time_max):
+            key = original_start_key(occurrence, all_day)
+            exception = overrides.pop(key, None)
+            if exception is not None:
+                # A modified instance may have moved out of the window
+                if exception.get('status') != 'cancelled' and _overlaps(exception, time_min, time_max):
+                    instances.append(exception)
+                continue
+            instance = dict(base)
+            instance['id'] = f"{master_id}_{key}"
+            instance['recurringEventId'] = master_id
+            instance['originalStartTime'] = _time_value(occurrence, all_day, time_zone)
+            instance['start'] = _time_value(occurrence, all_day, time_zone)
+            instance['end'] = _time_value(occurrence + duration, all_day, time_zone)
+            instances.append(instance)
+
+        # Modified instances moved into the window from an occurrence outside it
+        for exception in overrides.values():
+            if exception.get('status') != 'cancelled' and _overlaps(exception, time_min, time_max):
+                instances.append(exception)
+        instances.sort(key=lambda event: event_bounds(event)[0])
+        return instances
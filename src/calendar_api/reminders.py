@@ -0,0 +1,211 @@
+"""
+Time-ordered schedule of event reminders.
+
+Reminders live in a min-heap keyed by fire time, so the next one due is
+always at the top and a single timer can be armed for it instead of scanning
+every event each minute. Replacing or removing an event does not search the
+heap: its entries are invalidated by a generation number and dropped when they
+reach the top. An event can have several reminders (its own overrides or its
+calendar's defaults, see event_reminder_minutes); all of them share the heap.
+Reminders that fire together are announced as one burst (burst_message).
+"""
+
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from calendar_api.store import event_bounds
+
+
+# A reminder this long past its event's start is dropped instead of shown
+LATE_GRACE_SECONDS = 60
+# Longest reminder the Calendar API allows (four weeks)
+MAX_REMINDER_MINUTES = 40320
+# Events are loaded this long before their earliest reminder is due
+REMINDER_LOOKAHEAD = timedelta(days=1)
+
+
+class Reminder:
+    """One reminder instant of an event"""
+
+    __slots__ = ('event', 'fire_ts', 'start_ts', 'minutes')
+
+    def __init__(self, event: Dict, fire_ts: float, start_ts: float, minutes: int):
+        self.event = event
+        self.fire_ts = fire_ts
+        self.start_ts = start_ts
+        # How long before the start it fires
+        self.minutes = minutes
+
+    @property
+    def event_id(self) -> Optional[str]:
+        return self.event.get('id')
+
+    def __repr__(self) -> str:
+        return f"Reminder({self.event_id!r}, minutes={self.minutes}, fire_ts={self.fire_ts})"
+
+
+def event_start_ts(event: Dict) -> Optional[float]:
+    """Start of a timed event as epoch seconds; None for all-day or unparsable events"""
+    if 'dateTime' not in (event.get('start') or {}):
+        return None
+    start, _ = event_bounds(event)
+    return start.timestamp() if start else None
+
+
+def event_reminder_minutes(event: Dict, calendar_defaults: Optional[List[Dict]] = None) -> List[int]:
+    """Popup reminder offsets (minutes before start) of an event.
+
+    Uses the event's reminders.overrides, or the calendar's defaultReminders
+    when the event follows the calendar defaults (or does not say).
+    """
+    reminders = event.get('reminders') or {'useDefault': True}
+    if reminders.get('useDefault'):
+        source = calendar_defaults or []
+    else:
+        source = reminders.get('overrides') or []
+    minutes = set()
+    for reminder in source:
+        if reminder.get('method', 'popup') == 'popup' and reminder.get('minutes') is not None:
+            minutes.add(int(reminder['minutes']))
+    return sorted(minutes)
+
+
+def load_reminder_events(event_store, now: Optional[datetime] = None, extra_minutes: int = 0) -> List[Dict]:
+    """Stored events whose reminders can fire within REMINDER_LOOKAHEAD.
+
+    The window reaches as far ahead as the longest stored reminder (event
+    overrides, calendar defaults or extra_minutes, the app's own setting), so
+    a "2 days before" reminder is scheduled in time. Events are tagged with
+    their calendarId so the calendar's default reminders apply.
+    """
+    now = now or datetime.now(timezone.utc)
+    longest = max(event_store.get_max_reminder_minutes(now), int(extra_minutes or 0))
+    horizon = REMINDER_LOOKAHEAD + timedelta(minutes=min(longest, MAX_REMINDER_MINUTES))
+    return event_store.get_events_between(now, now + horizon, with_calendar=True)
+
+
+class ReminderSchedule:
+    """Min-heap of pending reminders with O(log n) add and lazy removal"""
+
+    def __init__(self, late_grace: float = LATE_GRACE_SECONDS):
+        self.late_grace = late_grace
+        # (fire_ts, seq, generation, reminder); seq keeps reminders out of comparisons
+        self._heap: List[tuple] = []
+        # Current generation of every scheduled event; older heap entries are stale
+        self._generation: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Number of scheduled events"""
+        return len(self._generation)
+
+    def __contains__(self, event_id) -> bool:
+        return event_id in self._generation
+
+    def _entries(self, event: Dict, minutes: Iterable[int]) -> List[tuple]:
+        """Heap entries for an event's reminders under a new generation"""
+        event_id = event.get('id')
+        self.remove(event_id)
+        if event.get('status') == 'cancelled':
+            return []
+        start_ts = event_start_ts(event)
+        if start_ts is None:
+            return []
+        generation = next(self._counter)
+        self._generation[event_id] = generation
+        entries = []
+        for offset in set(minutes):
+            fire_ts = start_ts - offset * 60
+            entries.append((fire_ts, next(self._counter), generation, Reminder(event, fire_ts, start_ts, offset)))
+        return entries
+
+    def add(self, event: Dict, minutes: Iterable[int]) -> int:
+        """Schedule an event's reminders, replacing any it had; returns how many were added"""
+        entries = self._entries(event, minutes)
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        self._maybe_compact()
+        return len(entries)
+
+    def rebuild(self, events: Iterable[Tuple[Dict, Iterable[int]]]):
+        """Replace the whole schedule with (event, minutes) pairs in one O(n) heapify"""
+        self.clear()
+        heap = []
+        for event, minutes in events:
+            heap.extend(self._entries(event, minutes))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def remove(self, event_id) -> bool:
+        """Unschedule an event's reminders"""
+        return self._generation.pop(event_id, None) is not None
+
+    def clear(self):
+        self._heap.clear()
+        self._generation.clear()
+
+    def _live(self, entry) -> bool:
+        return self._generation.get(entry[3].event_id) == entry[2]
+
+    def _drop_stale_top(self):
+        heap = self._heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+
+    def _maybe_compact(self):
+        # Stale entries are normally dropped at the top; rebuild if too many pile up
+        if len(self._heap) > 64 and len(self._heap) > 4 * len(self._generation):
+            self._heap = [entry for entry in self._heap if self._live(entry)]
+            heapq.heapify(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        """Fire time of the earliest pending reminder, or None"""
+        self._drop_stale_top()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Reminder]:
+        """Remove and return the reminders due at `now`, earliest first.
+
+        Reminders whose event started more than late_grace seconds ago are
+        dropped. The event itself stays scheduled until it is removed.
+        """
+        now = time.time() if now is None else now
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self._live(entry):
+                continue
+            reminder = entry[3]
+            if now <= reminder.start_ts + self.late_grace:
+                due.append(reminder)
+        return due
+
+
+def starts_in_text(minutes_until: float) -> str:
+    """'Starting now' or 'Starting in N minutes'"""
+    # At-start reminders fire at or just after the start; heads-ups show the minutes left
+    if minutes_until <= 1:
+        return "Starting now"
+    return f"Starting in {int(round(minutes_until))} minutes"
+
+
+def burst_message(reminders: List[Reminder], now: Optional[float] = None,
+                  max_lines: int = 4) -> Tuple[str, str]:
+    """One (title, message) summarising reminders that fire together"""
+    now = time.time() if now is None else now
+    minutes = [(r.start_ts - now) / 60 for r in reminders]
+    if all(m <= 1 for m in minutes):
+        title = f"{len(reminders)} events starting now"
+    else:
+        title = f"{len(reminders)} upcoming events"
+    lines = []
+    for reminder, until in sorted(zip(reminders, minutes), key=lambda pair: pair[0].start_ts)[:max_lines]:
+        summary = reminder.event.get('summary', 'Untitled Event')
+        lines.append(f"{summary} – now" if until <= 1 else f"{summary} – in {int(round(until))} min")
+    if len(reminders) > max_lines:
+        lines.append(f"and {len(reminders) - max_lines} more")
+    return title, "\n".join(lines)
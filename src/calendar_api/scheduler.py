@@ -0,0 +1,262 @@
+"""
+Single owner of the sync cadence.
+
+Syncs used to be started by a tray timer with a hard-coded interval, by "Sync
+Now", by the Calendar View's refresh button and at startup, each on its own
+thread. SyncScheduler runs them all on one background thread: periodically at
+the configured sync_interval, and on demand through request_sync(). Requests
+made while a sync is running, or several made before it starts, collapse into
+one more run. Subscribers are called on the scheduler thread with the outcome
+(True if the store changed). Between syncs the thread sleeps until the next
+one is due, so an idle app does no work.
+
+Views that show the time (the overlay's clock and "Ending in N mins") can
+subscribe_minutes() instead of running their own timers: while any are
+subscribed, the same thread also wakes as each wall-clock minute starts.
+
+With an AdaptiveCadence the delay between periodic syncs follows the
+calendar: short just before an event starts, long overnight, during long
+free stretches and while syncs keep finding nothing new.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from config.settings import Config
+
+
+def clamp_interval(interval_ms) -> int:
+    """Keep a sync interval within Config.MIN_SYNC_INTERVAL..MAX_SYNC_INTERVAL"""
+    try:
+        interval_ms = int(interval_ms)
+    except (TypeError, ValueError):
+        interval_ms = Config.DEFAULT_SYNC_INTERVAL
+    return max(Config.MIN_SYNC_INTERVAL, min(Config.MAX_SYNC_INTERVAL, interval_ms))
+
+
+class AdaptiveCadence:
+    """Chooses the delay before the next periodic sync.
+
+    base_ms (the sync_interval setting) is the normal delay. It drops to
+    min_ms within LEAD_SECONDS of an event start, so last-minute changes show
+    up in time. It doubles after every IDLE_SYNCS syncs that changed nothing,
+    is at least four times base_ms when no event starts for a long while, and
+    goes to the ceiling overnight once things are quiet. It never sleeps past
+    the start of the next pre-event window.
+
+    The ceiling is max_ms, or base_ms if the user chose a longer interval:
+    a chosen interval is never shortened to fit the back-off bound.
+    """
+
+    LEAD_SECONDS = 15 * 60
+    FREE_STRETCH_SECONDS = 2 * 60 * 60
+    QUIET_HOURS = (0, 6)  # local hours [start, end)
+    IDLE_SYNCS = 3
+    MAX_DOUBLINGS = 6
+
+    def __init__(self, base_ms: int = Config.DEFAULT_SYNC_INTERVAL,
+                 min_ms: int = Config.MIN_SYNC_INTERVAL, max_ms: int = Config.MAX_SYNC_INTERVAL):
+        self.set_bounds(min_ms, max_ms)
+        self.set_base(base_ms)
+        # Syncs in a row that found no changes
+        self.unchanged_streak = 0
+
+    def set_bounds(self, min_ms: int, max_ms: int):
+        self.min_ms = clamp_interval(min_ms)
+        self.max_ms = max(self.min_ms, clamp_interval(max_ms))
+
+    def set_base(self, base_ms: int):
+        self.base_ms = max(self.min_ms, clamp_interval(base_ms))
+
+    @property
+    def ceiling_ms(self) -> int:
+        """Longest delay: the back-off bound, or the user's interval if that is longer"""
+        return max(self.max_ms, self.base_ms)
+
+    def record(self, changed: bool):
+        """Note the outcome of a sync"""
+        self.unchanged_streak = 0 if changed else self.unchanged_streak + 1
+
+    def next_delay_ms(self, now: Optional[float] = None, next_start: Optional[float] = None) -> int:
+        """Delay before the next sync, given the next event start (epoch seconds) if any"""
+        now = time.time() if now is None else now
+        until_start = None if next_start is None else next_start - now
+        if until_start is not None and 0 <= until_start <= self.LEAD_SECONDS:
+            return self.min_ms
+
+        delay = self.base_ms * 2 ** min(self.unchanged_streak // self.IDLE_SYNCS, self.MAX_DOUBLINGS)
+        if until_start is None or until_start > self.FREE_STRETCH_SECONDS:
+            delay = max(delay, self.base_ms * 4)
+        quiet_start, quiet_end = self.QUIET_HOURS
+        if self.unchanged_streak and quiet_start <= datetime.fromtimestamp(now).hour < quiet_end:
+            delay = self.ceiling_ms
+        if until_start is not None and until_start > 0:
+            # Wake up when the pre-event window opens
+            delay = min(delay, (until_start - self.LEAD_SECONDS) * 1000)
+        return int(max(self.min_ms, min(self.ceiling_ms, delay)))
+
+
+class SyncScheduler:
+    """Runs sync_fn periodically and on request, on a single background thread"""
+
+    def __init__(self, sync_fn: Callable[[], bool], interval_ms: int = Config.DEFAULT_SYNC_INTERVAL,
+                 name: str = 'SyncScheduler', cadence: Optional[AdaptiveCadence] = None,
+                 next_event_start: Optional[Callable[[], Optional[float]]] = None):
+        self.sync_fn = sync_fn
+        self.name = name
+        self._interval_ms = clamp_interval(interval_ms)
+        # Optional adaptive delays; next_event_start returns the next event start (epoch seconds).
+        # It is called right after sync_fn returns, so it should read what the sync just wrote.
+        self.cadence = cadence
+        self.next_event_start = next_event_start
+        if cadence is not None:
+            cadence.set_base(self._interval_ms)
+        self._listeners: List[Callable[[bool], None]] = []
+        self._minute_listeners: List[Callable[[], None]] = []
+        # Wall-clock minute (epoch // 60) the minute listeners last saw
+        self._last_minute = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._requested = False
+        self._stopped = False
+        self._thread = None
+        # time.monotonic() of the last finished sync and of the next periodic one
+        self.last_sync_at: Optional[float] = None
+        self.next_sync_at: Optional[float] = None
+        self.sync_count = 0
+
+    @property
+    def interval_ms(self) -> int:
+        return self._interval_ms
+
+    def set_interval(self, interval_ms: int):
+        """Change the periodic interval; the next sync is rescheduled from the last one"""
+        self._interval_ms = clamp_interval(interval_ms)
+        if self.cadence is not None:
+            self.cadence.set_base(self._interval_ms)
+        if self.last_sync_at is not None:
+            self.next_sync_at = self.last_sync_at + self.next_delay()
+        self._wake.set()
+
+    def set_cadence(self, cadence: Optional[AdaptiveCadence]):
+        """Switch adaptive delays on (or off with None) and reschedule"""
+        if cadence is not None:
+            cadence.set_base(self._interval_ms)
+        self.cadence = cadence
+        self.set_interval(self._interval_ms)
+
+    def next_delay(self) -> float:
+        """Seconds from the end of one periodic sync to the next"""
+        cadence = self.cadence
+        if cadence is None:
+            return self._interval_ms / 1000
+        next_start = None
+        if self.next_event_start is not None:
+            try:
+                next_start = self.next_event_start()
+            except Exception as e:
+                print(f"{self.name}: could not find the next event: {e}")
+        return cadence.next_delay_ms(time.time(), next_start) / 1000
+
+    def subscribe(self, callback: Callable[[bool], None]):
+        """Call callback(changed) from the scheduler thread after each sync"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[bool], None]):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def subscribe_minutes(self, callback: Callable[[], None]):
+        """Call callback() from the scheduler thread as each wall-clock minute starts"""
+        with self._lock:
+            self._minute_listeners.append(callback)
+            if self._last_minute is None:
+                self._last_minute = int(time.time() // 60)
+        # Re-read the schedule so the first tick is not missed
+        self._wake.set()
+
+    def unsubscribe_minutes(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._minute_listeners:
+                self._minute_listeners.remove(callback)
+
+    def _timeout(self) -> Optional[float]:
+        """Seconds until the next sync or minute tick is due, or None to wait for a request"""
+        timeouts = []
+        if self.next_sync_at is not None:
+            timeouts.append(max(0.0, self.next_sync_at - time.monotonic()))
+        if self._minute_listeners:
+            # A little past the boundary so the new minute has started
+            timeouts.append(60 - time.time() % 60 + 0.05)
+        return min(timeouts) if timeouts else None
+
+    def _tick_if_due(self, now: Optional[float] = None) -> bool:
+        """Call the minute listeners if a new minute started since the last tick"""
+        minute = int((time.time() if now is None else now) // 60)
+        with self._lock:
+            if not self._minute_listeners or minute == self._last_minute:
+                return False
+            self._last_minute = minute
+            listeners = list(self._minute_listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"{self.name}: minute subscriber error: {e}")
+        return True
+
+    def start(self):
+        """Start the scheduler thread; the first sync runs right away"""
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name)
+            self._thread.daemon = True
+            self._thread.start()
+        self.request_sync()
+
+    def request_sync(self):
+        """Ask for a sync as soon as possible; returns immediately"""
+        with self._lock:
+            self._requested = True
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._timeout())
+            self._wake.clear()
+            if self._stopped:
+                return
+            self._tick_if_due()
+            with self._lock:
+                requested, self._requested = self._requested, False
+            if not requested and (self.next_sync_at is None or time.monotonic() < self.next_sync_at):
+                # A minute tick, or woken to re-read the schedule (e.g. the interval changed)
+                continue
+            changed = self._sync_once()
+            if self.cadence is not None:
+                self.cadence.record(changed)
+            self.last_sync_at = time.monotonic()
+            self.next_sync_at = self.last_sync_at + self.next_delay()
+            with self._lock:
+                listeners = list(self._listeners)
+            for callback in listeners:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"{self.name}: subscriber error: {e}")
+
+    def _sync_once(self) -> bool:
+        self.sync_count += 1
+        try:
+            return bool(self.sync_fn())
+        except Exception as e:
+            print(f"{self.name}: sync failed: {e}")
+            return False
@@ -0,0 +1,94 @@
+"""
+Process-wide provider for the Google Calendar service object.
+
+Building a service with googleapiclient.discovery.build parses the large
+Calendar discovery document, so the provider builds it once per process from
+the discovery document bundled with google-api-python-client (no network
+fetch) and hands the same Resource to every GoogleCalendarClient. Refreshed or
+replaced credentials are swapped into the authorized HTTP objects in place.
+
+httplib2 is not thread-safe, so requests made through the shared service are
+bound to a per-thread authorized HTTP object. The GUI thread, the background
+sync thread and pool workers each keep their own connections, but share one
+ETag cache so repeated metadata calls are answered with 304 Not Modified.
+"""
+
+import threading
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+from calendar_api.http_cache import BoundedHttpCache
+from config.settings import Config
+
+
+class CalendarServiceProvider:
+    """Builds the Calendar service once and shares it across clients"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    HTTP_TIMEOUT = 30  # seconds
+
+    @classmethod
+    def instance(cls) -> 'CalendarServiceProvider':
+        """Get the process-wide provider"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._service = None
+        self._credentials = None
+        self.http_cache = BoundedHttpCache()
+
+    def _thread_http(self) -> AuthorizedHttp:
+        """Get the calling thread's authorized HTTP object"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(
+                self._credentials,
+                http=httplib2.Http(cache=self.http_cache, timeout=self.HTTP_TIMEOUT)
+            )
+            self._local.http = http
+        elif http.credentials is not self._credentials:
+            http.credentials = self._credentials
+        return http
+
+    def _build_request(self, http, *args, **kwargs):
+        # Ignore the service's shared http; bind each request to this thread's
+        return HttpRequest(self._thread_http(), *args, **kwargs)
+
+    def get_service(self, credentials):
+        """Return the shared service, authorized with the given credentials"""
+        with self._lock:
+            self._credentials = credentials
+            if self._service is None:
+                self._service = build(
+                    'calendar',
+                    Config.CALENDAR_API_VERSION,
+                    http=self._thread_http(),
+                    requestBuilder=self._build_request,
+                    static_discovery=True,
+                    cache_discovery=False,
+                )
+            return self._service
+
+    def update_credentials(self, credentials):
+        """Swap in refreshed or re-authorized credentials without rebuilding"""
+        with self._lock:
+            # Each thread's HTTP object picks these up on its next request
+            self._credentials = credentials
+
+    def reset(self):
+        """Drop the cached service (e.g. after the account is disconnected)"""
+        with self._lock:
+            self._service = None
+            self._credentials = None
+            self._local = threading.local()
+            self.http_cache.clear()
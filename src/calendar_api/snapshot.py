@@ -0,0 +1,106 @@
+"""
+Non-blocking event feed for UI threads.
+
+A UI thread must never wait on the network or the disk. EventFeed runs its
+loader (a store query, an API call...) on its own background thread and
+publishes the result as an immutable EventSnapshot. Readers simply take the
+current snapshot, which is a single attribute read, and subscribers are told
+when a new one is available so they can re-render. Each snapshot carries the
+ChangeSet from the previous one, so subscribers can apply just the changes.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from calendar_api.diff import ChangeSet, diff_events
+
+
+class EventSnapshot:
+    """An immutable set of events as of one load"""
+
+    __slots__ = ('events', 'version', 'loaded_at', 'by_id', 'changes')
+
+    def __init__(self, events: Sequence[Dict] = (), version: int = 0, loaded_at: Optional[float] = None,
+                 changes: Optional[ChangeSet] = None):
+        self.events = tuple(events)
+        self.version = version
+        self.loaded_at = loaded_at
+        self.by_id = {event.get('id'): event for event in self.events}
+        # What changed since the previous snapshot
+        self.changes = changes if changes is not None else ChangeSet()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.version > 0
+
+
+class EventFeed:
+    """Loads events on a background thread and publishes snapshots"""
+
+    def __init__(self, loader: Callable[[], List[Dict]], name: str = 'EventFeed'):
+        self.loader = loader
+        self.name = name
+        self._snapshot = EventSnapshot()
+        self._listeners: List[Callable[[EventSnapshot], None]] = []
+        self._listeners_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def snapshot(self) -> EventSnapshot:
+        """The latest snapshot; never blocks"""
+        return self._snapshot
+
+    def subscribe(self, callback: Callable[[EventSnapshot], None]):
+        """Call callback(snapshot) from the feed thread after each publish"""
+        with self._listeners_lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[EventSnapshot], None]):
+        with self._listeners_lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def start(self):
+        """Start the feed thread and load the first snapshot"""
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name)
+            self._thread.daemon = True
+            self._thread.start()
+        self.refresh()
+
+    def refresh(self):
+        """Ask for a reload; returns immediately. Bursts collapse into one load."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopped:
+                return
+            try:
+                events = self.loader()
+            except Exception as e:
+                print(f"{self.name}: failed to load events: {e}")
+                continue
+            previous = self._snapshot
+            changes = diff_events(previous.by_id, events)
+            if previous.is_loaded and not changes:
+                # Nothing changed; subscribers have nothing to do
+                continue
+            self._snapshot = EventSnapshot(events, previous.version + 1, time.time(), changes)
+            with self._listeners_lock:
+                listeners = list(self._listeners)
+            for callback in listeners:
+                try:
+                    callback(self._snapshot)
+                except Exception as e:
+                    print(f"{self.name}: subscriber error: {e}")
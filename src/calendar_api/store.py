@@ -0,0 +1,371 @@
+"""
+Persistent local event store.
+
+Synced events are kept in a SQLite database (events.db) in the application
+data directory, next to settings.json and credentials.json. The database runs
+in WAL mode so the Qt thread, the Tk overlay thread and the sync thread can
+read while a sync is being written. Each thread gets its own connection.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.timeparse import parse_event_bounds
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start_ts INTEGER,
+    end_ts INTEGER,
+    all_day INTEGER NOT NULL DEFAULT 0,
+    updated TEXT,
+    data TEXT NOT NULL,
+    reminder_minutes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_ts);
+CREATE INDEX IF NOT EXISTS idx_events_end ON events (end_ts);
+CREATE INDEX IF NOT EXISTS idx_events_series
+    ON events (calendar_id, json_extract(data, '$.recurringEventId'));
+CREATE TABLE IF NOT EXISTS series (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    master_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_series_master ON series (calendar_id, master_id);
+CREATE TABLE IF NOT EXISTS calendars (
+    calendar_id TEXT PRIMARY KEY,
+    default_reminders TEXT,
+    max_reminder_minutes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at INTEGER
+);
+"""
+
+# Created after MIGRATIONS, since they index columns older databases lack
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_events_reminders ON events (end_ts) WHERE reminder_minutes > 0;
+"""
+
+# Columns added after the first release: (table, column, definition, backfill)
+MIGRATIONS = [
+    ('events', 'reminder_minutes', 'INTEGER NOT NULL DEFAULT 0',
+     "UPDATE events SET reminder_minutes = COALESCE((SELECT MAX(json_extract(r.value, '$.minutes')) "
+     "FROM json_each(events.data, '$.reminders.overrides') AS r), 0)"),
+    ('calendars', 'max_reminder_minutes', 'INTEGER NOT NULL DEFAULT 0',
+     "UPDATE calendars SET max_reminder_minutes = COALESCE((SELECT MAX(json_extract(r.value, '$.minutes')) "
+     "FROM json_each(calendars.default_reminders) AS r), 0)"),
+]
+
+
+def event_bounds(event: Dict):
+    """Return (start, end) of an API event as aware datetimes, or (None, None)"""
+    return parse_event_bounds(event)
+
+
+def max_reminder_minutes(reminders: Optional[List[Dict]]) -> int:
+    """Largest offset (minutes) in a list of reminders; 0 if there are none"""
+    return max((int(r['minutes']) for r in reminders or () if r.get('minutes') is not None), default=0)
+
+
+class SeriesChanges:
+    """Recurring-series part of a sync write.
+
+    upserts: series masters and their modified/cancelled instances to store
+    deleted: ids of series that no longer exist
+    expanded: {master_id: instances} replacing each series' stored instances
+    """
+
+    def __init__(self, upserts: Iterable[Dict] = (), deleted: Iterable[str] = (),
+                 expanded: Optional[Dict[str, List[Dict]]] = None):
+        self.upserts = list(upserts)
+        self.deleted = list(deleted)
+        self.expanded = expanded or {}
+
+
+class EventStore:
+    """SQLite-backed store of synced calendar events"""
+
+    DB_NAME = 'events.db'
+
+    def __init__(self, app_data_dir):
+        self.db_path = Path(app_data_dir) / self.DB_NAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # SQLite allows one writer at a time; serialise writers in-process
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            conn = self._connection()
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            conn.executescript(INDEXES)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Add (and fill in) columns missing from a database written by an older version"""
+        for table, column, definition, backfill in MIGRATIONS:
+            columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+            if column not in columns:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+                conn.execute(backfill)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------- Writes -------------
+    @staticmethod
+    def _row(calendar_id: str, event: Dict):
+        start, end = event_bounds(event)
+        return (
+            calendar_id,
+            event['id'],
+            int(start.timestamp()) if start else None,
+            int(end.timestamp()) if end else None,
+            1 if 'date' in (event.get('start') or {}) else 0,
+            event.get('updated'),
+            json.dumps(event, separators=(',', ':')),
+            # Kept per row so the reminder window never has to read event bodies
+            max_reminder_minutes((event.get('reminders') or {}).get('overrides')),
+        )
+
+    def _write(self, calendar_id: str, upserts: Iterable[Dict], deleted: Iterable[str],
+               sync_token: Optional[str], replace: bool, series: Optional[SeriesChanges] = None,
+               default_reminders: Optional[List[Dict]] = None):
+        series = series or SeriesChanges()
+        rows = [self._row(calendar_id, event) for event in upserts]
+        for instances in series.expanded.values():
+            rows.extend(self._row(calendar_id, event) for event in instances)
+        series_rows = [
+            (calendar_id, event['id'], event.get('recurringEventId') or event['id'],
+             json.dumps(event, separators=(',', ':')))
+            for event in series.upserts
+        ]
+        with self._write_lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if replace:
+                    conn.execute('DELETE FROM events WHERE calendar_id = ?', (calendar_id,))
+                    conn.execute('DELETE FROM series WHERE calendar_id = ?', (calendar_id,))
+                conn.executemany(
+                    'DELETE FROM events WHERE calendar_id = ? AND event_id = ?',
+                    [(calendar_id, event_id) for event_id in deleted]
+                )
+                # A deleted series takes its modified instances with it
+                conn.executemany(
+                    'DELETE FROM series WHERE calendar_id = ? AND (event_id = ? OR master_id = ?)',
+                    [(calendar_id, master_id, master_id) for master_id in series.deleted]
+                )
+                # Re-expanded series replace all of their stored instances
+                conn.executemany(
+                    "DELETE FROM events WHERE calendar_id = ? AND json_extract(data, '$.recurringEventId') = ?",
+                    [(calendar_id, master_id) for master_id in series.expanded]
+                )
+                conn.executemany('INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+                conn.executemany('INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?)', series_rows)
+                if default_reminders is not None:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO calendars VALUES (?, ?, ?)',
+                        (calendar_id, json.dumps(default_reminders, separators=(',', ':')),
+                         max_reminder_minutes(default_reminders))
+                    )
+                if sync_token:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)',
+                        (calendar_id, sync_token, int(datetime.now().timestamp()))
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def replace_calendar(self, calendar_id: str, events: Iterable[Dict], sync_token: Optional[str] = None,
+                         series: Optional[SeriesChanges] = None, default_reminders: Optional[List[Dict]] = None):
+        """Replace every stored event of a calendar (result of a full sync)"""
+        self._write(calendar_id, events, (), sync_token, replace=True, series=series,
+                    default_reminders=default_reminders)
+
+    def apply_changes(self, calendar_id: str, updated: Iterable[Dict], deleted: Iterable[str],
+                      sync_token: Optional[str] = None, series: Optional[SeriesChanges] = None,
+                      default_reminders: Optional[List[Dict]] = None):
+        """Apply an incremental sync delta"""
+        self._write(calendar_id, updated, deleted, sync_token, replace=False, series=series,
+                    default_reminders=default_reminders)
+
+    def rebase_all_day(self) -> int:
+        """Recompute the stored bounds of all-day events, which are local midnights,
+        after the local time zone changed (see utils.timeparse.refresh_local_zone).
+        Returns the number of events updated."""
+        with self._write_lock:
+            conn = self._connection()
+            rows = []
+            for calendar_id, event_id, data in conn.execute(
+                    'SELECT calendar_id, event_id, data FROM events WHERE all_day = 1').fetchall():
+                start, end = event_bounds(json.loads(data))
+                rows.append((int(start.timestamp()) if start else None, int(end.timestamp()) if end else None,
+                             calendar_id, event_id))
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'UPDATE events SET start_ts = ?, end_ts = ? WHERE calendar_id = ? AND event_id = ?', rows
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return len(rows)
+
+    def clear(self, calendar_id: Optional[str] = None):
+        """Remove stored events and sync state"""
+        with self._write_lock:
+            conn = self._connection()
+            if calendar_id is None:
+                conn.execute('DELETE FROM events')
+                conn.execute('DELETE FROM series')
+                conn.execute('DELETE FROM calendars')
+                conn.execute('DELETE FROM sync_state')
+            else:
+                conn.execute('DELETE FROM events WHERE calendar_id = ?', (calendar_id,))
+                conn.execute('DELETE FROM series WHERE calendar_id = ?', (calendar_id,))
+                conn.execute('DELETE FROM calendars WHERE calendar_id = ?', (calendar_id,))
+                conn.execute('DELETE FROM sync_state WHERE calendar_id = ?', (calendar_id,))
+
+    def retain_calendars(self, calendar_ids: Iterable[str]):
+        """Drop events and sync state of calendars that are no longer synced"""
+        keep = set(calendar_ids)
+        for calendar_id in self.calendar_ids():
+            if calendar_id not in keep:
+                self.clear(calendar_id)
+
+    # ------------- Reads -------------
+    def calendar_ids(self) -> List[str]:
+        rows = self._connection().execute(
+            'SELECT calendar_id FROM events UNION SELECT calendar_id FROM series '
+            'UNION SELECT calendar_id FROM calendars UNION SELECT calendar_id FROM sync_state'
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_sync_token(self, calendar_id: str) -> Optional[str]:
+        row = self._connection().execute(
+            'SELECT sync_token FROM sync_state WHERE calendar_id = ?', (calendar_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_event(self, calendar_id: str, event_id: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            'SELECT data FROM events WHERE calendar_id = ? AND event_id = ?', (calendar_id, event_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_default_reminders(self) -> Dict[str, List[Dict]]:
+        """Default reminders of each synced calendar ({calendar_id: [{'method', 'minutes'}]})"""
+        rows = self._connection().execute('SELECT calendar_id, default_reminders FROM calendars').fetchall()
+        return {calendar_id: json.loads(data) for calendar_id, data in rows if data}
+
+    def get_max_reminder_minutes(self, after: Optional[datetime] = None) -> int:
+        """Largest reminder offset (minutes) among stored event overrides ending after `after`
+        and calendar default reminders; 0 if there are none.
+
+        Both maxima are computed when events are written, and only events with
+        overrides are indexed, so this reads no event bodies."""
+        query = """
+            SELECT MAX(minutes) FROM (
+                SELECT MAX(reminder_minutes) AS minutes FROM events
+                 WHERE reminder_minutes > 0 AND end_ts > ?
+                UNION ALL
+                SELECT MAX(max_reminder_minutes) FROM calendars
+            )
+        """
+        after_ts = int(after.timestamp()) if after else 0
+        row = self._connection().execute(query, (after_ts,)).fetchone()
+        return int(row[0] or 0)
+
+    def get_next_start(self, after: datetime) -> Optional[int]:
+        """Start (epoch seconds) of the first timed event starting after `after`, or None"""
+        row = self._connection().execute(
+            'SELECT MIN(start_ts) FROM events WHERE start_ts > ? AND all_day = 0', (int(after.timestamp()),)
+        ).fetchone()
+        return row[0]
+
+    def get_events_between(self, time_min: datetime, time_max: datetime,
+                           calendar_ids: Optional[List[str]] = None,
+                           limit: Optional[int] = None, with_calendar: bool = False) -> List[Dict]:
+        """Return events overlapping [time_min, time_max), ordered by start.
+
+        With with_calendar=True each event also gets a 'calendarId' key naming
+        the calendar it was synced from.
+        """
+        query = 'SELECT calendar_id, data FROM events WHERE start_ts < ? AND end_ts > ?'
+        params: list = [int(time_max.timestamp()), int(time_min.timestamp())]
+        if calendar_ids is not None:
+            query += f" AND calendar_id IN ({','.join('?' * len(calendar_ids))})"
+            params.extend(calendar_ids)
+        query += ' ORDER BY start_ts, event_id'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        rows = self._connection().execute(query, params).fetchall()
+        if not with_calendar:
+            return [json.loads(data) for _, data in rows]
+        events = []
+        for calendar_id, data in rows:
+            event = json.loads(data)
+            event['calendarId'] = calendar_id
+            events.append(event)
+        return events
+
+    def get_series(self, calendar_id: str, master_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Stored recurring series of a calendar as {master_id: {'master': event or None,
+        'exceptions': [modified or cancelled instances]}}"""
+        query = 'SELECT event_id, master_id, data FROM series WHERE calendar_id = ?'
+        params: list = [calendar_id]
+        if master_ids is not None:
+            master_ids = list(master_ids)
+            query += f" AND master_id IN ({','.join('?' * len(master_ids))})"
+            params.extend(master_ids)
+        series: Dict[str, Dict] = {}
+        for event_id, master_id, data in self._connection().execute(query, params):
+            entry = series.setdefault(master_id, {'master': None, 'exceptions': []})
+            if event_id == master_id:
+                entry['master'] = json.loads(data)
+            else:
+                entry['exceptions'].append(json.loads(data))
+        return series
+
+    def get_time_rows(self, calendar_ids: Optional[List[str]] = None) -> List[tuple]:
+        """Return (calendar_id, event_id, start_ts, end_ts, all_day, status) for every event"""
+        query = ("SELECT calendar_id, event_id, start_ts, end_ts, all_day, json_extract(data, '$.status') "
+                 "FROM events")
+        params: list = []
+        if calendar_ids is not None:
+            query += f" WHERE calendar_id IN ({','.join('?' * len(calendar_ids))})"
+            params.extend(calendar_ids)
+        return self._connection().execute(query, params).fetchall()
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM events').fetchone()[0]
@@ -0,0 +1,360 @@
+"""
+Incremental calendar sync built on Calendar API sync tokens.
+
+The first sync of a calendar performs one full events().list and remembers
+the nextSyncToken returned on its last page. Every later sync sends only that
+token, so the API returns just the events that changed or were deleted since
+the previous call. If Google invalidates the token (HTTP 410 GONE) the engine
+drops its state for that calendar and performs a fresh full sync.
+
+Synced events and tokens live in the EventStore, so a restart resumes with an
+incremental sync instead of downloading everything again.
+
+With expand_recurrence enabled, events are listed with singleEvents=False:
+each recurring series arrives once (plus its modified or cancelled
+instances) and is expanded locally over [lookback, horizon]. The series are
+kept in the store so the window can roll forward each day without another
+API call.
+
+When several calendars are synced together, their incremental queries go out
+in batched requests, so a routine sync of N calendars costs one round trip
+instead of N.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from calendar_api.batch import BatchResult, batch_list_pages
+from calendar_api.coalesce import SingleFlight
+from calendar_api.fields import EVENT_FIELDS, list_fields
+from calendar_api.paging import iter_pages
+from calendar_api.recurrence import RecurrenceExpander, is_series_exception, is_series_master
+from calendar_api.store import EventStore, SeriesChanges
+from config.settings import Config
+
+
+# Tokens saved in series mode are marked, since a singleEvents=True token cannot
+# be used for a singleEvents=False listing (or the other way around)
+SERIES_TOKEN_PREFIX = 'series:'
+
+
+def _is_sync_token_expired(error) -> bool:
+    """Return True if an API error means the sync token must be discarded"""
+    resp = getattr(error, 'resp', None)
+    try:
+        return int(getattr(resp, 'status', 0)) == 410
+    except (TypeError, ValueError):
+        return False
+
+
+class SyncResult:
+    """Outcome of syncing a single calendar"""
+
+    def __init__(self, calendar_id: str, full_sync: bool,
+                 updated: Optional[List[Dict]] = None, deleted: Optional[List[str]] = None,
+                 error: Optional[Exception] = None):
+        self.calendar_id = calendar_id
+        self.full_sync = full_sync
+        self.updated = updated or []
+        self.deleted = deleted or []
+        self.error = error
+
+    @property
+    def has_changes(self) -> bool:
+        return self.full_sync or bool(self.updated) or bool(self.deleted)
+
+    def __repr__(self) -> str:
+        return (f"SyncResult({self.calendar_id!r}, full_sync={self.full_sync}, "
+                f"updated={len(self.updated)}, deleted={len(self.deleted)})")
+
+
+class SyncEngine:
+    """Keeps a local copy of calendar events up to date using sync tokens"""
+
+    def __init__(self, calendar_client, event_store: EventStore, lookback_days: int = 30,
+                 coalesce_seconds: float = Config.SYNC_COALESCE_SECONDS,
+                 expand_recurrence: bool = False, horizon_days: int = Config.RECURRENCE_HORIZON_DAYS):
+        self.calendar_client = calendar_client
+        self.event_store = event_store
+        # How far back the initial full sync reaches; incremental syncs have no window
+        self.lookback_days = lookback_days
+        # Expand recurring series locally instead of receiving every instance
+        self.expand_recurrence = expand_recurrence
+        self.horizon_days = horizon_days
+        self.expander = RecurrenceExpander()
+        # Day each calendar's series were last expanded for
+        self._expanded_on: Dict[str, object] = {}
+        # The tray timer, "Sync Now", the Calendar View's refresh and the startup
+        # sync can overlap. Callers syncing the same calendar at the same time (or
+        # within coalesce_seconds of each other) share one API round trip.
+        # Different calendars still sync in parallel.
+        self._flights = SingleFlight(ttl=coalesce_seconds)
+
+    def sync(self, calendar_id: str = 'primary',
+             prefetched: Optional[Tuple[str, BatchResult]] = None) -> SyncResult:
+        """Bring the local copy of one calendar up to date.
+        prefetched is (sync_token, result) from a batched incremental query made
+        with that token; result is a BatchResult whose response is the list of pages."""
+        return self._flights.do(calendar_id, lambda: self._sync(calendar_id, prefetched))
+
+    def _usable_sync_token(self, calendar_id: str) -> Optional[str]:
+        """Stored sync token for the current listing mode, or None if a full sync is needed"""
+        sync_token = self.event_store.get_sync_token(calendar_id)
+        if sync_token and sync_token.startswith(SERIES_TOKEN_PREFIX) != self.expand_recurrence:
+            # Switched between server-side and local expansion: start over
+            return None
+        if sync_token and self.expand_recurrence:
+            sync_token = sync_token[len(SERIES_TOKEN_PREFIX):]
+        return sync_token
+
+    def _sync(self, calendar_id: str, prefetched: Optional[Tuple[str, BatchResult]] = None) -> SyncResult:
+        sync_token = self._usable_sync_token(calendar_id)
+        if sync_token:
+            try:
+                pages = None
+                # Only valid if no other sync advanced the token since the batch
+                if prefetched is not None and prefetched[0] == sync_token:
+                    if not prefetched[1].ok:
+                        raise prefetched[1].error
+                    pages = prefetched[1].response
+                if self.expand_recurrence:
+                    return self._incremental_series_sync(calendar_id, sync_token, pages)
+                return self._incremental_sync(calendar_id, sync_token, pages)
+            except Exception as e:
+                if not _is_sync_token_expired(e):
+                    raise
+                print(f"Sync token for {calendar_id} expired, performing full resync")
+        if self.expand_recurrence:
+            return self._full_series_sync(calendar_id)
+        return self._full_sync(calendar_id)
+
+    def sync_calendars(self, calendar_ids: List[str],
+                       max_workers: int = Config.MAX_SYNC_WORKERS) -> Dict[str, SyncResult]:
+        """Sync several calendars in parallel with a bounded worker pool.
+        Incremental queries are batched first; calendars needing a full sync list their own pages.
+        A failing calendar is reported in its SyncResult.error and does not stop the others."""
+        prefetched = self._prefetch_changes(calendar_ids)
+
+        def run(calendar_id):
+            try:
+                return self.sync(calendar_id, prefetched.get(calendar_id))
+            except Exception as e:
+                print(f"Failed to sync {calendar_id}: {e}")
+                return SyncResult(calendar_id, False, error=e)
+
+        if len(calendar_ids) <= 1:
+            results = [run(calendar_id) for calendar_id in calendar_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calendar_ids)))) as pool:
+                results = list(pool.map(run, calendar_ids))
+        return {result.calendar_id: result for result in results}
+
+    def _prefetch_changes(self, calendar_ids: List[str]) -> Dict[str, Tuple[str, BatchResult]]:
+        """Fetch the incremental changes of several calendars in batched round trips.
+        Returns {calendar_id: (sync_token, pages)}; empty when batching does not apply."""
+        tokens = {}
+        for calendar_id in calendar_ids:
+            sync_token = self._usable_sync_token(calendar_id)
+            if sync_token:
+                tokens[calendar_id] = sync_token
+        service = self.calendar_client.service
+        if len(tokens) < 2 or not hasattr(service, 'new_batch_http_request'):
+            return {}
+        fields = EVENT_FIELDS['sync_series'] if self.expand_recurrence else EVENT_FIELDS['sync']
+        params = {
+            calendar_id: {
+                'calendarId': calendar_id,
+                'syncToken': sync_token,
+                'singleEvents': not self.expand_recurrence,
+                'maxResults': Config.MAX_EVENTS_PER_REQUEST,
+                'fields': list_fields(fields),
+            }
+            for calendar_id, sync_token in tokens.items()
+        }
+        try:
+            results = batch_list_pages(service.new_batch_http_request, service.events().list, params)
+        except Exception as e:
+            print(f"Batched sync failed, syncing calendars one at a time: {e}")
+            return {}
+        return {calendar_id: (tokens[calendar_id], results[calendar_id]) for calendar_id in tokens}
+
+    def reset(self, calendar_id: Optional[str] = None):
+        """Forget sync state so the next sync is a full one"""
+        self._flights.forget(calendar_id)
+        self.event_store.clear(calendar_id)
+        if calendar_id is None:
+            self._expanded_on.clear()
+        else:
+            self._expanded_on.pop(calendar_id, None)
+
+    def get_events(self, time_min: datetime, time_max: datetime,
+                   calendar_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Return stored events overlapping [time_min, time_max), ordered by start"""
+        return self.event_store.get_events_between(time_min, time_max, calendar_ids)
+
+    def _list_pages(self, **params):
+        """Yield every page of an events().list query"""
+        fields = EVENT_FIELDS['sync'] if params.get('singleEvents', True) else EVENT_FIELDS['sync_series']
+        return iter_pages(
+            self.calendar_client.service.events().list,
+            page_size=Config.MAX_EVENTS_PER_REQUEST,
+            fields=list_fields(fields),
+            **params
+        )
+
+    def _full_sync(self, calendar_id: str) -> SyncResult:
+        time_min = datetime.now(timezone.utc) - timedelta(days=self.lookback_days)
+        events: Dict[str, Dict] = {}
+        next_sync_token = None
+        # The field is left out when the calendar has no default reminders
+        default_reminders = []
+        for page in self._list_pages(
+            calendarId=calendar_id,
+            timeMin=time_min.isoformat().replace('+00:00', 'Z'),
+            singleEvents=True,
+        ):
+            for event in page.get('items', []):
+                if event.get('status') != 'cancelled':
+                    events[event['id']] = event
+            next_sync_token = page.get('nextSyncToken') or next_sync_token
+            default_reminders = page.get('defaultReminders', default_reminders)
+
+        self.event_store.replace_calendar(calendar_id, events.values(), next_sync_token,
+                                          default_reminders=default_reminders)
+        return SyncResult(calendar_id, True, updated=list(events.values()))
+
+    def _incremental_sync(self, calendar_id: str, sync_token: str, pages: Optional[List[Dict]] = None) -> SyncResult:
+        updated, deleted = [], []
+        next_sync_token = None
+        # The field is left out when the calendar has no default reminders
+        default_reminders = []
+        if pages is None:
+            pages = self._list_pages(calendarId=calendar_id, syncToken=sync_token, singleEvents=True)
+        # Collect every page first so a 410 part-way through leaves state untouched
+        for page in pages:
+            for event in page.get('items', []):
+                if event.get('status') == 'cancelled':
+                    deleted.append(event['id'])
+                else:
+                    updated.append(event)
+            next_sync_token = page.get('nextSyncToken') or next_sync_token
+            default_reminders = page.get('defaultReminders', default_reminders)
+
+        self.event_store.apply_changes(calendar_id, updated, deleted, next_sync_token,
+                                       default_reminders=default_reminders)
+        return SyncResult(calendar_id, False, updated=updated, deleted=deleted)
+
+    # ------------- Local recurrence expansion -------------
+    def _expansion_window(self):
+        """Day-aligned [lookback, horizon] window, so expansions memoize across a day's syncs"""
+        today = datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=self.lookback_days), today + timedelta(days=self.horizon_days)
+
+    @staticmethod
+    def _series_token(sync_token: Optional[str]) -> Optional[str]:
+        return SERIES_TOKEN_PREFIX + sync_token if sync_token else None
+
+    def _expand(self, series: Dict[str, Dict], time_min: datetime, time_max: datetime) -> Dict[str, List[Dict]]:
+        """Expand stored-format series ({master_id: {'master', 'exceptions'}}) into instances"""
+        expanded = {}
+        for master_id, entry in series.items():
+            master = entry['master']
+            if master is None or master.get('status') == 'cancelled':
+                # Only instances of a series we do not hold: keep the modified ones
+                expanded[master_id] = [e for e in entry['exceptions'] if e.get('status') != 'cancelled']
+                continue
+            expanded[master_id] = self.expander.expand(master, time_min, time_max, entry['exceptions'])
+        return expanded
+
+    def _full_series_sync(self, calendar_id: str) -> SyncResult:
+        time_min, time_max = self._expansion_window()
+        singles: Dict[str, Dict] = {}
+        series: Dict[str, Dict] = {}
+        next_sync_token = None
+        # The field is left out when the calendar has no default reminders
+        default_reminders = []
+        for page in self._list_pages(
+            calendarId=calendar_id,
+            timeMin=time_min.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            singleEvents=False,
+        ):
+            for event in page.get('items', []):
+                if is_series_master(event):
+                    series.setdefault(event['id'], {'master': None, 'exceptions': []})['master'] = event
+                elif is_series_exception(event):
+                    entry = series.setdefault(event['recurringEventId'], {'master': None, 'exceptions': []})
+                    entry['exceptions'].append(event)
+                elif event.get('status') != 'cancelled':
+                    singles[event['id']] = event
+            next_sync_token = page.get('nextSyncToken') or next_sync_token
+            default_reminders = page.get('defaultReminders', default_reminders)
+
+        expanded = self._expand(series, time_min, time_max)
+        upserts = [e for entry in series.values() for e in ([entry['master']] if entry['master'] else [])
+                   + entry['exceptions']]
+        self.event_store.replace_calendar(calendar_id, singles.values(), self._series_token(next_sync_token),
+                                          series=SeriesChanges(upserts, expanded=expanded),
+                                          default_reminders=default_reminders)
+        self._expanded_on[calendar_id] = time_min.date()
+        instances = [e for events in expanded.values() for e in events]
+        return SyncResult(calendar_id, True, updated=list(singles.values()) + instances)
+
+    def _incremental_series_sync(self, calendar_id: str, sync_token: str,
+                                 pages: Optional[List[Dict]] = None) -> SyncResult:
+        updated, deleted = [], []
+        series_upserts = []
+        touched = set()
+        next_sync_token = None
+        # The field is left out when the calendar has no default reminders
+        default_reminders = []
+        if pages is None:
+            pages = self._list_pages(calendarId=calendar_id, syncToken=sync_token, singleEvents=False)
+        for page in pages:
+            for event in page.get('items', []):
+                if is_series_master(event):
+                    series_upserts.append(event)
+                    touched.add(event['id'])
+                    # The event may have been a single event until now
+                    deleted.append(event['id'])
+                elif is_series_exception(event):
+                    series_upserts.append(event)
+                    touched.add(event['recurringEventId'])
+                elif event.get('status') == 'cancelled':
+                    # Either a single event or a whole series was deleted
+                    deleted.append(event['id'])
+                    touched.add(event['id'])
+                else:
+                    updated.append(event)
+            next_sync_token = page.get('nextSyncToken') or next_sync_token
+            default_reminders = page.get('defaultReminders', default_reminders)
+
+        time_min, time_max = self._expansion_window()
+        if self._expanded_on.get(calendar_id) != time_min.date():
+            # New day (or first sync since start): roll every series forward
+            touched.update(self.event_store.get_series(calendar_id))
+            self._expanded_on[calendar_id] = time_min.date()
+
+        # Current state of each touched series: stored rows overlaid with this delta
+        series = self.event_store.get_series(calendar_id, touched)
+        for event in series_upserts:
+            master_id = event.get('recurringEventId') or event['id']
+            entry = series.setdefault(master_id, {'master': None, 'exceptions': []})
+            if master_id == event['id']:
+                entry['master'] = event
+            else:
+                entry['exceptions'] = [e for e in entry['exceptions'] if e['id'] != event['id']] + [event]
+        removed_series = [master_id for master_id in touched
+                          if master_id in deleted and master_id in series and
+                          not any(e['id'] == master_id for e in series_upserts)]
+        for master_id in removed_series:
+            series.pop(master_id)
+
+        expanded = self._expand({m: series[m] for m in touched if m in series}, time_min, time_max)
+        for master_id in removed_series:
+            expanded[master_id] = []
+        self.event_store.apply_changes(calendar_id, updated, deleted, self._series_token(next_sync_token),
+                                       series=SeriesChanges(series_upserts, removed_series, expanded),
+                                       default_reminders=default_reminders)
+        instances = [e for events in expanded.values() for e in events]
+        return SyncResult(calendar_id, False, updated=updated + instances, deleted=deleted)
@@ -0,0 +1,124 @@
+"""
+Columnar event timeline for range and analytics queries.
+
+EventTimeline keeps start/end epochs, all-day flags, calendar ids and status
+as parallel NumPy arrays sorted by start time, so queries over long
+histories are binary searches and vectorised comparisons instead of loops
+over event dicts. NumPy is an optional dependency (pip install
+calendar-now[analytics]); check HAS_NUMPY before building a timeline.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+from calendar_api.store import event_bounds
+
+HAS_NUMPY = np is not None
+
+STATUS_CODES = {'confirmed': 0, 'tentative': 1, 'cancelled': 2}
+
+
+class EventTimeline:
+    """Events as parallel typed arrays, sorted by start time"""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, int, int, bool, str]]):
+        """rows: (calendar_id, event_id, start_ts, end_ts, all_day, status)"""
+        if np is None:
+            raise ImportError("EventTimeline requires numpy (pip install calendar-now[analytics])")
+
+        rows = [row for row in rows if row[2] is not None and row[3] is not None]
+        rows.sort(key=lambda row: (row[2], row[1]))
+        self.calendars: List[str] = sorted({row[0] for row in rows})
+        calendar_index = {calendar_id: i for i, calendar_id in enumerate(self.calendars)}
+
+        self.event_ids = np.array([row[1] for row in rows], dtype=object)
+        self.starts = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        self.ends = np.fromiter((row[3] for row in rows), dtype=np.int64, count=len(rows))
+        self.all_day = np.fromiter((bool(row[4]) for row in rows), dtype=np.bool_, count=len(rows))
+        self.calendar = np.fromiter((calendar_index[row[0]] for row in rows), dtype=np.int32, count=len(rows))
+        self.status = np.fromiter((STATUS_CODES.get(row[5] or 'confirmed', 0) for row in rows),
+                                  dtype=np.int8, count=len(rows))
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict], calendar_id: str = 'primary') -> 'EventTimeline':
+        """Build from API event dicts of one calendar"""
+        rows = []
+        for event in events:
+            start, end = event_bounds(event)
+            if start is None:
+                continue
+            rows.append((calendar_id, event.get('id'), int(start.timestamp()), int(end.timestamp()),
+                         'date' in (event.get('start') or {}), event.get('status')))
+        return cls(rows)
+
+    @classmethod
+    def from_store(cls, event_store, calendar_ids: Optional[List[str]] = None) -> 'EventTimeline':
+        """Build from every event in the local store without decoding full events"""
+        return cls(event_store.get_time_rows(calendar_ids))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    # ------------- Queries -------------
+    def overlapping(self, time_min: int, time_max: int, include_all_day: bool = True):
+        """Indexes of events overlapping [time_min, time_max), in start order"""
+        # Only events starting before time_max can overlap; they are a prefix
+        candidates = int(np.searchsorted(self.starts, time_max, side='left'))
+        mask = self.ends[:candidates] > time_min
+        if not include_all_day:
+            mask &= ~self.all_day[:candidates]
+        return np.flatnonzero(mask)
+
+    def current(self, at: int, include_all_day: bool = False):
+        """Indexes of events in progress at the given time"""
+        return self.overlapping(at, at + 1, include_all_day)
+
+    def next_after(self, at: int, include_all_day: bool = False) -> Optional[int]:
+        """Index of the first event starting after the given time, or None"""
+        index = int(np.searchsorted(self.starts, at, side='right'))
+        if not include_all_day:
+            later = np.flatnonzero(~self.all_day[index:])
+            if not len(later):
+                return None
+            index += int(later[0])
+        return index if index < len(self.starts) else None
+
+    def busy_minutes_per_day(self, first_day: date, days: int,
+                             include_all_day: bool = False) -> Sequence[float]:
+        """Minutes covered by at least one event on each local day"""
+        mask = self.status != STATUS_CODES['cancelled']
+        if not include_all_day:
+            mask &= ~self.all_day
+        starts, ends = self.starts[mask], self.ends[mask]
+
+        # Merge overlapping events into disjoint busy blocks
+        if len(starts):
+            reach = np.maximum.accumulate(ends)
+            new_block = np.empty(len(starts), dtype=np.bool_)
+            new_block[0] = True
+            new_block[1:] = starts[1:] > reach[:-1]
+            block_starts = starts[new_block]
+            block_ends = reach[np.r_[np.flatnonzero(new_block)[1:] - 1, len(starts) - 1]]
+        else:
+            block_starts = block_ends = np.zeros(0, dtype=np.int64)
+        lengths = block_ends - block_starts
+        before = np.concatenate(([0], np.cumsum(lengths)))
+
+        def busy_until(times):
+            # Busy seconds before each time: whole blocks plus part of the current one
+            k = np.searchsorted(block_starts, times, side='right')
+            partial = np.zeros(len(times), dtype=np.int64)
+            inside = k > 0
+            j = k[inside] - 1
+            partial[inside] = np.clip(times[inside] - block_starts[j], 0, lengths[j])
+            return before[np.maximum(k - 1, 0)] * inside + partial
+
+        midnight = datetime.combine(first_day, datetime.min.time())
+        bounds = np.array([int((midnight + timedelta(days=i)).timestamp()) for i in range(days + 1)],
+                          dtype=np.int64)
+        return np.diff(busy_until(bounds)) / 60.0
@@ -1,7 +1,7 @@
 import os
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 class SettingsManager:
     """Manages application settings and user preferences"""
@@ -18,7 +18,15 @@ class SettingsManager:
             'notifications_enabled': True,
             # Default to notify at the exact start time
             'notification_minutes': 0,
+            'notify_reschedules': True,  # alert when an upcoming event is moved
+            'use_calendar_reminders': True,  # also honour each event's Google Calendar popup reminders
+            'desktop_toasts': False,  # show notifications as app toasts instead of tray messages
             'sync_interval': 60000,  # 1 minute in milliseconds
+            'adaptive_sync': True,  # sync more often before events, less when idle or overnight
+            'sync_interval_min': 60000,  # adaptive sync bounds in milliseconds
+            'sync_interval_max': 900000,  # 15 minutes
+            'sync_all_calendars': False,  # sync every selected calendar, not just primary
+            'expand_recurrence_locally': False,  # fetch each recurring series once and expand it locally
             'start_with_windows': False,
             'minimize_to_tray': True,
             'show_all_day_events': True,
@@ -71,7 +79,7 @@ class SettingsManager:
         else:  # macOS/Linux
             base_dir = Path.home() / '.local' / 'share'
         
-    return base_dir / 'CalendarNow'
+        return base_dir / 'CalendarNow'
     
     def load_settings(self) -> Dict[str, Any]:
         """Load settings from file or return defaults"""
@@ -225,6 +233,19 @@ class SettingsManager:
         self.settings = self.default_settings.copy()
         return self.save_settings()
     
+    def get_sync_bounds(self) -> Tuple[int, int]:
+        """(min, max) adaptive sync interval in milliseconds, kept within Config's hard limits"""
+        def clamp(key, fallback):
+            try:
+                value = int(self.get_setting(key, fallback))
+            except (TypeError, ValueError):
+                value = fallback
+            return max(Config.MIN_SYNC_INTERVAL, min(Config.MAX_SYNC_INTERVAL, value))
+        
+        low = clamp('sync_interval_min', Config.MIN_SYNC_INTERVAL)
+        high = clamp('sync_interval_max', Config.MAX_SYNC_INTERVAL)
+        return low, max(low, high)
+    
     def get_all_settings(self) -> Dict[str, Any]:
         """Get all current settings"""
         return self.settings.copy()
@@ -299,10 +320,16 @@ class Config:
     TRAY_ICON_SIZE = (16, 16)
     NOTIFICATION_DURATION = 5000  # milliseconds
     
+    # Startup settings
+    STARTUP_TARGET_MS = 300  # launch to first overlay frame, served from the local event store
+    
     # Sync settings
     MIN_SYNC_INTERVAL = 60000  # 1 minute in milliseconds
     MAX_SYNC_INTERVAL = 3600000  # 1 hour in milliseconds
     DEFAULT_SYNC_INTERVAL = 60000  # 1 minute in milliseconds
+    MAX_SYNC_WORKERS = 4  # parallel calendar fetches when syncing all calendars
+    SYNC_COALESCE_SECONDS = 2  # sync requests this close together share one API call
+    RECURRENCE_HORIZON_DAYS = 365  # how far ahead locally expanded series reach
     
     # Event settings
     MAX_EVENTS_PER_REQUEST = 250
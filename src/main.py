@@ -6,7 +6,10 @@ from auth.oauth import OAuthHandler
 from auth.credentials import CredentialsManager
 from ui.setup_wizard import SetupWizard
 from ui.tray import SystemTray
+from ui.notification_ledger import NotificationLedger
+from calendar_api.store import EventStore
 from config.settings import SettingsManager, Config
+from utils.helpers import start_startup_timer, mark_startup
 
 def check_system_tray_available():
     """Check if system tray is available"""
@@ -22,6 +25,8 @@ def check_system_tray_available():
 
 def main():
     """Main application entry point"""
+    start_startup_timer()
+    
     # Create QApplication
     app = QApplication(sys.argv)
     app.setApplicationName(Config.APP_NAME)
@@ -66,6 +71,8 @@ def main():
         
         # Show the main task display window
         system_tray.show_task_display()
+        # A zero-delay timer fires once the event loop has run and painted the tray
+        QTimer.singleShot(0, lambda: mark_startup('tray_ready', Config.STARTUP_TARGET_MS))
         
         # Handle startup settings
         handle_startup_settings(settings_manager)
@@ -196,6 +203,10 @@ def handle_command_line_args():
         credentials_manager = CredentialsManager()
         oauth_handler = OAuthHandler(credentials_manager)
         oauth_handler.revoke_credentials()
+        # Cached events, sync tokens and shown reminders belong to the old account
+        app_data_dir = SettingsManager().app_data_dir
+        EventStore(app_data_dir).clear()
+        NotificationLedger(app_data_dir / NotificationLedger.FILE_NAME).clear()
         print("Authentication reset. Please restart the application to set up again.")
         return False
     
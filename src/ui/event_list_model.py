@@ -0,0 +1,108 @@
+"""
+Model for the Calendar View event list.
+
+The model keeps one compact EventEntry per event and formats the text and
+tooltip of a row only when the view asks for it (i.e. when the row is
+visible), caching a bounded number of formatted rows. Reloads are applied as
+incremental row inserts, removals and changes, so the selection and scroll
+position survive a sync. When the view scrolls to the end, the model asks for
+a longer date range through fetchMore.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+from PyQt5 import QtCore
+
+from ui.event_rows import EventEntry, build_event_row, plan_list_update
+
+
+class EventListModel(QtCore.QAbstractListModel):
+    """List model over the events of the Calendar View"""
+
+    EventIdRole = QtCore.Qt.UserRole
+    CalendarIdRole = QtCore.Qt.UserRole + 1
+
+    # Rows kept formatted; visible rows are always a small subset of these
+    ROW_CACHE_SIZE = 256
+
+    # Emitted when the view wants rows beyond the loaded date range
+    more_requested = QtCore.pyqtSignal()
+
+    def __init__(self, with_details_hint: bool = False, parent=None):
+        super().__init__(parent)
+        self.with_details_hint = with_details_hint
+        self._entries: List[EventEntry] = []
+        self._rows = OrderedDict()
+        self._now = datetime.now().astimezone()
+        self._can_fetch_more = False
+        self._fetching = False
+
+    # ------------- Qt model interface -------------
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == self.EventIdRole:
+            return entry.event_id
+        if role == self.CalendarIdRole:
+            return entry.calendar_id
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+            row = self._row(entry)
+            return row.text if role == QtCore.Qt.DisplayRole else row.tooltip
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self._can_fetch_more and not self._fetching
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetching = True
+            self.more_requested.emit()
+
+    # ------------- Updates -------------
+    def set_entries(self, entries: List[EventEntry], can_fetch_more: bool = False):
+        """Replace the rows with a new sorted list, as incremental changes"""
+        self._now = datetime.now().astimezone()
+        # "Today"/"Tomorrow" depend on the date, so formatted rows are redone lazily
+        self._rows.clear()
+        for operation in plan_list_update(self._entries, entries):
+            kind = operation[0]
+            if kind == 'remove':
+                _, first, last = operation
+                self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+                del self._entries[first:last + 1]
+                self.endRemoveRows()
+            elif kind == 'insert':
+                _, first, inserted = operation
+                self.beginInsertRows(QtCore.QModelIndex(), first, first + len(inserted) - 1)
+                self._entries[first:first] = inserted
+                self.endInsertRows()
+            else:
+                _, row, entry = operation
+                self._entries[row] = entry
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+        self._can_fetch_more = can_fetch_more
+        self._fetching = False
+
+    def event_id(self, index) -> Optional[str]:
+        return self.data(index, self.EventIdRole)
+
+    def calendar_id(self, index) -> Optional[str]:
+        return self.data(index, self.CalendarIdRole)
+
+    def _row(self, entry: EventEntry):
+        row = self._rows.get(entry.event_id)
+        if row is None:
+            row = build_event_row(entry.event, self._now, self.with_details_hint)
+            self._rows[entry.event_id] = row
+            while len(self._rows) > self.ROW_CACHE_SIZE:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(entry.event_id)
+        return row
@@ -0,0 +1,172 @@
+"""
+Display rows for the Calendar View.
+
+Turning API events into the text shown in the list (parsing times, picking
+an icon, formatting dates) is plain Python with no Qt objects, so it can run
+on a worker thread and the GUI thread only has to show the finished rows.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from calendar_api.store import event_bounds
+
+
+def _time_icon(hour: int) -> str:
+    """Icon for the time of day an event starts"""
+    if 6 <= hour < 12:
+        return "🌅"
+    elif 12 <= hour < 18:
+        return "☀️"
+    elif 18 <= hour < 22:
+        return "🌆"
+    return "🌙"
+
+
+def _date_display(day, today) -> str:
+    if day == today:
+        return "Today"
+    elif day == today + timedelta(days=1):
+        return "Tomorrow"
+    return day.strftime("%A, %B %d")
+
+
+class EventRow:
+    """Pre-formatted text of one event in the Calendar View"""
+
+    __slots__ = ('event_id', 'text', 'tooltip', 'start_ts')
+
+    def __init__(self, event_id: Optional[str], text: str, tooltip: str, start_ts: Optional[float]):
+        self.event_id = event_id
+        self.text = text
+        self.tooltip = tooltip
+        self.start_ts = start_ts
+
+
+def build_event_row(event: Dict, now: Optional[datetime] = None, with_details_hint: bool = False) -> EventRow:
+    """Format an API event for display"""
+    now = (now or datetime.now()).astimezone()
+    summary = event.get('summary', 'Untitled Event')
+    start_info = event.get('start', {})
+    start_time_str = start_info.get('dateTime', start_info.get('date', ''))
+
+    time_display = "No time"
+    date_display = ""
+    time_icon = "🕐"
+    start, _ = event_bounds(event)
+    if start is not None:
+        local_time = start.astimezone()
+        if 'dateTime' in start_info:
+            time_icon = _time_icon(local_time.hour)
+            time_display = local_time.strftime("%I:%M %p").lstrip('0')
+        else:  # All-day event
+            time_icon = "📅"
+            time_display = "All day"
+        date_display = _date_display(local_time.date(), now.date())
+    elif start_time_str:
+        time_display = start_time_str
+
+    text = f"{time_icon} {summary}\n📍 {date_display} at {time_display}"
+
+    # The synced copy is a partial event, so the full details (description,
+    # attendees) are fetched on double-click
+    tooltip_parts = [f"Event: {summary}"]
+    location = event.get('location', '')
+    if location:
+        tooltip_parts.append(f"Location: {location}")
+    if with_details_hint:
+        tooltip_parts.append("Double-click for details")
+
+    return EventRow(
+        event.get('id'),
+        text,
+        '\n'.join(tooltip_parts),
+        start.timestamp() if start is not None else None
+    )
+
+
+# Only the fields the list shows are kept per event
+ENTRY_FIELDS = ('id', 'summary', 'location', 'start', 'end')
+
+
+class EventEntry:
+    """Compact per-event record backing one row of the Calendar View"""
+
+    __slots__ = ('event_id', 'calendar_id', 'sort_key', 'version', 'event')
+
+    def __init__(self, event: Dict):
+        start, _ = event_bounds(event)
+        self.event_id = event.get('id')
+        # Set when the event was loaded with_calendar; details are fetched from this calendar
+        self.calendar_id = event.get('calendarId')
+        # Rows are ordered by start time; the id breaks ties so keys are unique
+        self.sort_key = (start.timestamp() if start is not None else float('inf'), self.event_id or '')
+        # etag/updated change whenever the event does
+        self.version = event.get('etag') or event.get('updated')
+        self.event = {key: event[key] for key in ENTRY_FIELDS if key in event}
+
+    def same_content(self, other: 'EventEntry') -> bool:
+        if self.version is not None and other.version is not None:
+            return self.version == other.version
+        return self.event == other.event
+
+
+def plan_list_update(old: List[EventEntry], new: List[EventEntry]):
+    """Work out the row operations that turn old into new (both sorted by sort_key).
+
+    Returns a list of operations to apply in order:
+      ('remove', first, last)   rows first..last inclusive
+      ('insert', first, entries)
+      ('change', row, entry)
+    Events whose start moved are removed and re-inserted at their new position.
+
+    This is one linear merge over compact entries and formats no rows. The
+    Calendar View re-reads its whole date range after a sync anyway (the range
+    slides with the clock and grows on scroll), so it diffs that list instead
+    of applying the sync's ChangeSet; only the row operations reach Qt.
+    """
+    new_by_id = {entry.event_id: entry for entry in new}
+    operations = []
+
+    # Removals, back to front so earlier indexes stay valid
+    kept = []
+    doomed = []
+    for index, entry in enumerate(old):
+        match = new_by_id.get(entry.event_id)
+        if match is None or match.sort_key != entry.sort_key:
+            doomed.append(index)
+        else:
+            kept.append(entry)
+    for first, last in reversed(_ranges(doomed)):
+        operations.append(('remove', first, last))
+
+    # kept is now a subsequence of new; walk both to find inserts and changes
+    pending: List[EventEntry] = []
+    pending_at = 0
+    k = 0
+    for row, entry in enumerate(new):
+        if k < len(kept) and kept[k].event_id == entry.event_id:
+            if pending:
+                operations.append(('insert', pending_at, pending))
+                pending = []
+            if not kept[k].same_content(entry):
+                operations.append(('change', row, entry))
+            k += 1
+        else:
+            if not pending:
+                pending_at = row
+            pending.append(entry)
+    if pending:
+        operations.append(('insert', pending_at, pending))
+    return operations
+
+
+def _ranges(indexes: List[int]):
+    """Group sorted indexes into inclusive (first, last) runs"""
+    runs = []
+    for index in indexes:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+    return [tuple(run) for run in runs]
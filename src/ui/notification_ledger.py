@@ -0,0 +1,118 @@
+"""
+Record of notifications already shown.
+
+Entries are keyed by (event id, start time, minutes before start), so a
+rescheduled event or a second reminder of the same event is announced again.
+Each entry expires a while after its event starts, when the reminder could no
+longer fire anyway. The ledger is capped in size and saved to notified.json in
+the application data directory, so reminders are not repeated after a restart.
+"""
+
+import heapq
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class NotificationLedger:
+    """Bounded set of shown reminders with time-based expiry"""
+
+    FILE_NAME = 'notified.json'
+    # How long after the event start an entry is kept
+    DEFAULT_TTL_SECONDS = 6 * 60 * 60
+    DEFAULT_MAX_ENTRIES = 2048
+
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> expiry; the heap orders the same entries by expiry for eviction
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self.load()
+
+    @staticmethod
+    def key(event_id: str, start_ts: float, minutes: int) -> str:
+        return f"{event_id}|{int(start_ts)}|{int(minutes)}"
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def contains(self, event_id: str, start_ts: float, minutes: int, now: Optional[float] = None) -> bool:
+        """Whether this reminder was already shown"""
+        expires = self._expiry.get(self.key(event_id, start_ts, minutes))
+        if expires is None:
+            return False
+        return expires > (time.time() if now is None else now)
+
+    def add(self, event_id: str, start_ts: float, minutes: int, now: Optional[float] = None):
+        """Record a shown reminder and save the ledger"""
+        self.add_all([(event_id, start_ts, minutes)], now)
+
+    def add_all(self, reminders: Iterable[Tuple[str, float, int]], now: Optional[float] = None):
+        """Record (event_id, start_ts, minutes) of several shown reminders with a single save"""
+        now = time.time() if now is None else now
+        added = False
+        for event_id, start_ts, minutes in reminders:
+            self._insert(self.key(event_id, start_ts, minutes), max(start_ts, now) + self.ttl_seconds)
+            added = True
+        if added:
+            self.evict(now)
+            self.save()
+
+    def _insert(self, key: str, expires: float):
+        self._expiry[key] = expires
+        heapq.heappush(self._heap, (expires, key))
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop expired entries, then the soonest-expiring ones beyond max_entries"""
+        now = time.time() if now is None else now
+        heap = self._heap
+        dropped = 0
+        while heap and (heap[0][0] <= now or len(self._expiry) > self.max_entries):
+            expires, key = heapq.heappop(heap)
+            # Skip heap entries superseded by a later add of the same key
+            if self._expiry.get(key) == expires:
+                del self._expiry[key]
+                dropped += 1
+        if len(heap) > 2 * len(self._expiry) + 64:
+            self._heap = [(expires, key) for key, expires in self._expiry.items()]
+            heapq.heapify(self._heap)
+        return dropped
+
+    def clear(self):
+        self._expiry.clear()
+        self._heap.clear()
+        self.save()
+
+    def load(self):
+        """Read the saved ledger, dropping expired entries"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            for key, expires in data.get('entries', []):
+                self._insert(key, float(expires))
+            self.evict()
+        except Exception as e:
+            print(f"Error loading notification ledger: {e}")
+            self._expiry.clear()
+            self._heap.clear()
+
+    def save(self):
+        """Write the ledger atomically"""
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            entries = [[key, int(expires)] for key, expires in self._expiry.items()]
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': entries}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving notification ledger: {e}")
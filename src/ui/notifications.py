@@ -1,106 +1,190 @@
 import sys
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from PyQt5 import QtWidgets, QtCore
 from config.settings import SettingsManager
+from calendar_api.reminders import ReminderSchedule, burst_message, event_reminder_minutes, starts_in_text
+from calendar_api.store import event_bounds
+from ui.notification_ledger import NotificationLedger
 
 class NotificationManager(QtCore.QObject):
-    """Manages event notifications for calendar events"""
+    """Manages event notifications for calendar events.
+
+    Reminder times are kept in a ReminderSchedule and a single-shot timer is
+    armed for the next one due, so notifications fire on time without
+    re-checking every event each minute.
+    """
+    
+    # Longest the timer sleeps before re-checking, so clock changes and
+    # suspend/resume cannot hold reminders back for long
+    MAX_TIMER_MS = 5 * 60 * 1000
+    # Reminders due within this many seconds of each other are shown as one
+    BURST_WINDOW_SECONDS = 5
     
     def __init__(self, tray_icon, parent=None, settings_manager: SettingsManager | None = None):
         super().__init__(parent)
         self.tray_icon = tray_icon
         # Allow injection so we share the instance with the tray
         self.settings_manager = settings_manager or SettingsManager()
-        self.notified_events = set()  # Track already notified events
+        # Reminders already shown, kept across restarts
+        self.ledger = NotificationLedger(self.settings_manager.app_data_dir / NotificationLedger.FILE_NAME)
+        # Upcoming events being scheduled, by id
+        self.events = {}
+        # Default reminders of each calendar, for events that use them
+        self.default_reminders = {}
+        self.schedule = ReminderSchedule()
+        # Created on first use, only if toasts are shown
+        self.toasts = None
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.fire_due_reminders)
     
-    def check_event_notifications(self, events):
-        """Check events and send notifications if needed"""
-        if not self.settings_manager.get_setting('notifications_enabled', True):
+    def reminder_minutes(self, event):
+        """Minutes before the start at which an event is announced: the app's own
+        notification time plus the event's Google Calendar popup reminders"""
+        minutes = {self.settings_manager.get_setting('notification_minutes', 15)}
+        if self.settings_manager.get_setting('use_calendar_reminders', True):
+            defaults = self.default_reminders.get(event.get('calendarId'))
+            minutes.update(event_reminder_minutes(event, defaults))
+        return minutes
+    
+    def set_default_reminders(self, default_reminders):
+        """Update the calendars' default reminders ({calendar_id: [{'method', 'minutes'}]})"""
+        if default_reminders == self.default_reminders:
             return
-        
-        notification_minutes = self.settings_manager.get_setting('notification_minutes', 15)
-        current_time = datetime.now()
-        # Determine tolerance window (in minutes) when the threshold is 0, to fire near event start
-        # We use a 1-minute tolerance to account for sync cadence.
-        start_tolerance_minutes = 1 if notification_minutes == 0 else 0
-        
-        for event in events:
+        self.default_reminders = dict(default_reminders)
+        self.reschedule()
+    
+    def reschedule(self):
+        """Rebuild the schedule from the tracked events (e.g. after a settings change)"""
+        try:
+            self.schedule.rebuild((event, self.reminder_minutes(event)) for event in self.events.values())
+        except Exception as e:
+            print(f"Error scheduling event notifications: {e}")
+        self._arm_timer()
+    
+    def _schedule_event(self, event):
+        try:
+            self.schedule.add(event, self.reminder_minutes(event))
+        except Exception as e:
+            print(f"Error scheduling event notification: {e}")
+    
+    def apply_changes(self, changes):
+        """React to what changed in the upcoming events since the last snapshot"""
+        # Ids that left the window no longer need tracking
+        for event in changes.removed:
             event_id = event.get('id')
-            if event_id in self.notified_events:
-                continue
-            
-            # Parse event start time
-            start = event.get('start', {})
-            start_time_str = start.get('dateTime') or start.get('date')
-            
-            if not start_time_str:
+            self.events.pop(event_id, None)
+            self.schedule.remove(event_id)
+        # The ledger is keyed by start time, so a moved event gets a fresh reminder
+        if changes.moved:
+            self.show_reschedule_notifications(changes.moved)
+        for event in changes.upserts:
+            self.events[event.get('id')] = event
+            self._schedule_event(event)
+        self._arm_timer()
+    
+    def _arm_timer(self):
+        """Point the timer at the next due reminder"""
+        due = self.schedule.next_due()
+        if due is None or not self.settings_manager.get_setting('notifications_enabled', True):
+            self.timer.stop()
+            return
+        delay_ms = max(0, int((due - time.time()) * 1000))
+        self.timer.start(min(delay_ms, self.MAX_TIMER_MS))
+    
+    def fire_due_reminders(self):
+        """Show every reminder that is due, merged into one notification, and re-arm the timer"""
+        now = time.time()
+        enabled = self.settings_manager.get_setting('notifications_enabled', True)
+        burst = []
+        # Reminders a few seconds apart are announced together
+        for reminder in self.schedule.pop_due(now + self.BURST_WINDOW_SECONDS):
+            if not enabled or self.ledger.contains(reminder.event_id, reminder.start_ts, reminder.minutes, now):
                 continue
-            
+            burst.append(reminder)
+        try:
+            if len(burst) == 1:
+                reminder = burst[0]
+                self.show_event_notification(reminder.event, (reminder.start_ts - now) / 60)
+            elif burst:
+                self.notify(*burst_message(burst, now))
+        except Exception as e:
+            print(f"Error showing event notification: {e}")
+        # One write of notified.json per pass, however many reminders fired
+        self.ledger.add_all(((r.event_id, r.start_ts, r.minutes) for r in burst), now)
+        self._arm_timer()
+    
+    def _reschedule_line(self, event):
+        """'Summary\nNow at 3:00 PM' for a moved future timed event, else None"""
+        start, _ = event_bounds(event)
+        if start is None or 'date' in (event.get('start') or {}):
+            return None  # all-day events are skipped, as for reminders
+        if start <= datetime.now(start.tzinfo):
+            return None
+        when = start.astimezone()
+        line = f"{event.get('summary', 'Untitled Event')}\nNow at {when.strftime('%I:%M %p').lstrip('0')}"
+        if when.date() != datetime.now().date():
+            line += f" on {when.strftime('%a, %b %d')}"
+        return line
+    
+    def show_reschedule_notifications(self, moved):
+        """Tell the user upcoming events were moved; several moves make one notification"""
+        if not self.settings_manager.get_setting('notifications_enabled', True):
+            return
+        if not self.settings_manager.get_setting('notify_reschedules', True):
+            return
+        lines = []
+        for _, new in moved:
             try:
-                # Parse the start time
-                if 'T' in start_time_str:  # DateTime format
-                    # Parse ISO time and convert to local naive time for comparison consistency
-                    event_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                    if event_time.tzinfo:
-                        # Convert to local time then drop tzinfo for naive comparison
-                        event_time = event_time.astimezone().replace(tzinfo=None)
-                else:  # Date format (all-day event)
-                    continue  # Skip all-day events for notifications
-                
-                # Check if we should notify
-                time_until_event = event_time - current_time
-                minutes_until_event = time_until_event.total_seconds() / 60
-                
-                # Fire when we are within the pre-event window. If set to 0, allow a small tolerance around start time.
-                if notification_minutes > 0 and 0 <= minutes_until_event <= notification_minutes:
-                    self.show_event_notification(event, minutes_until_event)
-                    self.notified_events.add(event_id)
-                # For 'At start', only notify at or after the start time (no early heads-up).
-                # Allow a small late tolerance window to account for sync cadence.
-                elif notification_minutes == 0 and -start_tolerance_minutes <= minutes_until_event <= 0:
-                    self.show_event_notification(event, minutes_until_event)
-                    self.notified_events.add(event_id)
-                    
+                line = self._reschedule_line(new)
             except Exception as e:
-                print(f"Error parsing event time: {e}")
+                print(f"Error formatting rescheduled event: {e}")
                 continue
+            if line:
+                lines.append(line)
+        if len(lines) == 1:
+            self.notify("Event Rescheduled", lines[0])
+        elif lines:
+            shown = [line.replace('\n', ' – ') for line in lines[:4]]
+            if len(lines) > 4:
+                shown.append(f"and {len(lines) - 4} more")
+            self.notify(f"{len(lines)} events rescheduled", "\n".join(shown))
     
     def show_event_notification(self, event, minutes_until):
         """Show notification for an upcoming event"""
-        title = "Calendar Event"
         summary = event.get('summary', 'Untitled Event')
-        minutes_setting = self.settings_manager.get_setting('notification_minutes', 15)
-        # Improve message for at-start notifications
-        if minutes_setting == 0:
-            # If we're close to start time, say "Starting now"; otherwise if we somehow ran slightly early, show minutes
-            if abs(minutes_until) <= 1:
-                message = f"{summary}\nStarting now"
-            else:
-                message = f"{summary}\nStarting in {int(round(minutes_until))} minutes"
-        else:
-            if minutes_until <= 1:
-                message = f"{summary}\nStarting now"
-            else:
-                message = f"{summary}\nStarting in {int(minutes_until)} minutes"
-        
-        # Show system tray notification
-        if self.tray_icon.isSystemTrayAvailable():
+        self.notify("Calendar Event", f"{summary}\n{starts_in_text(minutes_until)}")
+    
+    def notify(self, title, message):
+        """Show a notification as a tray message, or as a desktop toast"""
+        use_toasts = self.settings_manager.get_setting('desktop_toasts', False)
+        if not use_toasts and self.tray_icon.isSystemTrayAvailable() and self.tray_icon.supportsMessages():
             self.tray_icon.showMessage(
                 title,
                 message,
                 QtWidgets.QSystemTrayIcon.Information,
-                5000  # 5 seconds
+                ToastPool.DISPLAY_MS
             )
+        else:
+            if self.toasts is None:
+                self.toasts = ToastPool(self)
+            self.toasts.show_toast(title, message)
         
         # Log for debugging
         print(f"Notification: {message}")
     
     def clear_notified_events(self):
-        """Clear the list of notified events (call daily or when refreshing)"""
-        self.notified_events.clear()
+        """Forget which reminders were shown"""
+        self.ledger.clear()
 
 class DesktopNotification(QtWidgets.QDialog):
-    """Custom desktop notification widget"""
+    """Custom desktop notification widget.
+    
+    Instances are reused by ToastPool, which also positions and hides them.
+    """
+    
+    clicked = QtCore.pyqtSignal()
     
     def __init__(self, title, message, parent=None):
         super().__init__(parent)
@@ -111,13 +195,7 @@ class DesktopNotification(QtWidgets.QDialog):
             QtCore.Qt.FramelessWindowHint |
             QtCore.Qt.Tool
         )
-        
-        # Position in bottom-right corner
-        screen = QtWidgets.QApplication.desktop().screenGeometry()
-        self.move(screen.width() - self.width() - 20, screen.height() - self.height() - 100)
-        
         self.setup_ui(title, message)
-        self.setup_timer()
     
     def setup_ui(self, title, message):
         """Setup the notification UI"""
@@ -125,15 +203,15 @@ class DesktopNotification(QtWidgets.QDialog):
         layout.setContentsMargins(15, 10, 15, 10)
         
         # Title
-        title_label = QtWidgets.QLabel(title)
-        title_label.setStyleSheet("font-weight: bold; font-size: 14px; color: #333;")
-        layout.addWidget(title_label)
+        self.title_label = QtWidgets.QLabel(title)
+        self.title_label.setStyleSheet("font-weight: bold; font-size: 14px; color: #333;")
+        layout.addWidget(self.title_label)
         
         # Message
-        message_label = QtWidgets.QLabel(message)
-        message_label.setWordWrap(True)
-        message_label.setStyleSheet("color: #666; font-size: 12px;")
-        layout.addWidget(message_label)
+        self.message_label = QtWidgets.QLabel(message)
+        self.message_label.setWordWrap(True)
+        self.message_label.setStyleSheet("color: #666; font-size: 12px;")
+        layout.addWidget(self.message_label)
         
         # Close button
         close_btn = QtWidgets.QPushButton("×")
@@ -149,7 +227,7 @@ class DesktopNotification(QtWidgets.QDialog):
                 background-color: #999;
             }
         """)
-        close_btn.clicked.connect(self.close)
+        close_btn.clicked.connect(self.clicked.emit)
         
         # Position close button in top-right
         close_layout = QtWidgets.QHBoxLayout()
@@ -168,21 +246,94 @@ class DesktopNotification(QtWidgets.QDialog):
             }
         """)
     
-    def setup_timer(self):
-        """Setup auto-close timer"""
-        self.close_timer = QtCore.QTimer()
-        self.close_timer.timeout.connect(self.close)
-        self.close_timer.start(5000)  # Auto-close after 5 seconds
+    def set_content(self, title, message):
+        """Reuse the widget for another notification"""
+        self.setWindowTitle(title)
+        self.title_label.setText(title)
+        self.message_label.setText(message)
     
     def mousePressEvent(self, event):
-        """Close on click"""
-        self.close()
-    
-    def closeEvent(self, event):
-        """Clean up timer on close"""
-        if hasattr(self, 'close_timer'):
-            self.close_timer.stop()
-        super().closeEvent(event)
+        """Dismiss on click"""
+        self.clicked.emit()
+
+class ToastPool(QtCore.QObject):
+    """Stack of desktop toasts in the bottom-right corner.
+    
+    A few DesktopNotification widgets are created on demand and recycled, and
+    one shared timer slides them into place and hides expired ones. The timer
+    only runs while a toast is visible or moving.
+    """
+    
+    MAX_TOASTS = 3
+    DISPLAY_MS = 5000
+    FRAME_MS = 16
+    SPACING = 10
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._idle = []  # hidden toasts ready for reuse
+        self._active = []  # [toast, expires_at], newest first
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.FRAME_MS)
+        self.timer.timeout.connect(self._tick)
+    
+    def show_toast(self, title, message):
+        """Show a toast on top of the stack, reusing a widget when possible"""
+        if self._idle:
+            toast = self._idle.pop()
+        elif len(self._active) >= self.MAX_TOASTS:
+            # Recycle the oldest visible toast
+            toast = self._active.pop()[0]
+        else:
+            toast = DesktopNotification(title, message)
+            toast.clicked.connect(lambda toast=toast: self.dismiss(toast))
+        toast.set_content(title, message)
+        # Enter from just below the stack's bottom slot
+        x, y = self._slot(toast, 0)
+        toast.move(x, y + toast.height())
+        toast.show()
+        self._active.insert(0, [toast, time.monotonic() + self.DISPLAY_MS / 1000])
+        # Back to frame rate, also if the timer was sleeping until an expiry
+        self.timer.start(self.FRAME_MS)
+    
+    def dismiss(self, toast):
+        """Hide a toast now and keep it for reuse"""
+        for entry in self._active:
+            if entry[0] is toast:
+                entry[1] = 0
+        self._tick()
+    
+    def _slot(self, toast, index):
+        """Top-left corner of the index-th toast from the bottom"""
+        screen = QtWidgets.QApplication.desktop().availableGeometry()
+        x = screen.right() - toast.width() - 20
+        y = screen.bottom() - (index + 1) * (toast.height() + self.SPACING) - 10
+        return x, y
+    
+    def _tick(self):
+        now = time.monotonic()
+        for entry in [e for e in self._active if e[1] <= now]:
+            self._active.remove(entry)
+            entry[0].hide()
+            self._idle.append(entry[0])
+        moving = False
+        for index, (toast, _) in enumerate(self._active):
+            x, target = self._slot(toast, index)
+            y = toast.y()
+            if y != target:
+                # Ease towards the slot; snap when close
+                step = (target - y) * 0.3
+                y = target if abs(step) < 1 else int(y + step)
+                toast.move(x, y)
+                moving = True
+        if not self._active:
+            self.timer.stop()
+        elif not moving:
+            # Settled: sleep until the next toast expires
+            next_expiry = min(e[1] for e in self._active)
+            self.timer.start(max(self.FRAME_MS, int((next_expiry - now) * 1000)))
+            return
+        self.timer.setInterval(self.FRAME_MS)
 
 # Legacy functions for backward compatibility
 def show_notification(title, message):
@@ -16,7 +16,7 @@ class SetupWizard(QtWidgets.QWizard):
         else:
             self.oauth_handler = oauth_handler
 
-    self.setWindowTitle("Calendar Now - Setup")
+        self.setWindowTitle("Calendar Now - Setup")
         self.setFixedSize(500, 400)
         # Use resource_path so it works in frozen builds
         self.setWindowIcon(QtGui.QIcon(resource_path("resources/icons/app_icon.png")))
@@ -36,7 +36,7 @@ class SetupWizard(QtWidgets.QWizard):
     def create_welcome_page(self):
         """Create welcome page"""
         page = QtWidgets.QWizardPage()
-    page.setTitle("Welcome to Calendar Now")
+        page.setTitle("Welcome to Calendar Now")
         page.setSubTitle("This wizard will help you set up your Google Calendar integration.")
         
         layout = QtWidgets.QVBoxLayout()
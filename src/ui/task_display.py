@@ -8,32 +8,63 @@ from tkinter import ttk
 import math
 from datetime import datetime, timedelta
 import queue
-from dateutil import parser, tz
-from PyQt5 import QtCore
+from dateutil import tz
+from calendar_api.diff import diff_events
+from calendar_api.events import EventIndex
+from calendar_api.store import event_bounds
+from config.settings import Config
+from utils.timeparse import parse_event_time
+from utils.helpers import mark_startup
 
 
 class TaskDisplayWindow:
-    """Main task display window showing current and next events"""
+    """Main task display window showing current and next events.
+
+    The window has no refresh timer of its own. It re-renders when the feed
+    publishes new events and when the sync scheduler's clock reports a new
+    minute. Other threads never touch Tk: they put commands on a queue that
+    the Tk thread drains with a cheap after() poll.
+    """
+    
+    # Command polling backs off while no commands arrive
+    POLL_MIN_MS = 50
+    POLL_MAX_MS = 500
     
-    def __init__(self, calendar_client, settings_manager):
-        self.calendar_client = calendar_client
+    def __init__(self, event_feed, settings_manager, clock=None):
+        # Today's events are loaded off this thread by the feed; the Tk thread
+        # only reads the latest snapshot and renders it
+        self.event_feed = event_feed
         self.settings_manager = settings_manager
+        # SyncScheduler (or anything with subscribe_minutes) that drives the clock
+        self.clock = clock
         self.command_queue = queue.Queue()
+        # Set once the Tk main loop runs; until then queued commands wait for start()
+        self._running = False
+        self._poll_ms = self.POLL_MIN_MS
 
         self.load_settings()
 
         self.root = tk.Tk()
         self.setup_window()
         self.create_widgets()
-        # Start command polling on Tk thread
-        self.root.after(100, self.poll_commands)
 
         # Variables for dragging
         self.start_x = 0
         self.start_y = 0
 
-        # Auto-refresh timer
-        self.refresh_seconds = 30
+        # Whether the first frame (from the cached snapshot) has been drawn
+        self._rendered = False
+        
+        # Today's events indexed by time; updated from each new snapshot
+        self.event_index = EventIndex()
+        self._indexed = {}
+        self._index_version = 0
+        
+        # Re-render as soon as the feed publishes new events, and as each minute starts
+        if self.event_feed:
+            self.event_feed.subscribe(self._on_snapshot)
+        if self.clock:
+            self.clock.subscribe_minutes(self.request_refresh)
         
     def load_settings(self):
         """Load appearance settings"""
@@ -265,6 +296,7 @@ class TaskDisplayWindow:
 
     # ------------- Thread-safe command processing -------------
     def enqueue_command(self, name, payload=None):
+        """Queue a command for the Tk thread; safe from any thread and never blocks"""
         try:
             self.command_queue.put((name, payload), block=False)
         except Exception:
@@ -282,10 +314,32 @@ class TaskDisplayWindow:
     def request_close(self):
         self.enqueue_command('close', None)
 
+    def request_refresh(self):
+        self.enqueue_command('refresh', None)
+
+    def _on_snapshot(self, snapshot):
+        # Called on the feed thread; hand over to the Tk thread
+        self.request_refresh()
+
     def poll_commands(self):
+        """Drain the command queue and schedule the next poll (Tk thread)"""
+        if not self._running:
+            return
+        handled = self.process_commands()
+        if not self._running:
+            # A close command ran
+            return
+        # Quickly right after a command, slower while idle
+        self._poll_ms = self.POLL_MIN_MS if handled else min(self._poll_ms * 2, self.POLL_MAX_MS)
+        self.root.after(self._poll_ms, self.poll_commands)
+
+    def process_commands(self):
+        """Run every queued command (Tk thread). Returns True if there were any."""
+        handled = refresh = False
         try:
             while True:
                 name, payload = self.command_queue.get_nowait()
+                handled = True
                 if name == 'reload':
                     self.load_settings()
                     self.apply_styles()
@@ -295,11 +349,13 @@ class TaskDisplayWindow:
                     self._show_window()
                 elif name == 'close':
                     self._close()
+                elif name == 'refresh':
+                    # Several queued refreshes render once
+                    refresh = True
         except queue.Empty:
-            pass
-        finally:
-            # keep polling
-            self.root.after(100, self.poll_commands)
+            if refresh:
+                self.update_display()
+        return handled
         
     def _hide_window(self):
         """Hide the task display window"""
@@ -324,6 +380,11 @@ class TaskDisplayWindow:
 
     def _close(self):
         """Helper to close the window from the tkinter thread"""
+        self._running = False
+        if self.event_feed:
+            self.event_feed.unsubscribe(self._on_snapshot)
+        if self.clock:
+            self.clock.unsubscribe_minutes(self.request_refresh)
         try:
             self.root.quit()
             self.root.destroy()
@@ -333,44 +394,37 @@ class TaskDisplayWindow:
         
     def parse_event_time(self, ev_time):
         """Parse event time from Google Calendar API response"""
-        if "dateTime" in ev_time:
-            dt = parser.isoparse(ev_time["dateTime"])
-            return dt
-        elif "date" in ev_time:
-            # All-day event
-            return parser.isoparse(ev_time["date"]).replace(tzinfo=tz.tzutc()).astimezone(tz.tzlocal())
-        else:
-            return None
-            
-    def find_now_and_next(self, events):
-        """Find current and next events from event list"""
-        local_now = datetime.now(tz.tzlocal())
-        current = None
-        nxt = None
-        
-        # Parse events
-        parsed = []
-        for ev in events:
-            start = ev.get("start", {})
-            end = ev.get("end", {})
-            try:
-                start_dt = self.parse_event_time(start)
-                end_dt = self.parse_event_time(end)
-                parsed.append((start_dt, end_dt, ev.get("summary", "(no title)")))
-            except Exception:
-                continue
-                
-        # Find current event
-        for s, e, summary in parsed:
-            if s and e and s <= local_now < e:
-                current = (s, e, summary)
-                break
-                
-        # Find next event
-        future = sorted([p for p in parsed if p[0] and p[0] > local_now], key=lambda x: x[0])
-        if future:
-            nxt = future[0]
+        # All-day events start at local midnight
+        return parse_event_time(ev_time)
             
+    def _sync_index(self, snapshot):
+        """Bring the interval index in line with a new snapshot, applying only what changed"""
+        if snapshot.version == self._index_version:
+            return
+        if snapshot.version == self._index_version + 1:
+            changes = snapshot.changes
+        else:
+            # Skipped a snapshot in between; diff against what is indexed
+            changes = diff_events(self._indexed, snapshot.events)
+        self.event_index.apply_changes(changes.upserts, changes.removed_ids)
+        self._indexed = snapshot.by_id
+        self._index_version = snapshot.version
+    
+    def find_now_and_next(self, events=None):
+        """Find current and next events; (start, end, summary) tuples or None.
+        Uses the interval index unless an explicit event list is given."""
+        index = EventIndex.from_events(events) if events is not None else self.event_index
+        now = datetime.now(tz.tzlocal()).timestamp()
+        
+        def describe(ev):
+            start, end = event_bounds(ev)
+            return start, end, ev.get("summary", "(no title)")
+        
+        # Earliest-starting event in progress, then the next start after now
+        in_progress = index.at(now)
+        current = describe(in_progress[0]) if in_progress else None
+        upcoming = index.next_after(now)
+        nxt = describe(upcoming) if upcoming is not None else None
         return current, nxt
         
     def pretty_time(self, dt):
@@ -411,10 +465,14 @@ class TaskDisplayWindow:
                 time_str = current_time.strftime("%I:%M\n%p").lstrip("0")
                 self.time_label.config(text=time_str)
                 
-                # Get today's events
-                if self.calendar_client:
-                    events = self.calendar_client.get_today_events()
-                    current, nxt = self.find_now_and_next(events)
+                # Get today's events from the latest snapshot (no I/O on the Tk thread)
+                snapshot = self.event_feed.snapshot if self.event_feed else None
+                if snapshot and not snapshot.is_loaded:
+                    # The feed is still reading the local store; keep "Loading"
+                    return
+                if snapshot:
+                    self._sync_index(snapshot)
+                    current, nxt = self.find_now_and_next()
                     
                     if current:
                         s, e, title = current
@@ -435,6 +493,9 @@ class TaskDisplayWindow:
                     
                 # Auto-resize window
                 self.auto_resize()
+                if not self._rendered:
+                    self._rendered = True
+                    mark_startup('overlay_rendered', Config.STARTUP_TARGET_MS)
                 
             except Exception as ex:
                 print(f"Error updating display: {ex}")
@@ -472,16 +533,12 @@ class TaskDisplayWindow:
             
         self.root.geometry(f"{final_width}x{final_height}{pos_part}")
         
-    def auto_refresh(self):
-        """Auto-refresh the display periodically"""
-        self.update_display()
-        # Schedule next refresh in the main thread
-        self.root.after(self.refresh_seconds * 1000, self.auto_refresh)
-        
     def start(self):
         """Start the task display window"""
+        self._running = True
         self.update_display()
-        self.auto_refresh()
+        # Also picks up commands queued before the main loop ran (e.g. an early snapshot)
+        self.root.after(0, self.poll_commands)
         
     def run(self):
         """Run the task display window (blocking)"""
@@ -1,25 +1,48 @@
 import sys
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from PyQt5 import QtWidgets, QtGui, QtCore
 from utils.helpers import resource_path
+from utils.timeparse import refresh_local_zone
 from auth.oauth import OAuthHandler
 from ui.setup_wizard import SetupWizard
 from ui.notifications import NotificationManager
 from ui.task_display import TaskDisplayWindow
+from ui.event_list_model import EventListModel
+from ui.event_rows import EventEntry
+from ui.workers import LatestTaskRunner
 from calendar_api.client import GoogleCalendarClient
-from config.settings import SettingsManager
+from calendar_api.reminders import load_reminder_events
+from calendar_api.scheduler import AdaptiveCadence, SyncScheduler
+from calendar_api.service import CalendarServiceProvider
+from calendar_api.snapshot import EventFeed
+from calendar_api.store import EventStore, event_bounds
+from calendar_api.sync import SyncEngine
+from config.settings import Config, SettingsManager
 
 class MainWindow(QtWidgets.QMainWindow):
     """Main application window for calendar view"""
     
-    def __init__(self, oauth_handler, parent=None):
+    DAYS_AHEAD_STEP = 30
+    MAX_DAYS_AHEAD = 365
+    
+    def __init__(self, oauth_handler, event_store, sync_callback=None, details_callback=None, parent=None):
         super().__init__(parent)
         self.oauth_handler = oauth_handler
         self.settings_manager = SettingsManager()
-        self.calendar_client = None
+        # Events are read from the local store; syncing is owned by the tray
+        self.event_store = event_store
+        self.sync_callback = sync_callback
+        # Fetches a full event resource by id (the store only keeps list fields)
+        self.details_callback = details_callback
+        # Runs event loading off the GUI thread
+        self.loader = LatestTaskRunner(parent=self)
+        # Fetches event details off the GUI thread; a newer click supersedes an older one
+        self.details_loader = LatestTaskRunner(parent=self)
+        # Date range shown; grows as the list is scrolled to the end
+        self.days_ahead = self.DAYS_AHEAD_STEP
         
-    self.setWindowTitle("Calendar Now - Calendar View")
+        self.setWindowTitle("Calendar Now - Calendar View")
         self.setGeometry(100, 100, 900, 700)
         self.setWindowIcon(QtGui.QIcon(resource_path("resources/icons/app_icon.png")))
         self.setMinimumSize(600, 400)
@@ -33,7 +56,6 @@ class MainWindow(QtWidgets.QMainWindow):
         """)
         
         self.init_ui()
-        self.init_calendar_client()
         self.load_events()
     
     def init_ui(self):
@@ -121,7 +143,7 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Refresh button with icon
         self.refresh_btn = QtWidgets.QPushButton("🔄 Refresh Events")
-        self.refresh_btn.clicked.connect(self.load_events)
+        self.refresh_btn.clicked.connect(self.refresh_events)
         buttons_layout.addWidget(self.refresh_btn)
         
         header_layout.addLayout(buttons_layout)
@@ -155,16 +177,16 @@ class MainWindow(QtWidgets.QMainWindow):
         events_layout.addWidget(events_header)
         
         # Events list with modern styling
-        self.events_list = QtWidgets.QListWidget()
+        self.events_list = QtWidgets.QListView()
         self.events_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #fafafa;
                 border: none;
                 border-radius: 8px;
                 padding: 10px;
                 selection-background-color: #e3f2fd;
             }
-            QListWidget::item {
+            QListView::item {
                 background-color: white;
                 border: 1px solid #e0e0e0;
                 border-radius: 8px;
@@ -173,25 +195,38 @@ class MainWindow(QtWidgets.QMainWindow):
                 font-size: 14px;
                 line-height: 1.4;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #f5f5f5;
                 border-color: #4285F4;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #e3f2fd;
                 border-color: #4285F4;
                 color: #1565C0;
             }
-            QListWidget::item:disabled {
+            QListView::item:disabled {
                 background-color: #f9f9f9;
                 color: #999999;
                 border-color: #f0f0f0;
             }
         """)
+        # Rows are formatted lazily by the model as they scroll into view
+        self.events_model = EventListModel(with_details_hint=self.details_callback is not None, parent=self)
+        self.events_model.more_requested.connect(self.load_more_events)
+        self.events_list.setModel(self.events_model)
+        self.events_list.setUniformItemSizes(True)
         self.events_list.setAlternatingRowColors(False)
         self.events_list.setSpacing(2)
+        self.events_list.doubleClicked.connect(self.show_event_details)
         events_layout.addWidget(self.events_list)
         
+        # Shown instead of the list when there is nothing to list
+        self.empty_label = QtWidgets.QLabel("📭 No upcoming events found")
+        self.empty_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.empty_label.setStyleSheet("color: #999999; font-style: italic; font-size: 14px;")
+        self.empty_label.hide()
+        events_layout.addWidget(self.empty_label)
+        
         main_layout.addWidget(events_section)
         
         # Status bar with modern styling
@@ -210,157 +245,121 @@ class MainWindow(QtWidgets.QMainWindow):
         """)
         self.statusbar.showMessage("🔄 Ready - Click refresh to load events")
     
-    def init_calendar_client(self):
-        """Initialize Google Calendar client"""
-        try:
-            credentials = self.oauth_handler.get_credentials()
-            if credentials:
-                self.calendar_client = GoogleCalendarClient(credentials)
-                self.statusbar.showMessage("✅ Connected to Google Calendar")
-            else:
-                self.statusbar.showMessage("⚠️ Not connected to Google Calendar - Please check authentication")
-        except Exception as e:
-            self.statusbar.showMessage(f"❌ Error connecting to Google Calendar: {e}")
+    def refresh_events(self):
+        """Sync with Google Calendar, then reload the list from the store"""
+        if self.sync_callback:
+            self.sync_callback()
+        self.load_events()
     
     def load_events(self):
         """Load and display calendar events"""
-        if not self.calendar_client:
-            self.init_calendar_client()
-            if not self.calendar_client:
-                return
+        self.statusbar.showMessage("🔄 Loading events...")
+        self.refresh_btn.setText("🔄 Loading...")
+        self.refresh_btn.setEnabled(False)
         
-        try:
-            self.statusbar.showMessage("🔄 Loading events...")
-            self.refresh_btn.setText("🔄 Loading...")
-            self.refresh_btn.setEnabled(False)
-            
-            # Use QTimer to make UI responsive during loading
-            QtCore.QTimer.singleShot(100, self._load_events_async)
-            
-        except Exception as e:
-            self.statusbar.showMessage(f"❌ Error loading events: {e}")
-            self.refresh_btn.setText("🔄 Refresh Events")
-            self.refresh_btn.setEnabled(True)
+        # Query on a pool thread; a newer refresh supersedes this one
+        days_ahead = self.days_ahead
+        
+        def load(is_cancelled):
+            now = datetime.now(timezone.utc)
+            # Tagged with their calendar so details are fetched from the right one
+            events = self.event_store.get_events_between(now, now + timedelta(days=days_ahead), with_calendar=True)
+            entries = []
+            for event in events:
+                if is_cancelled():
+                    return None
+                entries.append(EventEntry(event))
+            return entries
+        
+        self.loader.submit(load, self._show_entries, self._show_load_error)
     
-    def _load_events_async(self):
-        """Async helper for loading events"""
-        try:
-            events = self.calendar_client.list_events(max_results=20)
-            
-            self.events_list.clear()
-            
-            if not events:
-                item = QtWidgets.QListWidgetItem("📭 No upcoming events found")
-                item.setFlags(item.flags() & ~QtCore.Qt.ItemIsEnabled)
-                # Style for empty state
-                font = item.font()
-                font.setItalic(True)
-                item.setFont(font)
-                self.events_list.addItem(item)
-                self.statusbar.showMessage("📭 No upcoming events")
-            else:
-                from datetime import datetime, timezone
-                import dateutil.parser
-                
-                for event in events:
-                    summary = event.get('summary', 'Untitled Event')
-                    start = event.get('start', {})
-                    start_time_str = start.get('dateTime', start.get('date', ''))
-                    
-                    # Parse and format the time
-                    time_display = "No time"
-                    date_display = ""
-                    time_icon = "🕐"
-                    
-                    if start_time_str:
-                        try:
-                            if 'T' in start_time_str:  # DateTime format
-                                parsed_time = dateutil.parser.isoparse(start_time_str)
-                                if parsed_time.tzinfo is None:
-                                    parsed_time = parsed_time.replace(tzinfo=timezone.utc)
-                                
-                                local_time = parsed_time.astimezone()
-                                now = datetime.now(timezone.utc).astimezone()
-                                
-                                # Determine time icon based on time of day
-                                hour = local_time.hour
-                                if 6 <= hour < 12:
-                                    time_icon = "🌅"
-                                elif 12 <= hour < 18:
-                                    time_icon = "☀️"
-                                elif 18 <= hour < 22:
-                                    time_icon = "🌆"
-                                else:
-                                    time_icon = "🌙"
-                                
-                                # Format date and time
-                                if local_time.date() == now.date():
-                                    date_display = "Today"
-                                elif local_time.date() == (now.date() + timedelta(days=1)):
-                                    date_display = "Tomorrow"
-                                else:
-                                    date_display = local_time.strftime("%A, %B %d")
-                                
-                                time_display = local_time.strftime("%I:%M %p").lstrip('0')
-                                
-                            else:  # Date only format (all-day event)
-                                parsed_date = dateutil.parser.isoparse(start_time_str).date()
-                                now_date = datetime.now().date()
-                                time_icon = "📅"
-                                
-                                if parsed_date == now_date:
-                                    date_display = "Today"
-                                elif parsed_date == now_date + timedelta(days=1):
-                                    date_display = "Tomorrow"
-                                else:
-                                    date_display = parsed_date.strftime("%A, %B %d")
-                                
-                                time_display = "All day"
-                                
-                        except Exception as parse_error:
-                            print(f"Error parsing time: {parse_error}")
-                            time_display = start_time_str
-                    
-                    # Create rich text for the item
-                    item_text = f"{time_icon} {summary}\n📍 {date_display} at {time_display}"
-                    
-                    item = QtWidgets.QListWidgetItem(item_text)
-                    
-                    # Add tooltip with full event details
-                    description = event.get('description', '')
-                    location = event.get('location', '')
-                    tooltip_parts = [f"Event: {summary}"]
-                    if location:
-                        tooltip_parts.append(f"Location: {location}")
-                    if description:
-                        tooltip_parts.append(f"Description: {description[:100]}{'...' if len(description) > 100 else ''}")
-                    item.setToolTip('\n'.join(tooltip_parts))
-                    
-                    self.events_list.addItem(item)
-                
-                self.statusbar.showMessage(f"✅ Loaded {len(events)} events successfully")
-            
-            self.refresh_btn.setText("🔄 Refresh Events")
-            self.refresh_btn.setEnabled(True)
-            
-        except Exception as e:
-            self.events_list.clear()
-            error_item = QtWidgets.QListWidgetItem(f"❌ Error loading events: {str(e)}")
-            error_item.setFlags(error_item.flags() & ~QtCore.Qt.ItemIsEnabled)
-            self.events_list.addItem(error_item)
-            
-            self.statusbar.showMessage(f"❌ Error loading events: {e}")
-            self.refresh_btn.setText("🔄 Retry")
-            self.refresh_btn.setEnabled(True)
+    def load_more_events(self):
+        """Extend the date range when the list is scrolled to the end"""
+        self.days_ahead = min(self.days_ahead + self.DAYS_AHEAD_STEP, self.MAX_DAYS_AHEAD)
+        self.load_events()
+    
+    def _show_entries(self, entries):
+        """Apply loaded events to the model as incremental row changes (GUI thread)"""
+        self.events_model.set_entries(entries, can_fetch_more=self.days_ahead < self.MAX_DAYS_AHEAD)
+        self.empty_label.setText("📭 No upcoming events found")
+        self.empty_label.setVisible(not entries)
+        self.events_list.setVisible(bool(entries))
+        
+        if entries:
+            self.statusbar.showMessage(f"✅ Loaded {len(entries)} events successfully")
+        else:
+            self.statusbar.showMessage("📭 No upcoming events")
+        
+        self.refresh_btn.setText("🔄 Refresh Events")
+        self.refresh_btn.setEnabled(True)
+    
+    def _show_load_error(self, message):
+        # Keep the last good rows; they are still the best we have
+        if not self.events_model.rowCount():
+            self.empty_label.setText(f"❌ Error loading events: {message}")
+            self.empty_label.show()
+            self.events_list.hide()
+        
+        self.statusbar.showMessage(f"❌ Error loading events: {message}")
+        self.refresh_btn.setText("🔄 Retry")
+        self.refresh_btn.setEnabled(True)
+    
+    def show_event_details(self, index):
+        """Fetch the full event on demand and show its details"""
+        event_id = self.events_model.event_id(index)
+        if not event_id or not self.details_callback:
+            return
+        
+        self.statusbar.showMessage("🔄 Loading event details...")
+        calendar_id = self.events_model.calendar_id(index) or 'primary'
+        # The API round trip runs on a pool thread; the dialog opens when it returns
+        self.details_loader.submit(
+            lambda is_cancelled: self.details_callback(event_id, calendar_id),
+            self._show_event_details,
+            self._show_details_error
+        )
+    
+    def _show_details_error(self, message):
+        self.statusbar.showMessage(f"❌ Could not load event details: {message}")
+    
+    def _show_event_details(self, event):
+        """Show a fetched event in a message box (GUI thread)"""
+        if not event:
+            self.statusbar.showMessage("❌ Could not load event details")
+            return
+        self.statusbar.showMessage("✅ Event details loaded")
+        
+        parts = []
+        if event.get('location'):
+            parts.append(f"📍 {event['location']}")
+        attendees = event.get('attendees', [])
+        if attendees:
+            parts.append(f"👥 {len(attendees)} attendee{'s' if len(attendees) != 1 else ''}")
+        if event.get('description'):
+            parts.append(event['description'])
+        if event.get('htmlLink'):
+            parts.append(event['htmlLink'])
+        QtWidgets.QMessageBox.information(
+            self,
+            event.get('summary', 'Untitled Event'),
+            '\n\n'.join(parts) or "No additional details"
+        )
     
     def closeEvent(self, event):
         """Override close event to hide instead of closing"""
+        self.loader.cancel()
+        self.details_loader.cancel()
         event.ignore()
         self.hide()
 
 class SystemTray(QtWidgets.QSystemTrayIcon):
     """System tray implementation for Calendar Now"""
     
+    # Emitted from the sync scheduler thread when a sync finishes; True if anything changed
+    sync_finished = QtCore.pyqtSignal(bool)
+    # Emitted from the upcoming feed thread with each new snapshot
+    upcoming_changed = QtCore.pyqtSignal(object)
+    
     def __init__(self, oauth_handler, parent=None):
         # Load tray icon
         icon_path = resource_path('resources/icons/tray_icon.png')
@@ -381,28 +380,47 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
 
         self.oauth_handler = oauth_handler
         self.settings_manager = SettingsManager()
+        # Local event store shared by every window; only the sync engine writes to it
+        self.event_store = EventStore(self.settings_manager.app_data_dir)
+        # Today's events for the overlay, loaded off the Tk thread
+        self.overlay_feed = EventFeed(self.load_today_events, name='OverlayFeed')
+        self.overlay_feed.start()
         # Share the same SettingsManager with NotificationManager so changes take effect immediately
         self.notification_manager = NotificationManager(self, settings_manager=self.settings_manager)
+        self.notification_manager.set_default_reminders(self.event_store.get_default_reminders())
+        # Events whose reminders may fire soon, for notifications; each snapshot carries what changed
+        self.upcoming_feed = EventFeed(self.load_upcoming_events, name='UpcomingFeed')
+        self.upcoming_changed.connect(self.on_upcoming_changed)
+        self.upcoming_feed.subscribe(self.upcoming_changed.emit)
+        self.upcoming_feed.start()
         
         # Main window and task display
         self.main_window = None
         self.task_display = None
         self.calendar_client = None
+        self.sync_engine = None
         
-        # Initialize calendar client
-        self.init_calendar_client()
-        
-        # Calendar sync timer
-        self.sync_timer = QtCore.QTimer()
-        self.sync_timer.timeout.connect(self.sync_calendar)
+        # Every sync (periodic, "Sync Now", startup) runs on the scheduler's thread
+        self.sync_scheduler = SyncScheduler(
+            self._sync_now,
+            self.settings_manager.get_setting('sync_interval', Config.DEFAULT_SYNC_INTERVAL),
+            cadence=self.sync_cadence(),
+            next_event_start=self.next_event_start
+        )
+        self.sync_scheduler.subscribe(self.sync_finished.emit)
         
         self.setup_context_menu()
         self.setup_signals()
-        self.start_sync_timer()
         
-        # Show tray icon
+        # Show tray icon with the last-known state from the store
+        self.update_tray_state()
         self.show()
         
+        # Building the client (discovery + token refresh) and the first sync
+        # happen in the background so the cached snapshot renders immediately
+        self.sync_finished.connect(self.refresh_views)
+        self.sync_scheduler.start()
+        
         # Show initial notification
         if self.isSystemTrayAvailable():
             self.showMessage(
@@ -418,6 +436,15 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
             credentials = self.oauth_handler.get_credentials()
             if credentials:
                 self.calendar_client = GoogleCalendarClient(credentials)
+                # Keep sync tokens across client rebuilds so syncs stay incremental
+                if self.sync_engine is None:
+                    self.sync_engine = SyncEngine(
+                        self.calendar_client,
+                        self.event_store,
+                        expand_recurrence=self.settings_manager.get_setting('expand_recurrence_locally', False)
+                    )
+                else:
+                    self.sync_engine.calendar_client = self.calendar_client
                 print("Calendar client initialized successfully")
             else:
                 print("No valid credentials found for calendar client")
@@ -426,12 +453,13 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
     
     def show_task_display(self):
         """Show or create the task display window"""
-        if self.task_display is None and self.calendar_client:
+        if self.task_display is None:
             # Run the task display in a separate thread
             import threading
             
             def run_task_display():
-                self.task_display = TaskDisplayWindow(self.calendar_client, self.settings_manager)
+                # The scheduler's minute clock keeps the overlay's time current
+                self.task_display = TaskDisplayWindow(self.overlay_feed, self.settings_manager, self.sync_scheduler)
                 self.task_display.run()
             
             thread = threading.Thread(target=run_task_display)
@@ -506,7 +534,12 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
     def show_main_window(self):
         """Show or create the main window"""
         if self.main_window is None:
-            self.main_window = MainWindow(self.oauth_handler)
+            self.main_window = MainWindow(
+                self.oauth_handler,
+                self.event_store,
+                sync_callback=self.sync_calendar,
+                details_callback=self.fetch_event_details
+            )
         
         self.main_window.show()
         self.main_window.raise_()
@@ -517,53 +550,185 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
         if self.main_window:
             self.main_window.hide()
     
-    def start_sync_timer(self):
-        """Start the automatic calendar sync timer"""
-        sync_interval_ms = 1 * 60 * 1000  # 1 minute
-        self.sync_timer.start(sync_interval_ms)
+    def sync_cadence(self):
+        """Adaptive sync delays within the configured bounds, or None for a fixed interval"""
+        if not self.settings_manager.get_setting('adaptive_sync', True):
+            return None
+        min_ms, max_ms = self.settings_manager.get_sync_bounds()
+        return AdaptiveCadence(
+            self.settings_manager.get_setting('sync_interval', Config.DEFAULT_SYNC_INTERVAL),
+            min_ms,
+            max_ms
+        )
+    
+    def next_event_start(self):
+        """Start of the next timed event as epoch seconds, or None.
+        Read from the store, which the sync that just finished has already updated;
+        the feed snapshots are reloaded only afterwards."""
+        return self.event_store.get_next_start(datetime.now(timezone.utc))
     
     def sync_calendar(self):
-        """Sync calendar data and check for updates"""
+        """Sync calendar data in the background; views refresh when it finishes"""
+        # Collapses with a sync that is already pending or running
+        self.sync_scheduler.request_sync()
+    
+    def _sync_now(self):
+        """Refresh credentials if needed and pull changes (runs on the scheduler thread).
+        Returns True if the store changed."""
         try:
+            # All-day events are local midnights; re-parse them if the zone changed
+            zone_changed = refresh_local_zone()
+            if zone_changed:
+                # The stored rows still hold the old midnights
+                self.event_store.rebase_all_day()
             credentials = self.oauth_handler.get_credentials()
             if not credentials:
-                return
+                return zone_changed
             
             # Refresh credentials if needed
             if credentials.expired and credentials.refresh_token:
                 self.oauth_handler.refresh_credentials()
-                credentials = self.oauth_handler.get_credentials()
+                if self.calendar_client:
+                    # Swap the new token into the shared service in place
+                    self.calendar_client.update_credentials(self.oauth_handler.get_credentials())
             
             # Initialize calendar client if needed
-            calendar_client = GoogleCalendarClient(credentials)
+            if not self.sync_engine:
+                self.init_calendar_client()
+                if not self.sync_engine:
+                    return zone_changed
+            
+            # Pull only what changed since the last sync
+            return self.sync_selected_calendars() or zone_changed
+            
+        except Exception as e:
+            print(f"Sync error: {e}")
+            return False
+    
+    def get_sync_calendar_ids(self):
+        """Calendars to keep in the local store, or None if the calendar list is unavailable"""
+        if not self.settings_manager.get_setting('sync_all_calendars', False):
+            return ['primary']
+        calendars = self.calendar_client.get_calendars() if self.calendar_client else []
+        calendar_ids = [c['id'] for c in calendars if c.get('selected') or c.get('primary')]
+        return calendar_ids or None
+    
+    def sync_selected_calendars(self):
+        """Sync every configured calendar in parallel and drop ones no longer wanted.
+        Returns True if anything changed."""
+        calendar_ids = self.get_sync_calendar_ids()
+        if calendar_ids is None:
+            # Calendar list failed to load; keep what we have and sync primary only
+            return self.sync_engine.sync('primary').has_changes
+        dropped = set(self.event_store.calendar_ids()) - set(calendar_ids)
+        results = self.sync_engine.sync_calendars(calendar_ids)
+        self.event_store.retain_calendars(calendar_ids)
+        return bool(dropped) or any(result.has_changes for result in results.values())
+    
+    def fetch_event_details(self, event_id, calendar_id='primary'):
+        """Fetch the full resource of a stored event from Google Calendar (runs on a pool thread)"""
+        if not self.calendar_client:
+            return None
+        return self.calendar_client.get_event(event_id, calendar_id=calendar_id)
+    
+    def refresh_views(self, changed=True):
+        """Bring notifications, tray and open windows up to date after a sync"""
+        try:
+            self.update_tray_state()
             
-            # Get upcoming events (next hour)
-            events = calendar_client.get_upcoming_events(hours=1)
+            if changed:
+                self.notification_manager.set_default_reminders(self.event_store.get_default_reminders())
             
-            # Check for notifications
-            self.notification_manager.check_event_notifications(events)
+            # The feed windows slide with the clock, so reload them every time;
+            # they publish only if their events actually changed
+            self.upcoming_feed.refresh()
+            self.overlay_feed.refresh()
             
-            # Update main window if visible
-            if self.main_window and self.main_window.isVisible():
+            # Update main window if visible and the sync brought changes
+            if changed and self.main_window and self.main_window.isVisible():
                 self.main_window.load_events()
-                
         except Exception as e:
-            print(f"Sync error: {e}")
+            print(f"Error refreshing views: {e}")
+    
+    def on_upcoming_changed(self, snapshot):
+        """Apply a new upcoming-events snapshot (GUI thread)"""
+        try:
+            # Reschedules only the reminders of events that changed
+            self.notification_manager.apply_changes(snapshot.changes)
+            self.update_tray_state()
+        except Exception as e:
+            print(f"Error applying event changes: {e}")
+    
+    def load_upcoming_events(self):
+        """Load events whose reminders may fire soon (runs on the upcoming feed thread)"""
+        return load_reminder_events(
+            self.event_store,
+            extra_minutes=self.settings_manager.get_setting('notification_minutes', 15)
+        )
+    
+    def load_today_events(self):
+        """Load today's events from the store (runs on the overlay feed thread)"""
+        local_now = datetime.now().astimezone()
+        start_of_day = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.event_store.get_events_between(start_of_day, start_of_day + timedelta(days=1))
+    
+    def update_tray_state(self):
+        """Show the current or next event in the tray tooltip"""
+        try:
+            now = datetime.now(timezone.utc)
+            events = self.event_store.get_events_between(now, now + timedelta(days=1), limit=1)
+            if events:
+                event = events[0]
+                start, _ = event_bounds(event)
+                label = "Now" if start and start <= now else "Next"
+                tooltip = f"Calendar Now\n{label}: {event.get('summary', 'Untitled Event')}"
+                if label == "Next" and start:
+                    tooltip += f" at {start.astimezone().strftime('%I:%M %p').lstrip('0')}"
+            else:
+                tooltip = "Calendar Now\nNo upcoming events"
+            self.setToolTip(tooltip)
+        except Exception as e:
+            print(f"Error updating tray state: {e}")
     
     def show_account_settings(self):
         """Show account settings dialog"""
-        dialog = AccountSettingsDialog(self.oauth_handler, self.context_menu)
+        dialog = AccountSettingsDialog(self.oauth_handler, self.forget_account, self.context_menu)
         dialog.exec_()
     
+    def forget_account(self):
+        """Drop everything kept for the previous account after a disconnect or account change"""
+        try:
+            # The store is keyed by calendar id ('primary'), so a new account
+            # would otherwise reuse the old events and sync tokens
+            if self.sync_engine:
+                self.sync_engine.reset()
+            else:
+                self.event_store.clear()
+            self.sync_engine = None
+            self.calendar_client = None
+            CalendarServiceProvider.instance().reset()
+            self.notification_manager.clear_notified_events()
+            self.notification_manager.set_default_reminders({})
+            self.refresh_views(True)
+            # Picks up the new account's calendars, if one is connected
+            self.sync_scheduler.request_sync()
+        except Exception as e:
+            print(f"Error clearing account data: {e}")
+    
     def show_notification_settings(self):
         """Show notification settings dialog"""
         dialog = NotificationSettingsDialog(self.settings_manager, self.context_menu)
-        dialog.exec_()
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            self.notification_manager.reschedule()
     
     def show_general_settings(self):
         """Show general settings dialog"""
         dialog = GeneralSettingsDialog(self.settings_manager, self.context_menu)
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            self.sync_scheduler.set_interval(
+                self.settings_manager.get_setting('sync_interval', Config.DEFAULT_SYNC_INTERVAL)
+            )
+            self.sync_scheduler.set_cadence(self.sync_cadence())
             # Ask the existing Tk overlay to reload settings on its own thread
             if self.task_display:
                 try:
@@ -592,7 +757,9 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
     
     def exit_application(self):
         """Exit the application"""
-        self.sync_timer.stop()
+        self.sync_scheduler.stop()
+        self.overlay_feed.stop()
+        self.upcoming_feed.stop()
         if self.main_window:
             self.main_window.close()
         QtWidgets.QApplication.quit()
@@ -600,9 +767,11 @@ class SystemTray(QtWidgets.QSystemTrayIcon):
 class AccountSettingsDialog(QtWidgets.QDialog):
     """Dialog for managing account settings"""
     
-    def __init__(self, oauth_handler, parent=None):
+    def __init__(self, oauth_handler, account_changed=None, parent=None):
         super().__init__(parent)
         self.oauth_handler = oauth_handler
+        # Called after the account is disconnected or replaced
+        self.account_changed = account_changed
         self.setWindowTitle("Account Settings")
         self.setFixedSize(400, 300)
         
@@ -650,12 +819,15 @@ class AccountSettingsDialog(QtWidgets.QDialog):
         
         if reply == QtWidgets.QMessageBox.Yes:
             self.oauth_handler.revoke_credentials()
+            if self.account_changed:
+                self.account_changed()
             self.accept()
     
     def reconnect_account(self):
         """Reconnect Google account"""
         wizard = SetupWizard(self.oauth_handler)
-        wizard.exec_()
+        if wizard.exec_() == QtWidgets.QDialog.Accepted and self.account_changed:
+            self.account_changed()
         self.accept()
 
 class NotificationSettingsDialog(QtWidgets.QDialog):
@@ -0,0 +1,105 @@
+"""
+Background workers for Qt windows.
+
+Slow work (store queries, API calls, formatting) runs on QThreadPool threads
+and results come back to the GUI thread through queued signals. A
+LatestTaskRunner keeps only the newest request alive: submitting new work
+cancels the older job, and results of a superseded job are dropped.
+"""
+
+import traceback
+from typing import Callable, Optional
+
+from PyQt5 import QtCore
+
+
+class WorkerSignals(QtCore.QObject):
+    """Signals a Worker emits; delivered on the thread that owns the receiver"""
+
+    finished = QtCore.pyqtSignal(int, object)
+    failed = QtCore.pyqtSignal(int, str)
+
+
+class Worker(QtCore.QRunnable):
+    """Run fn(is_cancelled) on a pool thread and emit its result"""
+
+    def __init__(self, generation: int, fn: Callable[[Callable[[], bool]], object]):
+        super().__init__()
+        self.generation = generation
+        self.fn = fn
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        # fn may poll is_cancelled() to stop early; either way nothing is emitted
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        if self._cancelled:
+            return
+        try:
+            result = self.fn(self.is_cancelled)
+        except Exception as e:
+            traceback.print_exc()
+            if not self._cancelled:
+                self.signals.failed.emit(self.generation, str(e))
+            return
+        if not self._cancelled:
+            self.signals.finished.emit(self.generation, result)
+
+
+class LatestTaskRunner(QtCore.QObject):
+    """Runs background jobs where only the most recent submission matters"""
+
+    def __init__(self, pool: Optional[QtCore.QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        self.pool = pool or QtCore.QThreadPool.globalInstance()
+        self._generation = 0
+        self._current = None
+        self._on_result = None
+        self._on_error = None
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    def submit(self, fn, on_result: Callable[[object], None],
+               on_error: Optional[Callable[[str], None]] = None) -> int:
+        """Run fn(is_cancelled) in the pool, superseding any job still pending.
+        on_result/on_error are called on this object's (GUI) thread."""
+        self.cancel()
+        self._generation += 1
+        self._on_result = on_result
+        self._on_error = on_error
+        worker = Worker(self._generation, fn)
+        worker.setAutoDelete(False)  # Keep signals alive until delivered
+        worker.signals.finished.connect(self._finished)
+        worker.signals.failed.connect(self._failed)
+        self._current = worker
+        self.pool.start(worker)
+        return self._generation
+
+    def cancel(self):
+        """Cancel the pending job; its result, if any, is ignored"""
+        if self._current is not None:
+            self._current.cancel()
+            # Not started yet: take it off the queue altogether
+            self.pool.tryTake(self._current)
+            self._current = None
+
+    @QtCore.pyqtSlot(int, object)
+    def _finished(self, generation, result):
+        # Results of superseded jobs are dropped
+        if generation == self._generation and self._current is not None:
+            self._current = None
+            self._on_result(result)
+
+    @QtCore.pyqtSlot(int, str)
+    def _failed(self, generation, message):
+        if generation == self._generation and self._current is not None:
+            self._current = None
+            if self._on_error:
+                self._on_error(message)
@@ -2,6 +2,7 @@ import os
 import sys
 import json
 import platform
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from pathlib import Path
@@ -158,6 +159,29 @@ def debug_log(message: str, level: str = "INFO") -> None:
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] [{level}] {message}")
 
+# Startup timing: measured from start_startup_timer() (called first thing in main)
+_startup_started = None
+_startup_marks = {}
+
+def start_startup_timer() -> None:
+    """Begin measuring application startup"""
+    global _startup_started
+    _startup_started = time.perf_counter()
+    _startup_marks.clear()
+
+def mark_startup(name: str, target_ms: Optional[float] = None) -> Optional[float]:
+    """Record a startup milestone once and return milliseconds since startup began.
+    Milestones slower than target_ms are always reported, others only in debug mode."""
+    if _startup_started is None or name in _startup_marks:
+        return None
+    elapsed_ms = (time.perf_counter() - _startup_started) * 1000
+    _startup_marks[name] = elapsed_ms
+    if target_ms is not None and elapsed_ms > target_ms:
+        print(f"Startup: {name} took {elapsed_ms:.0f} ms (target {target_ms:.0f} ms)")
+    else:
+        debug_log(f"Startup: {name} after {elapsed_ms:.0f} ms")
+    return elapsed_ms
+
 def copy_to_clipboard(text: str) -> bool:
     """Copy text to system clipboard"""
     try:
@@ -0,0 +1,126 @@
+"""
+Date/time parsing for Calendar API payloads.
+
+Every consumer (store, sync, overlay, Calendar View, notifications, events)
+parses event times through this module so they agree on the rules:
+
+- dateTime values are RFC3339 and come back as aware datetimes.
+- date values (all-day events) are midnight in the local time zone.
+
+The API sends the same few thousand strings over and over (every sync, every
+refresh), so parses are memoized by raw string in a bounded cache. Fixed UTC
+offsets and IANA zones are each built once and shared. All-day dates depend
+on the local zone; refresh_local_zone() drops the memo when it changes, and
+the caller then has EventStore.rebase_all_day() fix the stored bounds.
+"""
+
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+PARSE_CACHE_SIZE = 8192
+
+# Shared fixed-offset zones; fromisoformat makes a new tzinfo per call
+_OFFSETS: Dict[timedelta, timezone] = {timedelta(0): timezone.utc}
+
+
+def offset_zone(offset: timedelta) -> timezone:
+    """Shared fixed-offset tzinfo for a UTC offset"""
+    zone = _OFFSETS.get(offset)
+    if zone is None:
+        zone = _OFFSETS.setdefault(offset, timezone(offset))
+    return zone
+
+
+@lru_cache(maxsize=64)
+def get_zone(name: str):
+    """tzinfo for an IANA zone name (e.g. an event's start.timeZone), or None if unknown"""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(name)
+    except (ImportError, KeyError, ValueError):
+        # Python < 3.9, or no system tz database (Windows without tzdata):
+        # dateutil ships its own copy
+        from dateutil import tz
+        return tz.gettz(name)
+
+
+def _slow_parse(value: str) -> datetime:
+    """Fallback for strings fromisoformat rejects (e.g. on Python < 3.11)"""
+    from dateutil import parser
+    return parser.isoparse(value)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_datetime(value: str) -> Optional[datetime]:
+    """Parse an RFC3339 dateTime into an aware datetime (naive input is taken as UTC)"""
+    try:
+        # Fast path: the C parser handles the API's format directly
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00') if value.endswith('Z') else value)
+    except ValueError:
+        try:
+            dt = _slow_parse(value)
+        except (ValueError, ImportError):
+            return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.replace(tzinfo=offset_zone(dt.utcoffset()))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_date(value: str) -> Optional[datetime]:
+    """Parse an all-day date into local midnight (aware)"""
+    try:
+        return datetime.combine(date.fromisoformat(value), datetime.min.time()).astimezone()
+    except ValueError:
+        return None
+
+
+def parse_event_time(value: Optional[Dict]) -> Optional[datetime]:
+    """Parse an API start/end object ({'dateTime': ...} or {'date': ...})"""
+    if not value:
+        return None
+    if value.get('dateTime'):
+        return parse_datetime(value['dateTime'])
+    if value.get('date'):
+        return parse_date(value['date'])
+    return None
+
+
+def parse_event_bounds(event: Dict) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """(start, end) of an API event as aware datetimes, or (None, None)"""
+    start = parse_event_time(event.get('start'))
+    end = parse_event_time(event.get('end'))
+    if start is None or end is None:
+        return None, None
+    return start, end
+
+
+def clear_caches():
+    """Drop memoized parses (e.g. after the local time zone changes)"""
+    parse_datetime.cache_clear()
+    parse_date.cache_clear()
+
+
+def _local_zone_key():
+    return time.timezone, time.altzone, time.tzname
+
+
+# Local zone the memoized all-day dates were parsed in
+_zone_key = _local_zone_key()
+
+
+def refresh_local_zone() -> bool:
+    """Pick up a change of the system time zone (travel, DST settings) and drop
+    memoized parses if it changed. Returns True if it changed."""
+    global _zone_key
+    # The process keeps the zone it started with until tzset() (not on Windows)
+    if hasattr(time, 'tzset'):
+        time.tzset()
+    key = _local_zone_key()
+    if key == _zone_key:
+        return False
+    _zone_key = key
+    clear_caches()
+    return True
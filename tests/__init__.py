@@ -1 +1,8 @@
-# This file is intentionally left blank.
\ No newline at end of file
+import sys
+from pathlib import Path
+
+# Application modules import each other as top-level packages (e.g. ``config.settings``),
+# the same way src/main.py runs them, so make src importable for the test suite.
+_SRC_DIR = str(Path(__file__).resolve().parent.parent / 'src')
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
@@ -0,0 +1,134 @@
+import unittest
+
+from calendar_api.batch import batch_list_pages, batch_modify, execute_batch
+
+
+class FakeBatch:
+    def __init__(self, owner, callback):
+        self.owner = owner
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.owner.round_trips += 1
+        for request_id, request in self.requests:
+            response, error = request.outcome()
+            self.callback(request_id, response, error)
+
+
+class FakeServer:
+    """Serves list queries for calendars; each query is an object with outcome()"""
+
+    def __init__(self, pages_by_calendar, failing=()):
+        self.pages_by_calendar = pages_by_calendar
+        self.failing = set(failing)
+        self.round_trips = 0
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    def list(self, calendarId, pageToken=None, **params):
+        server = self
+
+        class Request:
+            def outcome(self):
+                if calendarId in server.failing:
+                    return None, RuntimeError(f"forbidden: {calendarId}")
+                pages = server.pages_by_calendar[calendarId]
+                index = int(pageToken) if pageToken else 0
+                page = dict(pages[index])
+                if index + 1 < len(pages):
+                    page['nextPageToken'] = str(index + 1)
+                return page, None
+
+        return Request()
+
+
+class OutcomeRequest:
+    def __init__(self, value):
+        self.value = value
+
+    def outcome(self):
+        return {'value': self.value}, None
+
+
+class FakeEvents:
+    """events() resource whose requests fail for event ids in failing"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def _request(self, action, calendarId, eventId=None, body=None):
+        failing = eventId in self.failing
+
+        class Request:
+            def outcome(self):
+                if failing:
+                    return None, RuntimeError(f"not found: {eventId}")
+                return {'action': action, 'calendarId': calendarId, 'id': eventId or body['id']}, None
+
+        return Request()
+
+    def insert(self, calendarId, body):
+        return self._request('insert', calendarId, body=body)
+
+    def update(self, calendarId, eventId, body):
+        return self._request('update', calendarId, eventId, body)
+
+    def delete(self, calendarId, eventId):
+        return self._request('delete', calendarId, eventId)
+
+
+class TestBatch(unittest.TestCase):
+    def test_execute_batch_splits_into_round_trips(self):
+        server = FakeServer({})
+        requests = {f'op{i}': OutcomeRequest(i) for i in range(120)}
+        results = execute_batch(server.new_batch_http_request, requests, max_batch_size=50)
+
+        self.assertEqual(server.round_trips, 3)
+        self.assertEqual(len(results), 120)
+        self.assertEqual(results['op75'].response, {'value': 75})
+
+    def test_batch_list_follows_pages_and_reports_errors(self):
+        server = FakeServer({
+            'a': [{'items': [{'id': 'a1'}]}, {'items': [{'id': 'a2'}], 'nextSyncToken': 'sa'}],
+            'b': [{'items': [{'id': 'b1'}]}],
+        }, failing=['c'])
+        results = batch_list_pages(server.new_batch_http_request, server.list,
+                                   {cal: {'calendarId': cal} for cal in ('a', 'b', 'c')})
+
+        # First pages for all three in one trip, then a's second page
+        self.assertEqual(server.round_trips, 2)
+        self.assertEqual([e['id'] for page in results['a'].response for e in page['items']], ['a1', 'a2'])
+        self.assertEqual(results['a'].response[-1]['nextSyncToken'], 'sa')
+        self.assertEqual(len(results['b'].response), 1)
+        self.assertFalse(results['c'].ok)
+        self.assertIsNone(results['c'].response)
+
+    def test_batch_modify_reports_each_operation(self):
+        server = FakeServer({})
+        results = batch_modify(server.new_batch_http_request, FakeEvents(failing=['gone']), [
+            {'action': 'create', 'body': {'id': 'new'}},
+            {'action': 'update', 'calendar_id': 'team', 'event_id': 'x', 'body': {'summary': 'X'}},
+            {'action': 'delete', 'event_id': 'gone'},
+        ])
+
+        self.assertEqual(server.round_trips, 1)
+        self.assertEqual([r.ok for r in results], [True, True, False])
+        self.assertEqual(results[0].response, {'action': 'insert', 'calendarId': 'primary', 'id': 'new'})
+        self.assertEqual(results[1].response['calendarId'], 'team')
+        self.assertIsNone(results[2].response)
+        self.assertIn('gone', str(results[2].error))
+
+    def test_batch_modify_rejects_unknown_actions(self):
+        server = FakeServer({})
+        with self.assertRaises(ValueError):
+            batch_modify(server.new_batch_http_request, FakeEvents(), [{'action': 'move', 'event_id': 'x'}])
+        self.assertEqual(server.round_trips, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
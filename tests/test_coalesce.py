@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+from calendar_api.coalesce import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return 'result'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flights.do('primary', slow_fetch)))
+        leader.start()
+        started.wait(2)
+        followers = [threading.Thread(target=lambda: results.append(flights.do('primary', slow_fetch)))
+                     for _ in range(3)]
+        for t in followers:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in [leader] + followers:
+            t.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['result'] * 4)
+
+    def test_errors_are_shared_but_not_remembered(self):
+        flights = SingleFlight(ttl=60)
+
+        def failing():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            flights.do('k', failing)
+        self.assertEqual(flights.do('k', lambda: 'ok'), 'ok')
+
+    def test_ttl_reuses_recent_result(self):
+        flights = SingleFlight(ttl=60)
+        calls = []
+        fn = lambda: calls.append(1) or len(calls)
+        self.assertEqual(flights.do('k', fn), 1)
+        self.assertEqual(flights.do('k', fn), 1)
+        flights.forget('k')
+        self.assertEqual(flights.do('k', fn), 2)
+
+        no_ttl = SingleFlight()
+        self.assertEqual(no_ttl.do('k', fn), 3)
+        self.assertEqual(no_ttl.do('k', fn), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from calendar_api.diff import diff_events
+
+
+def event(event_id, start='2024-05-01T09:00:00Z', end='2024-05-01T10:00:00Z', **extra):
+    return dict({'id': event_id, 'start': {'dateTime': start}, 'end': {'dateTime': end}}, **extra)
+
+
+class TestDiffEvents(unittest.TestCase):
+    def test_classifies_each_kind_of_change(self):
+        previous = {
+            'same': event('same', etag='"1"'),
+            'renamed': event('renamed', etag='"1"', summary='Old'),
+            'moved': event('moved', etag='"1"'),
+            'gone': event('gone', etag='"1"'),
+        }
+        current = [
+            event('same', etag='"1"'),
+            event('renamed', etag='"2"', summary='New'),
+            event('moved', '2024-05-01T11:00:00Z', '2024-05-01T12:00:00Z', etag='"2"'),
+            event('new', etag='"1"'),
+        ]
+        changes = diff_events(previous, current)
+
+        self.assertEqual([e['id'] for e in changes.added], ['new'])
+        self.assertEqual([(old['summary'], new['summary']) for old, new in changes.changed], [('Old', 'New')])
+        self.assertEqual([new['id'] for _, new in changes.moved], ['moved'])
+        self.assertEqual(changes.removed_ids, ['gone'])
+        self.assertEqual(sorted(e['id'] for e in changes.upserts), ['moved', 'new', 'renamed'])
+        self.assertEqual(len(changes), 4)
+
+    def test_same_version_is_not_inspected(self):
+        # The version is trusted, so content differences alone do not count
+        changes = diff_events({'a': event('a', etag='"1"', summary='x')}, [event('a', etag='"1"', summary='y')])
+        self.assertFalse(changes)
+
+    def test_events_without_versions_compare_by_content(self):
+        previous = {'a': event('a', summary='x')}
+        self.assertFalse(diff_events(previous, [event('a', summary='x')]))
+        self.assertEqual(len(diff_events(previous, [event('a', summary='y')]).changed), 1)
+
+    def test_first_load_is_all_additions(self):
+        changes = diff_events({}, [event('a'), event('b')])
+        self.assertEqual(len(changes.added), 2)
+        self.assertFalse(changes.changed or changes.moved or changes.removed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from ui.event_rows import EventEntry, build_event_row, plan_list_update
+
+
+class TestBuildEventRow(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.now().astimezone().replace(hour=8, minute=0, second=0, microsecond=0)
+
+    def test_timed_event(self):
+        start = self.now + timedelta(hours=6)  # 14:00 local
+        event = {
+            'id': 'e1', 'summary': 'Standup', 'location': 'Room 4',
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': (start + timedelta(minutes=30)).isoformat()},
+        }
+        row = build_event_row(event, self.now, with_details_hint=True)
+        self.assertEqual(row.event_id, 'e1')
+        self.assertEqual(row.text, "☀️ Standup\n📍 Today at 2:00 PM")
+        self.assertEqual(row.tooltip, "Event: Standup\nLocation: Room 4\nDouble-click for details")
+        self.assertEqual(row.start_ts, start.timestamp())
+
+    def test_all_day_event_tomorrow(self):
+        tomorrow = (self.now + timedelta(days=1)).date()
+        event = {
+            'id': 'e2',
+            'start': {'date': tomorrow.isoformat()},
+            'end': {'date': (tomorrow + timedelta(days=1)).isoformat()},
+        }
+        row = build_event_row(event, self.now)
+        self.assertEqual(row.text, "📅 Untitled Event\n📍 Tomorrow at All day")
+        self.assertEqual(row.tooltip, "Event: Untitled Event")
+
+    def test_unparseable_time_is_shown_raw(self):
+        event = {'id': 'e3', 'summary': 'Odd', 'start': {'dateTime': 'soon'}, 'end': {'dateTime': 'later'}}
+        row = build_event_row(event, self.now.astimezone(timezone.utc))
+        self.assertEqual(row.text, "🕐 Odd\n📍  at soon")
+        self.assertIsNone(row.start_ts)
+
+
+def entry(event_id, hour, version='1', summary=None):
+    start = datetime(2024, 5, 1, hour, tzinfo=timezone.utc)
+    return EventEntry({
+        'id': event_id, 'summary': summary or event_id, 'etag': version,
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(hours=1)).isoformat()},
+    })
+
+
+def apply(rows, operations):
+    rows = list(rows)
+    for operation in operations:
+        if operation[0] == 'remove':
+            del rows[operation[1]:operation[2] + 1]
+        elif operation[0] == 'insert':
+            rows[operation[1]:operation[1]] = operation[2]
+        else:
+            rows[operation[1]] = operation[2]
+    return rows
+
+
+class TestPlanListUpdate(unittest.TestCase):
+    def assertTransforms(self, old, new):
+        operations = plan_list_update(old, new)
+        self.assertEqual([e.event_id for e in apply(old, operations)], [e.event_id for e in new])
+        return operations
+
+    def test_unchanged_list_needs_no_operations(self):
+        old = [entry('a', 1), entry('b', 2)]
+        self.assertEqual(self.assertTransforms(old, [entry('a', 1), entry('b', 2)]), [])
+
+    def test_inserts_and_removes_are_grouped(self):
+        old = [entry('a', 1), entry('b', 2), entry('c', 3), entry('d', 4)]
+        new = [entry('a', 1), entry('x', 2), entry('y', 2), entry('d', 4), entry('z', 5)]
+        operations = self.assertTransforms(old, new)
+        self.assertEqual([(op[0], op[1]) for op in operations],
+                         [('remove', 1), ('insert', 1), ('insert', 4)])
+        self.assertEqual(operations[0], ('remove', 1, 2))
+
+    def test_changed_and_moved_events(self):
+        old = [entry('a', 1), entry('b', 2), entry('c', 3)]
+        new = [entry('a', 1, version='2', summary='renamed'), entry('c', 3), entry('b', 6)]
+        operations = self.assertTransforms(old, new)
+        self.assertIn(('change', 0), [(op[0], op[1]) for op in operations])
+        self.assertIn(('remove', 1, 1), operations)
+        self.assertEqual(apply(old, operations)[0].event['summary'], 'renamed')
+
+    def test_entry_keeps_only_display_fields(self):
+        e = EventEntry({'id': 'a', 'summary': 's', 'description': 'x' * 1000,
+                        'start': {'date': '2024-05-01'}, 'end': {'date': '2024-05-02'}})
+        self.assertNotIn('description', e.event)
+        self.assertIsNone(e.calendar_id)
+
+    def test_entry_remembers_its_calendar(self):
+        e = EventEntry({'id': 'a', 'calendarId': 'team', 'start': {'date': '2024-05-01'}})
+        self.assertEqual(e.calendar_id, 'team')
+
+
+if __name__ == '__main__':
+    unittest.main()
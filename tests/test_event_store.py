@@ -0,0 +1,200 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from calendar_api.store import EventStore
+from utils.timeparse import refresh_local_zone
+
+
+def make_event(event_id, start, minutes=30):
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(minutes=minutes)).isoformat()},
+    }
+
+
+class TestEventStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = EventStore(self.tmpdir)
+        self.now = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_window_query_orders_by_start(self):
+        self.store.replace_calendar('primary', [
+            make_event('b', self.now + timedelta(hours=2)),
+            make_event('a', self.now + timedelta(minutes=5)),
+            make_event('past', self.now - timedelta(hours=3)),
+        ], sync_token='tok')
+        events = self.store.get_events_between(self.now, self.now + timedelta(hours=3))
+        self.assertEqual([e['id'] for e in events], ['a', 'b'])
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok')
+
+    def test_next_start_skips_started_and_all_day_events(self):
+        later = self.now + timedelta(hours=2)
+        holiday = {'id': 'h', 'start': {'date': '2099-01-01'}, 'end': {'date': '2099-01-02'}}
+        self.store.replace_calendar('primary', [make_event('now', self.now - timedelta(minutes=5)),
+                                                make_event('later', later), holiday])
+        self.assertEqual(self.store.get_next_start(self.now), int(later.timestamp()))
+        self.assertIsNone(self.store.get_next_start(later))
+
+    def test_time_rows_skip_event_bodies(self):
+        event = make_event('a', self.now)
+        event['status'] = 'tentative'
+        self.store.replace_calendar('primary', [event])
+        self.store.replace_calendar('work', [make_event('b', self.now)])
+        rows = self.store.get_time_rows(['primary'])
+        start = int(self.now.timestamp())
+        self.assertEqual(rows, [('primary', 'a', start, start + 1800, 0, 'tentative')])
+        self.assertEqual(len(self.store.get_time_rows()), 2)
+
+    def test_events_are_keyed_by_calendar(self):
+        self.store.replace_calendar('primary', [make_event('x', self.now)])
+        self.store.replace_calendar('team', [make_event('x', self.now)])
+        window = (self.now - timedelta(hours=1), self.now + timedelta(hours=1))
+        self.assertEqual(len(self.store.get_events_between(*window)), 2)
+        self.assertEqual(len(self.store.get_events_between(*window, calendar_ids=['team'])), 1)
+
+        self.store.replace_calendar('team', [])
+        self.assertEqual(len(self.store.get_events_between(*window)), 1)
+
+    def test_default_reminders_and_calendar_tags(self):
+        popup = [{'method': 'popup', 'minutes': 10}]
+        self.store.replace_calendar('team', [make_event('x', self.now)], default_reminders=popup)
+        self.store.apply_changes('team', [], [])  # no defaults in the delta: keep the stored ones
+        self.assertEqual(self.store.get_default_reminders(), {'team': popup})
+
+        window = (self.now - timedelta(hours=1), self.now + timedelta(hours=1))
+        self.assertNotIn('calendarId', self.store.get_events_between(*window)[0])
+        self.assertEqual(self.store.get_events_between(*window, with_calendar=True)[0]['calendarId'], 'team')
+
+        self.store.clear('team')
+        self.assertEqual(self.store.get_default_reminders(), {})
+
+    def test_reminder_maximum_is_kept_at_write_time(self):
+        offsite = make_event('offsite', self.now + timedelta(days=2))
+        offsite['reminders'] = {'useDefault': False, 'overrides': [{'method': 'popup', 'minutes': 2880},
+                                                                   {'method': 'email', 'minutes': 60}]}
+        past = make_event('past', self.now - timedelta(days=3))
+        past['reminders'] = {'useDefault': False, 'overrides': [{'method': 'popup', 'minutes': 9000}]}
+        self.store.replace_calendar('primary', [offsite, past, make_event('plain', self.now)],
+                                    default_reminders=[{'method': 'popup', 'minutes': 30}])
+        self.assertEqual(self.store.get_max_reminder_minutes(self.now), 2880)
+
+        self.store.apply_changes('primary', [], ['offsite'])
+        self.assertEqual(self.store.get_max_reminder_minutes(self.now), 30)
+        self.store.apply_changes('primary', [], [], default_reminders=[])
+        self.assertEqual(self.store.get_max_reminder_minutes(self.now), 0)
+
+    def test_older_database_gets_the_reminder_columns(self):
+        self.store.close()
+        olddir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, olddir, True)
+        event = make_event('offsite', self.now)
+        event['reminders'] = {'useDefault': False, 'overrides': [{'method': 'popup', 'minutes': 120}]}
+        conn = sqlite3.connect(f'{olddir}/{EventStore.DB_NAME}')
+        conn.executescript("""
+            CREATE TABLE events (calendar_id TEXT NOT NULL, event_id TEXT NOT NULL, start_ts INTEGER,
+                end_ts INTEGER, all_day INTEGER NOT NULL DEFAULT 0, updated TEXT, data TEXT NOT NULL,
+                PRIMARY KEY (calendar_id, event_id));
+            CREATE TABLE calendars (calendar_id TEXT PRIMARY KEY, default_reminders TEXT);
+        """)
+        conn.execute('INSERT INTO events VALUES (?, ?, ?, ?, 0, NULL, ?)',
+                     ('primary', 'offsite', int(self.now.timestamp()), int(self.now.timestamp()) + 1800,
+                      json.dumps(event)))
+        conn.execute('INSERT INTO calendars VALUES (?, ?)', ('team', '[{"method": "popup", "minutes": 45}]'))
+        conn.commit()
+        conn.close()
+
+        self.store = EventStore(olddir)
+        self.assertEqual(self.store.get_max_reminder_minutes(self.now), 120)
+        self.assertEqual(self.store.get_event('primary', 'offsite'), event)
+        self.store.apply_changes('primary', [], ['offsite'])
+        self.assertEqual(self.store.get_max_reminder_minutes(self.now), 45)
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), "time.tzset is not available")
+    def test_all_day_bounds_follow_a_zone_change(self):
+        saved = os.environ.get('TZ')
+
+        def restore():
+            if saved is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = saved
+            refresh_local_zone()
+
+        self.addCleanup(restore)
+        os.environ['TZ'] = 'UTC'
+        refresh_local_zone()
+        holiday = {'id': 'h', 'start': {'date': '2099-01-01'}, 'end': {'date': '2099-01-02'}}
+        self.store.replace_calendar('primary', [holiday, make_event('timed', self.now)])
+        utc_midnight = int(datetime(2099, 1, 1, tzinfo=timezone.utc).timestamp())
+        window = (datetime(2098, 12, 31, 23, tzinfo=timezone.utc), datetime(2099, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.store.get_events_between(*window), [])
+
+        os.environ['TZ'] = 'Asia/Tokyo'
+        self.assertTrue(refresh_local_zone())
+        self.assertEqual(self.store.rebase_all_day(), 1)
+        # Tokyo's midnight is 15:00 UTC the day before
+        bounds = {row[1]: row[2:4] for row in self.store.get_time_rows()}
+        self.assertEqual(bounds['h'], (utc_midnight - 9 * 3600, utc_midnight + 15 * 3600))
+        self.assertEqual(bounds['timed'][0], int(self.now.timestamp()))
+        self.assertEqual([e['id'] for e in self.store.get_events_between(*window)], ['h'])
+
+    def test_clear_forgets_everything(self):
+        popup = [{'method': 'popup', 'minutes': 10}]
+        self.store.replace_calendar('primary', [make_event('a', self.now)], sync_token='tok',
+                                    default_reminders=popup)
+        self.store.clear()
+        self.assertIsNone(self.store.get_sync_token('primary'))
+        self.assertEqual(self.store.calendar_ids(), [])
+        self.assertEqual(self.store.count(), 0)
+
+    def test_apply_changes(self):
+        self.store.replace_calendar('primary', [make_event('a', self.now), make_event('b', self.now)])
+        moved = make_event('a', self.now + timedelta(days=1))
+        self.store.apply_changes('primary', [moved], ['b'], sync_token='tok2')
+
+        self.assertIsNone(self.store.get_event('primary', 'b'))
+        self.assertEqual(self.store.get_event('primary', 'a'), moved)
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok2')
+
+    def test_persists_across_instances(self):
+        self.store.replace_calendar('primary', [make_event('a', self.now)], sync_token='tok')
+        reopened = EventStore(self.tmpdir)
+        try:
+            self.assertEqual(reopened.get_sync_token('primary'), 'tok')
+            self.assertIsNotNone(reopened.get_event('primary', 'a'))
+        finally:
+            reopened.close()
+
+    def test_reads_from_other_threads(self):
+        self.store.replace_calendar('primary', [make_event('a', self.now)])
+        results = []
+
+        def reader():
+            results.append(self.store.get_event('primary', 'a'))
+            self.store.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r and r['id'] == 'a' for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
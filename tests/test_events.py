@@ -0,0 +1,131 @@
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from calendar_api.events import CalendarEvent, EventIndex, IntervalIndex
+from utils.timeparse import clear_caches, parse_datetime
+
+
+def timed(start, end, **extra):
+    return dict({'id': 'e1', 'start': {'dateTime': start}, 'end': {'dateTime': end}}, **extra)
+
+
+class TestCalendarEvent(unittest.TestCase):
+    def test_times_keep_the_event_offset(self):
+        event = CalendarEvent(timed('2024-05-01T09:05:00+02:00', '2024-05-01T13:30:00+02:00'))
+        self.assertEqual(event.start_time, datetime.fromisoformat('2024-05-01T09:05:00+02:00'))
+        self.assertEqual(event.start_time.utcoffset(), timedelta(hours=2))
+        self.assertEqual(event.end_ts - event.start_ts, 4 * 3600 + 25 * 60)
+        self.assertEqual(event.formatted_time_range(), "09:05 AM - 01:30 PM")
+
+    def test_formatting_matches_strftime(self):
+        cases = [
+            ('2024-05-01T00:00:00Z', '2024-05-01T12:00:00Z'),
+            ('2024-05-01T12:59:00-07:00', '2024-05-01T23:59:00-07:00'),
+            ('2024-05-01T22:00:00+05:30', '2024-05-02T01:00:00+05:30'),
+        ]
+        for start, end in cases:
+            s = datetime.fromisoformat(start.replace('Z', '+00:00'))
+            e = datetime.fromisoformat(end.replace('Z', '+00:00'))
+            if s.date() == e.date():
+                expected = f"{s.strftime('%I:%M %p')} - {e.strftime('%I:%M %p')}"
+            else:
+                expected = f"{s.strftime('%m/%d %I:%M %p')} - {e.strftime('%m/%d %I:%M %p')}"
+            self.assertEqual(CalendarEvent(timed(start, end)).formatted_time_range(), expected)
+
+    def test_all_day_and_missing_times(self):
+        today = datetime.now().date()
+        event = CalendarEvent({'id': 'e2', 'start': {'date': today.isoformat()},
+                               'end': {'date': (today + timedelta(days=1)).isoformat()}})
+        self.assertTrue(event.is_all_day)
+        self.assertTrue(event.is_today)
+        self.assertEqual(event.start_time, datetime.combine(today, datetime.min.time()))
+        self.assertEqual(event.formatted_time_range(), "All day")
+        self.assertEqual(CalendarEvent({'id': 'e3'}).formatted_time_range(), "No time specified")
+        self.assertFalse(CalendarEvent({'id': 'e3'}).is_upcoming)
+
+    def test_is_upcoming_with_aware_times(self):
+        future = (datetime.now().astimezone() + timedelta(hours=1)).isoformat()
+        past = (datetime.now().astimezone() - timedelta(hours=1)).isoformat()
+        self.assertTrue(CalendarEvent(timed(future, future)).is_upcoming)
+        self.assertFalse(CalendarEvent(timed(past, past)).is_upcoming)
+
+    def test_times_are_parsed_once_on_first_use_without_the_memo(self):
+        clear_caches()
+        event = CalendarEvent(timed('2024-05-01T09:00:00+02:00', '2024-05-01T10:00:00+02:00'))
+        self.assertEqual(parse_datetime.cache_info().currsize, 0)
+        self.assertEqual(event.start_ts, int(datetime(2024, 5, 1, 7, tzinfo=timezone.utc).timestamp()))
+        self.assertEqual(event.end_ts - event.start_ts, 3600)
+        self.assertEqual(parse_datetime.cache_info().currsize, 0)
+        # Events in the same offset share one tzinfo
+        other = CalendarEvent(timed('2024-05-02T09:00:00+02:00', '2024-05-02T10:00:00+02:00'))
+        self.assertIs(other.start_time.tzinfo, event.start_time.tzinfo)
+
+    def test_raw_payload_is_loaded_lazily(self):
+        payload = timed('2024-05-01T09:00:00Z', '2024-05-01T10:00:00Z',
+                        summary='Review', description='Agenda', htmlLink='https://example.com/e1')
+        calls = []
+
+        def load(event_id):
+            calls.append(event_id)
+            return payload
+
+        event = CalendarEvent(payload, raw_loader=load)
+        self.assertFalse(hasattr(event, '__dict__'))
+        self.assertEqual(event.summary, 'Review')
+        self.assertEqual(calls, [])
+        self.assertEqual(event.description, 'Agenda')
+        self.assertEqual(event.html_link, 'https://example.com/e1')
+        self.assertEqual(calls, ['e1'])
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_matches_brute_force_under_updates(self):
+        rng = random.Random(7)
+        index = IntervalIndex()
+        intervals = {}
+        for step in range(2000):
+            key = f"e{rng.randrange(300)}"
+            if rng.random() < 0.3:
+                self.assertEqual(index.remove(key), key in intervals)
+                intervals.pop(key, None)
+            else:
+                start = rng.randrange(1000)
+                end = start + rng.randrange(1, 120)
+                index.add(key, start, end, key)
+                intervals[key] = (start, end)
+
+            if step % 50 == 0:
+                ordered = sorted(intervals, key=lambda k: (intervals[k][0], k))
+                t0 = rng.randrange(1000)
+                t1 = t0 + rng.randrange(0, 60)
+                self.assertEqual(index.overlapping(t0, t1),
+                                 [k for k in ordered if intervals[k][0] < t1 and intervals[k][1] > t0])
+                self.assertEqual(index.at(t0),
+                                 [k for k in ordered if intervals[k][0] <= t0 < intervals[k][1]])
+                later = [k for k in ordered if intervals[k][0] > t0]
+                self.assertEqual(index.next_after(t0), later[0] if later else None)
+        self.assertEqual(len(index), len(intervals))
+
+    def test_event_index_applies_sync_deltas(self):
+        base = datetime(2024, 5, 1, 9, tzinfo=timezone.utc)
+
+        def event(event_id, hour, minutes=30, **extra):
+            start = base + timedelta(hours=hour)
+            return dict({'id': event_id, 'start': {'dateTime': start.isoformat()},
+                         'end': {'dateTime': (start + timedelta(minutes=minutes)).isoformat()}}, **extra)
+
+        index = EventIndex.from_events([event('a', 0), event('b', 1), event('c', 2)])
+        t = (base + timedelta(minutes=10)).timestamp()
+        self.assertEqual(index.at(t)[0]['id'], 'a')
+        self.assertEqual(index.next_after(t)['id'], 'b')
+
+        # b moves later, c is cancelled, a is deleted, d is new
+        index.apply_changes([event('b', 5), event('c', 2, status='cancelled'), event('d', 1)], ['a'])
+        self.assertEqual(index.at(t), [])
+        self.assertEqual([e['id'] for e in index.overlapping(base.timestamp(), t + 86400)], ['d', 'b'])
+        self.assertEqual(len(index), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
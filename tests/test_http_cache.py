@@ -0,0 +1,43 @@
+import unittest
+
+from calendar_api.http_cache import BoundedHttpCache, is_metadata_url
+
+BASE = 'https://www.googleapis.com/calendar/v3'
+
+
+class TestHttpCache(unittest.TestCase):
+    def test_only_metadata_urls_are_cacheable(self):
+        self.assertTrue(is_metadata_url(f'{BASE}/users/me/calendarList?fields=items&alt=json'))
+        self.assertTrue(is_metadata_url(f'{BASE}/calendars/primary?alt=json'))
+        self.assertFalse(is_metadata_url(f'{BASE}/calendars/primary/events?syncToken=abc&alt=json'))
+
+    def test_skips_event_lists(self):
+        cache = BoundedHttpCache()
+        cache.set(f'{BASE}/calendars/primary/events?alt=json', b'x' * 10)
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = BoundedHttpCache(max_bytes=30, cacheable=None)
+        cache.set('a', b'1' * 10)
+        cache.set('b', b'2' * 10)
+        cache.set('c', b'3' * 10)
+        cache.get('a')  # a is now most recently used
+        cache.set('d', b'4' * 10)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'1' * 10)
+        self.assertEqual(cache.size, 30)
+
+    def test_replacing_and_oversized_entries(self):
+        cache = BoundedHttpCache(max_bytes=20, cacheable=None)
+        cache.set('a', b'1' * 10)
+        cache.set('a', b'2' * 5)
+        self.assertEqual(cache.size, 5)
+
+        cache.set('a', b'3' * 50)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
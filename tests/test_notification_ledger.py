@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from ui.notification_ledger import NotificationLedger
+
+
+class TestNotificationLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / NotificationLedger.FILE_NAME
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keyed_by_start_and_offset(self):
+        ledger = NotificationLedger(self.path)
+        ledger.add('a', 1000, 0, now=900)
+        self.assertTrue(ledger.contains('a', 1000, 0, now=900))
+        # Rescheduled, or a different reminder of the same event
+        self.assertFalse(ledger.contains('a', 2000, 0, now=900))
+        self.assertFalse(ledger.contains('a', 1000, 10, now=900))
+
+    def test_survives_a_restart(self):
+        NotificationLedger(self.path).add('a', 4_000_000_000, 5)
+        self.assertTrue(NotificationLedger(self.path).contains('a', 4_000_000_000, 5))
+
+    def test_add_all_saves_once(self):
+        ledger = NotificationLedger(self.path)
+        saves = []
+        ledger.save = lambda: saves.append(1)
+        ledger.add_all([('a', 1000, 0), ('b', 1000, 0), ('a', 1000, 10)], now=900)
+        ledger.add_all([], now=900)
+        self.assertEqual(len(saves), 1)
+        self.assertTrue(ledger.contains('b', 1000, 0, now=900))
+        self.assertEqual(len(ledger), 3)
+
+    def test_clear_is_saved(self):
+        # Disconnecting the account must not leave the old reminders on disk
+        NotificationLedger(self.path).add('a', 4_000_000_000, 5)
+        NotificationLedger(self.path).clear()
+        self.assertEqual(len(NotificationLedger(self.path)), 0)
+
+    def test_entries_expire_after_the_event(self):
+        ledger = NotificationLedger(self.path, ttl_seconds=60)
+        ledger.add('a', 1000, 0, now=990)
+        self.assertTrue(ledger.contains('a', 1000, 0, now=1059))
+        self.assertFalse(ledger.contains('a', 1000, 0, now=1060))
+        ledger.add('b', 5000, 0, now=2000)
+        self.assertEqual(len(ledger), 1)
+
+    def test_size_is_bounded(self):
+        ledger = NotificationLedger(None, max_entries=10)
+        for i in range(100):
+            ledger.add(f'e{i}', 1000 + i, 0, now=0)
+        self.assertEqual(len(ledger), 10)
+        # The soonest-expiring entries go first
+        self.assertTrue(ledger.contains('e99', 1099, 0, now=0))
+        self.assertFalse(ledger.contains('e0', 1000, 0, now=0))
+
+    def test_corrupt_file_starts_empty(self):
+        self.path.write_text('{not json')
+        self.assertEqual(len(NotificationLedger(self.path)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from calendar_api.paging import iter_items, iter_pages
+
+
+class FakeListMethod:
+    """Stands in for service.events().list, serving fixed pages"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def __call__(self, **params):
+        self.calls.append(dict(params))
+        index = len(self.calls) - 1
+        pages = self.pages
+
+        class Request:
+            def execute(self):
+                return pages[index]
+
+        return Request()
+
+
+def make_pages(count, per_page):
+    pages = []
+    for p in range(count):
+        page = {'items': [{'id': f'{p}-{i}'} for i in range(per_page)]}
+        if p < count - 1:
+            page['nextPageToken'] = f'tok{p + 1}'
+        pages.append(page)
+    return pages
+
+
+class TestPaging(unittest.TestCase):
+    def test_follows_page_tokens(self):
+        method = FakeListMethod(make_pages(3, 2))
+        items = list(iter_items(iter_pages(method, page_size=2, calendarId='primary')))
+
+        self.assertEqual(len(items), 6)
+        self.assertNotIn('pageToken', method.calls[0])
+        self.assertEqual([c.get('pageToken') for c in method.calls[1:]], ['tok1', 'tok2'])
+        self.assertTrue(all(c['maxResults'] == 2 and c['calendarId'] == 'primary' for c in method.calls))
+
+    def test_limit_stops_fetching_pages(self):
+        method = FakeListMethod(make_pages(5, 2))
+        items = list(iter_items(iter_pages(method), limit=3))
+
+        self.assertEqual([i['id'] for i in items], ['0-0', '0-1', '1-0'])
+        self.assertEqual(len(method.calls), 2)
+
+    def test_pages_are_fetched_lazily(self):
+        method = FakeListMethod(make_pages(3, 1))
+        stream = iter_items(iter_pages(method))
+        next(stream)
+        self.assertEqual(len(method.calls), 1)
+        stream.close()
+        self.assertEqual(len(method.calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta
+
+from dateutil import tz
+
+from calendar_api.recurrence import RecurrenceExpander
+
+NEW_YORK = tz.gettz('America/New_York')
+
+
+def standup(**extra):
+    master = {
+        'id': 'standup',
+        'etag': '"1"',
+        'summary': 'Standup',
+        'start': {'dateTime': '2024-03-04T09:00:00-05:00', 'timeZone': 'America/New_York'},
+        'end': {'dateTime': '2024-03-04T09:15:00-05:00', 'timeZone': 'America/New_York'},
+        'recurrence': ['RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20240401T000000Z'],
+    }
+    master.update(extra)
+    return master
+
+
+def window(start_day, end_day):
+    return (datetime(2024, 3, start_day, tzinfo=NEW_YORK), datetime(2024, 3, end_day, tzinfo=NEW_YORK))
+
+
+class TestRecurrenceExpander(unittest.TestCase):
+    def setUp(self):
+        self.expander = RecurrenceExpander()
+
+    def test_weekly_series_keeps_wall_time_across_dst(self):
+        instances = self.expander.expand(standup(), *window(1, 31))
+        self.assertEqual([i['id'] for i in instances], [
+            'standup_20240304T140000Z', 'standup_20240311T130000Z',
+            'standup_20240318T130000Z', 'standup_20240325T130000Z',
+        ])
+        # 09:00 local before and after the DST change on March 10
+        for instance in instances:
+            start = datetime.fromisoformat(instance['start']['dateTime']).astimezone(NEW_YORK)
+            self.assertEqual((start.hour, start.minute), (9, 0))
+        first = instances[0]
+        self.assertEqual(first['recurringEventId'], 'standup')
+        self.assertEqual(first['summary'], 'Standup')
+        self.assertEqual(first['end']['dateTime'], '2024-03-04T09:15:00-05:00')
+        self.assertNotIn('recurrence', first)
+
+    def test_exdate_rdate_and_exceptions(self):
+        master = standup(recurrence=[
+            'RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20240401T000000Z',
+            'EXDATE;TZID=America/New_York:20240311T090000',
+            'RDATE;TZID=America/New_York:20240313T090000',
+        ])
+        moved = {
+            'id': 'standup_20240318T130000Z', 'recurringEventId': 'standup', 'summary': 'Standup (late)',
+            'originalStartTime': {'dateTime': '2024-03-18T09:00:00-04:00'},
+            'start': {'dateTime': '2024-03-18T11:00:00-04:00'},
+            'end': {'dateTime': '2024-03-18T11:15:00-04:00'},
+        }
+        cancelled = {
+            'id': 'standup_20240325T130000Z', 'recurringEventId': 'standup', 'status': 'cancelled',
+            'originalStartTime': {'dateTime': '2024-03-25T13:00:00Z'},
+        }
+        instances = self.expander.expand(master, *window(1, 31), exceptions=[moved, cancelled])
+        self.assertEqual([i['id'] for i in instances], [
+            'standup_20240304T140000Z', 'standup_20240313T130000Z', 'standup_20240318T130000Z',
+        ])
+        self.assertEqual(instances[2]['summary'], 'Standup (late)')
+
+    def test_window_includes_occurrences_already_in_progress(self):
+        start = datetime(2024, 3, 4, 9, 10, tzinfo=NEW_YORK)
+        instances = self.expander.expand(standup(), start, start + timedelta(hours=1))
+        self.assertEqual([i['id'] for i in instances], ['standup_20240304T140000Z'])
+
+    def test_all_day_series(self):
+        master = {
+            'id': 'gym', 'start': {'date': '2024-03-01'}, 'end': {'date': '2024-03-02'},
+            'recurrence': ['RRULE:FREQ=DAILY;COUNT=3'],
+        }
+        instances = self.expander.expand(master, datetime(2024, 2, 1).astimezone(), datetime(2024, 4, 1).astimezone())
+        self.assertEqual([i['id'] for i in instances], ['gym_20240301', 'gym_20240302', 'gym_20240303'])
+        self.assertEqual(instances[1]['start'], {'date': '2024-03-02'})
+        self.assertEqual(instances[1]['end'], {'date': '2024-03-03'})
+
+    def test_expanded_windows_are_memoized_per_series_version(self):
+        first = self.expander.occurrences(standup(), *window(1, 31))
+        self.assertIs(self.expander.occurrences(standup(), *window(1, 31)), first)
+        changed = self.expander.occurrences(
+            standup(etag='"2"', recurrence=['RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=2']), *window(1, 31))
+        self.assertEqual(len(changed), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from calendar_api.reminders import (
+    ReminderSchedule, burst_message, event_reminder_minutes, load_reminder_events, starts_in_text
+)
+from calendar_api.store import EventStore
+
+
+BASE = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc).timestamp()
+
+
+def event(event_id, minutes_after_base, **extra):
+    start = datetime.fromtimestamp(BASE + minutes_after_base * 60, timezone.utc).isoformat()
+    return dict({'id': event_id, 'start': {'dateTime': start}, 'end': {'dateTime': start}}, **extra)
+
+
+class TestReminderSchedule(unittest.TestCase):
+    def test_fires_in_time_order(self):
+        schedule = ReminderSchedule()
+        schedule.add(event('late', 30), [0])
+        schedule.add(event('early', 10), [0, 5])
+        self.assertEqual(schedule.next_due(), BASE + 5 * 60)
+
+        self.assertEqual(schedule.pop_due(BASE), [])
+        due = schedule.pop_due(BASE + 10 * 60)
+        self.assertEqual([(r.event_id, r.minutes) for r in due], [('early', 5), ('early', 0)])
+        self.assertEqual(schedule.next_due(), BASE + 30 * 60)
+
+    def test_replacing_and_removing_invalidate_old_entries(self):
+        schedule = ReminderSchedule()
+        schedule.add(event('a', 10), [0])
+        schedule.add(event('a', 20), [0])  # moved
+        schedule.add(event('b', 5), [0])
+        schedule.remove('b')
+        self.assertEqual(schedule.next_due(), BASE + 20 * 60)
+        due = schedule.pop_due(BASE + 60 * 60 - 1)
+        self.assertEqual([r.start_ts for r in due], [])  # more than a minute late
+        schedule.add(event('a', 20), [0])
+        self.assertEqual([r.start_ts for r in schedule.pop_due(BASE + 20 * 60 + 30)], [BASE + 20 * 60])
+
+    def test_skips_all_day_and_cancelled_events(self):
+        schedule = ReminderSchedule()
+        self.assertEqual(schedule.add({'id': 'd', 'start': {'date': '2024-05-01'}}, [0]), 0)
+        self.assertEqual(schedule.add(event('c', 10, status='cancelled'), [0]), 0)
+        self.assertIsNone(schedule.next_due())
+        self.assertEqual(len(schedule), 0)
+
+    def test_rebuild_matches_incremental_adds(self):
+        schedule = ReminderSchedule()
+        schedule.add(event('old', 1), [0])
+        schedule.rebuild([(event('a', 30), [0, 10]), (event('b', 15), [0])])
+        self.assertNotIn('old', schedule)
+        due = [r for minute in (15, 20, 30) for r in schedule.pop_due(BASE + minute * 60)]
+        self.assertEqual([(r.event_id, r.minutes) for r in due], [('b', 0), ('a', 10), ('a', 0)])
+
+    def test_reminder_minutes_follow_overrides_or_calendar_defaults(self):
+        defaults = [{'method': 'popup', 'minutes': 10}, {'method': 'email', 'minutes': 60}]
+        overrides = {'useDefault': False, 'overrides': [{'method': 'popup', 'minutes': 30},
+                                                        {'method': 'popup', 'minutes': 5}]}
+        self.assertEqual(event_reminder_minutes(event('a', 0, reminders=overrides), defaults), [5, 30])
+        self.assertEqual(event_reminder_minutes(event('a', 0, reminders={'useDefault': True}), defaults), [10])
+        # Events stored without the field follow the calendar
+        self.assertEqual(event_reminder_minutes(event('a', 0), defaults), [10])
+        self.assertEqual(event_reminder_minutes(event('a', 0, reminders={'useDefault': False}), defaults), [])
+        self.assertEqual(event_reminder_minutes(event('a', 0)), [])
+
+    def test_burst_is_summarised_in_one_message(self):
+        schedule = ReminderSchedule()
+        for i in range(6):
+            schedule.add(event(f'e{i}', 0, summary=f'Focus {i}'), [0])
+        schedule.add(event('review', 10, summary='Review'), [10])
+        burst = schedule.pop_due(BASE)
+        self.assertEqual(len(burst), 7)
+
+        title, message = burst_message(burst, BASE)
+        self.assertEqual(title, "7 upcoming events")
+        lines = message.split("\n")
+        self.assertEqual(lines[0], "Focus 0 – now")
+        self.assertEqual(lines[-1], "and 3 more")
+        self.assertEqual(burst_message(burst[:2], BASE)[0], "2 events starting now")
+
+    def test_starts_in_text(self):
+        self.assertEqual(starts_in_text(0.5), "Starting now")
+        self.assertEqual(starts_in_text(-0.9), "Starting now")
+        self.assertEqual(starts_in_text(14.99), "Starting in 15 minutes")
+
+    def test_stale_entries_are_compacted(self):
+        schedule = ReminderSchedule()
+        for _ in range(200):
+            schedule.add(event('a', 10), [0, 5])
+        self.assertLessEqual(len(schedule._heap), 64 * 2)
+        self.assertEqual(len(schedule.pop_due(BASE + 10 * 60)), 2)
+
+
+class TestLoadReminderEvents(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = EventStore(self.tmpdir)
+        self.now = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def stored(self, event_id, days_ahead, **extra):
+        start = (self.now + timedelta(days=days_ahead)).isoformat()
+        return dict({'id': event_id, 'start': {'dateTime': start}, 'end': {'dateTime': start}}, **extra)
+
+    def test_window_reaches_the_longest_reminder(self):
+        two_days = {'useDefault': False, 'overrides': [{'method': 'popup', 'minutes': 2 * 1440}]}
+        self.store.replace_calendar('primary', [
+            self.stored('soon', 0.5),
+            self.stored('offsite', 2.5, reminders=two_days),
+        ])
+        ids = [e['id'] for e in load_reminder_events(self.store, self.now)]
+        self.assertEqual(ids, ['soon', 'offsite'])
+
+        # The 2-day reminder of 'offsite' is scheduled and fires 48h ahead
+        schedule = ReminderSchedule()
+        for e in load_reminder_events(self.store, self.now):
+            schedule.add(e, event_reminder_minutes(e))
+        due = schedule.pop_due(self.now.timestamp() + 12 * 3600)
+        self.assertEqual([(r.event_id, r.minutes) for r in due], [('offsite', 2880)])
+
+    def test_window_covers_calendar_defaults_and_is_tagged(self):
+        self.store.replace_calendar('team', [self.stored('later', 5)],
+                                    default_reminders=[{'method': 'popup', 'minutes': 7 * 1440}])
+        events = load_reminder_events(self.store, self.now)
+        self.assertEqual([(e['id'], e['calendarId']) for e in events], [('later', 'team')])
+
+        self.store.replace_calendar('team', [self.stored('later', 5)], default_reminders=[])
+        self.assertEqual(load_reminder_events(self.store, self.now), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
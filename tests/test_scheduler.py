@@ -0,0 +1,186 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from calendar_api.scheduler import AdaptiveCadence, SyncScheduler, clamp_interval
+from config.settings import Config, SettingsManager
+
+MINUTE_MS = 60000
+
+
+class TempSettingsManager(SettingsManager):
+    """SettingsManager rooted in a temporary directory instead of the user's profile"""
+
+    def __init__(self, temp_dir: Path):
+        self.temp_dir = temp_dir
+        super().__init__()
+
+    def _get_app_data_dir(self):
+        return self.temp_dir
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class FastScheduler(SyncScheduler):
+    """Periodic syncs every 50ms instead of at least a minute"""
+
+    def next_delay(self):
+        return 0.05
+
+
+class TestSyncScheduler(unittest.TestCase):
+    def test_interval_is_clamped(self):
+        self.assertEqual(clamp_interval(1000), Config.MIN_SYNC_INTERVAL)
+        self.assertEqual(clamp_interval(10 ** 9), Config.MAX_SYNC_INTERVAL)
+        self.assertEqual(clamp_interval('junk'), Config.DEFAULT_SYNC_INTERVAL)
+        self.assertEqual(SyncScheduler(lambda: False, 5 * 60000).interval_ms, 5 * 60000)
+
+    def test_requests_during_a_sync_collapse_into_one_more_run(self):
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def sync():
+            runs.append(1)
+            started.set()
+            release.wait(2)
+            return True
+
+        results = []
+        scheduler = SyncScheduler(sync)
+        scheduler.subscribe(results.append)
+        scheduler.start()
+        self.assertTrue(started.wait(2))
+        for _ in range(5):
+            scheduler.request_sync()
+        release.set()
+        self.assertTrue(wait_for(lambda: len(results) == 2))
+        time.sleep(0.05)
+        scheduler.stop()
+        self.assertEqual(len(runs), 2)
+        self.assertEqual(results, [True, True])
+
+    def test_runs_periodically_and_survives_failures(self):
+        calls = []
+
+        def sync():
+            calls.append(1)
+            if len(calls) == 1:
+                raise IOError("offline")
+            return False
+
+        results = []
+        scheduler = FastScheduler(sync)
+        scheduler.subscribe(results.append)
+        scheduler.start()
+        self.assertTrue(wait_for(lambda: len(results) >= 3))
+        scheduler.stop()
+        self.assertEqual(results[:3], [False, False, False])
+
+    def test_idle_scheduler_waits_for_the_interval(self):
+        results = []
+        scheduler = SyncScheduler(lambda: False)
+        scheduler.subscribe(results.append)
+        scheduler.start()
+        self.assertTrue(wait_for(lambda: len(results) == 1))
+        # Changing the interval reschedules without syncing
+        scheduler.set_interval(2 * 60000)
+        time.sleep(0.1)
+        scheduler.stop()
+        self.assertEqual(len(results), 1)
+        self.assertAlmostEqual(scheduler.next_sync_at - scheduler.last_sync_at, 120, delta=0.01)
+
+    def test_minute_ticks_only_while_subscribed(self):
+        ticks = []
+        scheduler = SyncScheduler(lambda: False)
+        self.assertIsNone(scheduler._timeout())
+        tick = lambda: ticks.append(1)
+        scheduler.subscribe_minutes(tick)
+        self.assertLessEqual(scheduler._timeout(), 60.05)
+
+        minute = scheduler._last_minute * 60
+        self.assertFalse(scheduler._tick_if_due(minute + 30))
+        self.assertTrue(scheduler._tick_if_due(minute + 60))
+        self.assertFalse(scheduler._tick_if_due(minute + 90))
+        self.assertEqual(len(ticks), 1)
+
+        scheduler.unsubscribe_minutes(tick)
+        self.assertFalse(scheduler._tick_if_due(minute + 120))
+        self.assertIsNone(scheduler._timeout())
+
+
+class TestAdaptiveCadence(unittest.TestCase):
+    def setUp(self):
+        self.cadence = AdaptiveCadence(2 * MINUTE_MS, MINUTE_MS, 30 * MINUTE_MS)
+        # A weekday afternoon in local time
+        self.now = datetime(2024, 5, 1, 14, 0).timestamp()
+
+    def delay(self, minutes_to_next_event=None, now=None):
+        now = self.now if now is None else now
+        next_start = None if minutes_to_next_event is None else now + minutes_to_next_event * 60
+        return self.cadence.next_delay_ms(now, next_start)
+
+    def test_base_interval_when_an_event_is_a_while_off(self):
+        self.assertEqual(self.delay(60), 2 * MINUTE_MS)
+
+    def test_fast_right_before_an_event(self):
+        self.assertEqual(self.delay(10), MINUTE_MS)
+
+    def test_never_sleeps_past_the_pre_event_window(self):
+        for _ in range(30):
+            self.cadence.record(False)
+        # Backed off to the maximum, but the event's lead window opens in 5 minutes
+        self.assertEqual(self.delay(20), 5 * MINUTE_MS)
+
+    def test_backs_off_while_nothing_changes(self):
+        delays = []
+        for _ in range(9):
+            self.cadence.record(False)
+            delays.append(self.delay(120))
+        self.assertEqual(delays[0], 2 * MINUTE_MS)
+        self.assertEqual(delays[-1], 16 * MINUTE_MS)
+        self.cadence.record(True)
+        self.assertEqual(self.delay(120), 2 * MINUTE_MS)
+
+    def test_long_free_stretch_and_overnight(self):
+        self.assertEqual(self.delay(None), 8 * MINUTE_MS)
+        night = datetime(2024, 5, 1, 2, 0).timestamp()
+        self.assertEqual(self.delay(None, now=night), 8 * MINUTE_MS)  # still seeing changes
+        self.cadence.record(False)
+        self.assertEqual(self.delay(None, now=night), 30 * MINUTE_MS)
+
+    def test_a_longer_user_interval_is_not_clamped(self):
+        cadence = AdaptiveCadence(60 * MINUTE_MS, MINUTE_MS, 15 * MINUTE_MS)
+        self.assertEqual(cadence.next_delay_ms(self.now, self.now + 120 * 60), 60 * MINUTE_MS)
+        for _ in range(30):
+            cadence.record(False)
+        # Backing off stops at the user's interval
+        self.assertEqual(cadence.next_delay_ms(self.now, None), 60 * MINUTE_MS)
+        self.assertEqual(cadence.next_delay_ms(self.now, self.now + 5 * 60), MINUTE_MS)
+
+    def test_bounds_come_from_settings(self):
+        tmpdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        settings = TempSettingsManager(tmpdir)
+        settings.settings = dict(settings.default_settings, sync_interval_min=1000, sync_interval_max=10 ** 9)
+        self.assertEqual(settings.get_sync_bounds(), (Config.MIN_SYNC_INTERVAL, Config.MAX_SYNC_INTERVAL))
+        settings.settings.update(sync_interval_min=5 * MINUTE_MS, sync_interval_max=2 * MINUTE_MS)
+        self.assertEqual(settings.get_sync_bounds(), (5 * MINUTE_MS, 5 * MINUTE_MS))
+
+    def test_scheduler_uses_the_cadence(self):
+        scheduler = SyncScheduler(lambda: False, 2 * MINUTE_MS, cadence=self.cadence,
+                                  next_event_start=lambda: time.time() + 5 * 60)
+        self.assertEqual(scheduler.next_delay(), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+
+from calendar_api.snapshot import EventFeed
+
+
+class TestEventFeed(unittest.TestCase):
+    def test_reader_never_waits_for_a_slow_loader(self):
+        started = threading.Event()
+        release = threading.Event()
+        published = threading.Event()
+        batches = [[{'id': 'a'}], [{'id': 'a'}, {'id': 'b'}]]
+
+        def slow_loader():
+            started.set()
+            release.wait(2)  # stands in for a slow disk or network read
+            return batches.pop(0)
+
+        feed = EventFeed(slow_loader)
+        feed.subscribe(lambda snapshot: published.set())
+        feed.start()
+        self.assertTrue(started.wait(2))
+
+        # The "UI thread" reads while the loader is blocked
+        begin = time.monotonic()
+        snapshot = feed.snapshot
+        self.assertLess(time.monotonic() - begin, 0.05)
+        self.assertFalse(snapshot.is_loaded)
+        self.assertEqual(snapshot.events, ())
+
+        release.set()
+        self.assertTrue(published.wait(2))
+        self.assertEqual(feed.snapshot.version, 1)
+        self.assertEqual([e['id'] for e in feed.snapshot.events], ['a'])
+
+        # While a reload is blocked, readers keep getting the previous snapshot
+        published.clear()
+        release.clear()
+        started.clear()
+        feed.refresh()
+        self.assertTrue(started.wait(2))
+        self.assertEqual(feed.snapshot.version, 1)
+        release.set()
+        self.assertTrue(published.wait(2))
+        self.assertEqual([e['id'] for e in feed.snapshot.events], ['a', 'b'])
+        feed.stop()
+
+    def test_loader_errors_keep_the_last_snapshot(self):
+        published = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            if len(calls) > 1:
+                raise IOError("database is locked")
+            return [{'id': 'a'}]
+
+        feed = EventFeed(loader)
+        feed.subscribe(lambda snapshot: published.set())
+        feed.start()
+        self.assertTrue(published.wait(2))
+        feed.refresh()
+        deadline = time.monotonic() + 2
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(feed.snapshot.version, 1)
+        self.assertEqual([e['id'] for e in feed.snapshot.events], ['a'])
+        feed.stop()
+
+    def test_snapshots_carry_changes_and_unchanged_reloads_are_not_published(self):
+        published = []
+        batches = [
+            [{'id': 'a', 'etag': '1'}],
+            [{'id': 'a', 'etag': '1'}],
+            [{'id': 'a', 'etag': '2'}, {'id': 'b', 'etag': '1'}],
+        ]
+        loaded = threading.Semaphore(0)
+
+        def loader():
+            try:
+                return batches.pop(0)
+            finally:
+                loaded.release()
+
+        feed = EventFeed(loader)
+        feed.subscribe(published.append)
+        feed.start()
+        for _ in range(3):
+            self.assertTrue(loaded.acquire(timeout=2))
+            if batches:
+                feed.refresh()
+        deadline = time.monotonic() + 2
+        while len(published) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        feed.stop()
+
+        self.assertEqual([s.version for s in published], [1, 2])
+        self.assertEqual([e['id'] for e in published[0].changes.added], ['a'])
+        changes = published[1].changes
+        self.assertEqual([e['id'] for e in changes.added], ['b'])
+        self.assertEqual([new['etag'] for _, new in changes.changed], ['2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
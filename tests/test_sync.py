@@ -0,0 +1,338 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from calendar_api.store import EventStore
+from calendar_api.sync import SyncEngine
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type('Resp', (), {'status': status})()
+
+
+class FakeRequest:
+    def __init__(self, service, params):
+        self.service = service
+        self.params = params
+
+    def execute(self):
+        self.service.calls.append(self.params)
+        response = self.service.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeService:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        return FakeRequest(self, dict(params))
+
+
+class PerCalendarService:
+    """Serves one full-sync page per calendar; safe to call from several threads"""
+
+    def __init__(self, events_by_calendar, failing=()):
+        self.events_by_calendar = events_by_calendar
+        self.failing = set(failing)
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, **params):
+        service = self
+
+        class Request:
+            def execute(self):
+                if calendarId in service.failing:
+                    raise FakeHttpError(403)
+                return {'items': service.events_by_calendar[calendarId], 'nextSyncToken': f'tok-{calendarId}'}
+
+        return Request()
+
+
+class BatchingService(PerCalendarService):
+    """Also runs batch requests; syncToken queries return changes_by_calendar"""
+
+    def __init__(self, events_by_calendar, changes_by_calendar=None, expired=()):
+        super().__init__(events_by_calendar)
+        self.changes_by_calendar = changes_by_calendar or {}
+        self.expired = set(expired)
+        self.round_trips = 0
+        self.token_queries = []
+
+    def new_batch_http_request(self, callback=None):
+        service = self
+
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id=None):
+                self.requests.append((request_id, request))
+
+            def execute(self):
+                service.round_trips += 1
+                for request_id, request in self.requests:
+                    try:
+                        callback(request_id, request.execute(), None)
+                    except Exception as e:
+                        callback(request_id, None, e)
+
+        return Batch()
+
+    def list(self, calendarId, **params):
+        if 'syncToken' not in params:
+            return super().list(calendarId, **params)
+        self.token_queries.append(calendarId)
+        service = self
+
+        class Request:
+            def execute(self):
+                if calendarId in service.expired:
+                    raise FakeHttpError(410)
+                return {'items': service.changes_by_calendar.get(calendarId, []),
+                        'nextSyncToken': f'tok2-{calendarId}'}
+
+        return Request()
+
+
+class FakeClient:
+    def __init__(self, service):
+        self.service = service
+
+
+def make_event(event_id, start, minutes=30, status='confirmed'):
+    return {
+        'id': event_id,
+        'status': status,
+        'summary': event_id,
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(minutes=minutes)).isoformat()},
+    }
+
+
+class TestSyncEngine(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = EventStore(self.tmpdir)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def stored_ids(self):
+        far = timedelta(days=365)
+        return {e['id'] for e in self.store.get_events_between(self.now - far, self.now + far)}
+
+    def test_full_sync_follows_pages_and_stores_token(self):
+        service = FakeService([
+            {'items': [make_event('a', self.now)], 'nextPageToken': 'p2'},
+            {'items': [make_event('b', self.now + timedelta(hours=1))], 'nextSyncToken': 'tok1'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        result = engine.sync()
+
+        self.assertTrue(result.full_sync)
+        self.assertEqual(self.stored_ids(), {'a', 'b'})
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok1')
+        self.assertEqual(service.calls[1]['pageToken'], 'p2')
+        self.assertIn('timeMin', service.calls[0])
+        self.assertIn('nextSyncToken', service.calls[0]['fields'])
+        self.assertNotIn('description', service.calls[0]['fields'])
+
+    def test_incremental_sync_applies_changes_and_deletions(self):
+        service = FakeService([
+            {'items': [make_event('a', self.now), make_event('b', self.now)], 'nextSyncToken': 'tok1'},
+            {'items': [make_event('a', self.now, minutes=60), {'id': 'b', 'status': 'cancelled'},
+                       make_event('c', self.now)], 'nextSyncToken': 'tok2'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        engine.sync()
+        result = engine.sync()
+
+        self.assertFalse(result.full_sync)
+        self.assertEqual(service.calls[1]['syncToken'], 'tok1')
+        self.assertNotIn('timeMin', service.calls[1])
+        self.assertEqual(result.deleted, ['b'])
+        self.assertEqual(self.stored_ids(), {'a', 'c'})
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok2')
+
+    def test_calendar_default_reminders_are_stored(self):
+        defaults = [{'method': 'popup', 'minutes': 10}]
+        service = FakeService([
+            {'items': [make_event('a', self.now)], 'defaultReminders': defaults, 'nextSyncToken': 'tok1'},
+        ])
+        SyncEngine(FakeClient(service), self.store, coalesce_seconds=0).sync()
+        self.assertEqual(self.store.get_default_reminders(), {'primary': defaults})
+        self.assertIn('defaultReminders', service.calls[0]['fields'])
+        self.assertIn('reminders', service.calls[0]['fields'])
+
+    def test_removed_default_reminders_are_cleared(self):
+        defaults = [{'method': 'popup', 'minutes': 10}]
+        service = FakeService([
+            {'items': [make_event('a', self.now)], 'defaultReminders': defaults, 'nextSyncToken': 'tok1'},
+            {'items': [], 'nextSyncToken': 'tok2'},
+            FakeHttpError(410),
+            {'items': [make_event('a', self.now)], 'defaultReminders': defaults, 'nextSyncToken': 'tok3'},
+            FakeHttpError(410),
+            {'items': [make_event('a', self.now)], 'nextSyncToken': 'tok4'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        engine.sync()
+        engine.sync()  # incremental response without the field
+        self.assertEqual(self.store.get_default_reminders(), {'primary': []})
+        engine.sync()  # full resync restores them
+        self.assertEqual(self.store.get_default_reminders(), {'primary': defaults})
+        engine.sync()  # full resync without the field
+        self.assertEqual(self.store.get_default_reminders(), {'primary': []})
+
+    def test_gone_falls_back_to_full_sync(self):
+        service = FakeService([
+            {'items': [make_event('a', self.now)], 'nextSyncToken': 'tok1'},
+            FakeHttpError(410),
+            {'items': [make_event('z', self.now)], 'nextSyncToken': 'tok9'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        engine.sync()
+        result = engine.sync()
+
+        self.assertTrue(result.full_sync)
+        self.assertEqual(self.stored_ids(), {'z'})
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok9')
+
+    def test_other_errors_propagate(self):
+        service = FakeService([
+            {'items': [], 'nextSyncToken': 'tok1'},
+            FakeHttpError(500),
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        engine.sync()
+        with self.assertRaises(FakeHttpError):
+            engine.sync()
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok1')
+
+    def test_get_events_filters_by_window(self):
+        service = FakeService([
+            {'items': [make_event('later', self.now + timedelta(hours=3)),
+                       make_event('soon', self.now + timedelta(minutes=10)),
+                       make_event('running', self.now - timedelta(minutes=10))],
+             'nextSyncToken': 'tok1'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        engine.sync()
+        events = engine.get_events(self.now, self.now + timedelta(hours=1))
+        self.assertEqual([e['id'] for e in events], ['running', 'soon'])
+
+
+    def test_sync_calendars_in_parallel(self):
+        service = PerCalendarService({
+            'primary': [make_event('p1', self.now)],
+            'team': [make_event('t1', self.now), make_event('t2', self.now)],
+            'broken': [],
+        }, failing=['broken'])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        results = engine.sync_calendars(['primary', 'team', 'broken'], max_workers=3)
+
+        self.assertTrue(results['team'].full_sync)
+        self.assertIsNotNone(results['broken'].error)
+        self.assertEqual(self.stored_ids(), {'p1', 't1', 't2'})
+        self.assertEqual(self.store.get_sync_token('team'), 'tok-team')
+        self.assertIsNone(self.store.get_sync_token('broken'))
+
+
+    def test_incremental_syncs_are_batched(self):
+        service = BatchingService(
+            {'primary': [make_event('p1', self.now)], 'team': [make_event('t1', self.now)],
+             'new': [make_event('n1', self.now)]},
+            changes_by_calendar={'primary': [make_event('p2', self.now)]},
+            expired=['team'],
+        )
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0)
+        engine.sync_calendars(['primary', 'team'])
+        results = engine.sync_calendars(['primary', 'team', 'new'])
+
+        # primary and team share one batch; 'new' has no token yet and lists on its own
+        self.assertEqual(service.round_trips, 1)
+        self.assertEqual(sorted(service.token_queries), ['primary', 'team'])
+        self.assertFalse(results['primary'].full_sync)
+        self.assertEqual(self.store.get_sync_token('primary'), 'tok2-primary')
+        # An expired token in the batch falls back to a full sync of that calendar
+        self.assertTrue(results['team'].full_sync)
+        self.assertEqual(self.store.get_sync_token('team'), 'tok-team')
+        self.assertEqual(self.stored_ids(), {'p1', 'p2', 't1', 'n1'})
+
+    def test_back_to_back_syncs_are_coalesced(self):
+        service = FakeService([
+            {'items': [make_event('a', self.now)], 'nextSyncToken': 'tok1'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=60)
+        first = engine.sync()
+        second = engine.sync()
+
+        self.assertIs(first, second)
+        self.assertEqual(len(service.calls), 1)
+
+
+    def daily_series(self, event_id='daily', etag='"1"'):
+        start = (self.now - timedelta(days=2)).replace(hour=9, minute=0, second=0)
+        return dict(make_event(event_id, start), etag=etag, recurrence=['RRULE:FREQ=DAILY;COUNT=5'])
+
+    def test_series_are_expanded_locally(self):
+        master = self.daily_series()
+        moved_id = 'daily_' + (datetime.fromisoformat(master['start']['dateTime'])
+                               + timedelta(days=1)).strftime('%Y%m%dT%H%M%SZ')
+        moved = dict(make_event(moved_id, self.now - timedelta(days=1, hours=-3)),
+                     recurringEventId='daily',
+                     originalStartTime={'dateTime': (datetime.fromisoformat(master['start']['dateTime'])
+                                                     + timedelta(days=1)).isoformat()})
+        service = FakeService([
+            {'items': [master, moved, make_event('single', self.now)], 'nextSyncToken': 'tok1'},
+            {'items': [dict(moved, status='cancelled'), make_event('other', self.now)], 'nextSyncToken': 'tok2'},
+            {'items': [{'id': 'daily', 'status': 'cancelled'}], 'nextSyncToken': 'tok3'},
+        ])
+        engine = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0, expand_recurrence=True)
+        engine.sync()
+
+        self.assertFalse(service.calls[0]['singleEvents'])
+        self.assertIn('recurrence', service.calls[0]['fields'])
+        self.assertEqual(len(self.stored_ids()), 6)
+        self.assertIn(moved_id, self.stored_ids())
+        self.assertEqual(self.store.get_sync_token('primary'), 'series:tok1')
+
+        # Cancelling one instance removes only that instance
+        engine.sync()
+        self.assertEqual(service.calls[1]['syncToken'], 'tok1')
+        self.assertNotIn(moved_id, self.stored_ids())
+        self.assertEqual(len(self.stored_ids()), 6)
+
+        # Deleting the series removes every instance
+        engine.sync()
+        self.assertEqual(self.stored_ids(), {'single', 'other'})
+        self.assertEqual(self.store.get_series('primary'), {})
+
+    def test_switching_expansion_mode_forces_full_sync(self):
+        service = FakeService([
+            {'items': [make_event('a', self.now)], 'nextSyncToken': 'tok1'},
+            {'items': [self.daily_series()], 'nextSyncToken': 'tok2'},
+        ])
+        SyncEngine(FakeClient(service), self.store, coalesce_seconds=0).sync()
+        result = SyncEngine(FakeClient(service), self.store, coalesce_seconds=0, expand_recurrence=True).sync()
+
+        self.assertTrue(result.full_sync)
+        self.assertNotIn('syncToken', service.calls[1])
+        self.assertEqual(len(self.stored_ids()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import queue
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from calendar_api.events import EventIndex
+from calendar_api.snapshot import EventFeed
+from ui.task_display import TaskDisplayWindow
+
+
+class FakeRoot:
+    """Stands in for tk.Tk: after() callbacks run only when the test runs them"""
+
+    def __init__(self):
+        self.pending = []
+        self.callers = set()
+
+    def after(self, delay_ms, callback):
+        # Tk may only be called from its own thread
+        self.callers.add(threading.current_thread())
+        self.pending.append(callback)
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+class FakeLabel:
+    def __init__(self):
+        self.text = None
+
+    def config(self, text=None):
+        self.text = text
+
+
+def make_event(event_id, start, minutes):
+    return {
+        'id': event_id,
+        'summary': event_id,
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(minutes=minutes)).isoformat()},
+    }
+
+
+class FakeClock:
+    """SyncScheduler stand-in whose minute ticks the test fires"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe_minutes(self, callback):
+        self.subscribers.append(callback)
+
+    def tick(self):
+        for callback in self.subscribers:
+            callback()
+
+
+def make_window(feed, clock=None):
+    # No display here: build the window without tk.Tk() and swap in fakes
+    window = TaskDisplayWindow.__new__(TaskDisplayWindow)
+    window.event_feed = feed
+    window.clock = clock
+    window.command_queue = queue.Queue()
+    window._running = False
+    window._poll_ms = TaskDisplayWindow.POLL_MIN_MS
+    window.root = FakeRoot()
+    window.time_label, window.task_label, window.ending_label = FakeLabel(), FakeLabel(), FakeLabel()
+    window.auto_resize = lambda: None
+    window._rendered = False
+    window.event_index = EventIndex()
+    window._indexed = {}
+    window._index_version = 0
+    return window
+
+
+class TestTaskDisplay(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.loads = []
+        self.events = [make_event('Standup', self.now - timedelta(minutes=10), 60),
+                       make_event('Review', self.now + timedelta(hours=2), 30)]
+        published = threading.Event()
+
+        def loader():
+            self.loads.append(threading.current_thread())
+            return list(self.events)
+
+        self.feed = EventFeed(loader, name='TestFeed')
+        self.feed.subscribe(lambda snapshot: published.set())
+        self.feed.start()
+        self.assertTrue(published.wait(2))
+        self.addCleanup(self.feed.stop)
+
+    def test_update_display_renders_the_snapshot_on_the_tk_thread(self):
+        window = make_window(self.feed)
+        loads = len(self.loads)
+
+        # Only schedules work for the Tk loop
+        window.update_display()
+        self.assertIsNone(window.task_label.text)
+        self.assertEqual(len(window.root.pending), 1)
+
+        window.root.run_pending()
+        self.assertEqual(window.task_label.text, 'Standup')
+        self.assertTrue(window.ending_label.text.startswith('Ending in'))
+        self.assertEqual(window._index_version, self.feed.snapshot.version)
+        # Rendering read the published snapshot; the loader (store) was not called again
+        self.assertEqual(len(self.loads), loads)
+        self.assertNotIn(threading.current_thread(), self.loads)
+
+    def test_worker_threads_only_queue_commands(self):
+        clock = FakeClock()
+        window = make_window(self.feed, clock)
+        clock.subscribe_minutes(window.request_refresh)
+        window._running = True
+        window.root.after(0, window.poll_commands)
+
+        # Snapshots, minute ticks and settings changes arrive on other threads
+        workers = [threading.Thread(target=window._on_snapshot, args=(self.feed.snapshot,)),
+                   threading.Thread(target=clock.tick),
+                   threading.Thread(target=window.request_hide)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(2)
+            self.assertFalse(worker.is_alive())
+        self.assertEqual(window.root.callers, {threading.current_thread()})
+        self.assertEqual(window.command_queue.qsize(), 3)
+
+        hidden = []
+        window._hide_window = lambda: hidden.append(True)
+        window.root.run_pending()  # poll: drains the queue, renders once, polls again
+        self.assertEqual(hidden, [True])
+        self.assertTrue(window.command_queue.empty())
+        self.assertEqual(window._poll_ms, TaskDisplayWindow.POLL_MIN_MS)
+        window.root.run_pending()
+        self.assertEqual(window.task_label.text, 'Standup')
+        self.assertEqual(window.root.callers, {threading.current_thread()})
+
+    def test_polling_stops_after_close(self):
+        window = make_window(None)
+        window._running = True
+        window._close = lambda: setattr(window, '_running', False)
+        window.close_window()
+        window.poll_commands()
+        self.assertEqual(window.root.pending, [])
+
+    def test_unloaded_feed_keeps_the_loading_text(self):
+        window = make_window(EventFeed(lambda: self.fail("loader must not run on the Tk thread")))
+        window.update_display()
+        window.root.run_pending()
+        self.assertIsNone(window.task_label.text)
+        self.assertFalse(window._rendered)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from calendar_api.timeline import HAS_NUMPY, EventTimeline
+
+
+def ts(day, hour, minute=0):
+    return int(datetime(2024, 5, day, hour, minute).timestamp())
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestEventTimeline(unittest.TestCase):
+    def setUp(self):
+        self.timeline = EventTimeline([
+            ('primary', 'standup', ts(1, 9), ts(1, 9, 30), False, 'confirmed'),
+            ('work', 'review', ts(1, 9, 15), ts(1, 10), False, 'tentative'),
+            ('primary', 'holiday', ts(2, 0), ts(3, 0), True, 'confirmed'),
+            ('primary', 'lunch', ts(2, 12), ts(2, 13), False, 'confirmed'),
+            ('primary', 'late', ts(2, 23), ts(3, 1), False, 'confirmed'),
+        ])
+
+    def ids(self, indexes):
+        return [self.timeline.event_ids[i] for i in indexes]
+
+    def test_overlapping_and_current(self):
+        self.assertEqual(self.ids(self.timeline.overlapping(ts(1, 9, 20), ts(1, 9, 25))), ['standup', 'review'])
+        self.assertEqual(self.ids(self.timeline.overlapping(ts(2, 11), ts(2, 12, 30))), ['holiday', 'lunch'])
+        self.assertEqual(self.ids(self.timeline.overlapping(ts(2, 11), ts(2, 12, 30), include_all_day=False)),
+                         ['lunch'])
+        self.assertEqual(self.ids(self.timeline.current(ts(1, 9, 45))), ['review'])
+
+    def test_next_after(self):
+        self.assertEqual(self.timeline.event_ids[self.timeline.next_after(ts(1, 9, 5))], 'review')
+        # Skips the all-day holiday by default
+        self.assertEqual(self.timeline.event_ids[self.timeline.next_after(ts(1, 11))], 'lunch')
+        self.assertIsNone(self.timeline.next_after(ts(2, 23)))
+
+    def test_busy_minutes_merge_overlaps_and_split_days(self):
+        busy = self.timeline.busy_minutes_per_day(date(2024, 5, 1), 3)
+        self.assertEqual(list(busy), [60.0, 120.0, 60.0])
+
+    def test_from_events(self):
+        start = datetime(2024, 5, 1, 9).astimezone()
+        timeline = EventTimeline.from_events([
+            {'id': 'a', 'start': {'dateTime': start.isoformat()},
+             'end': {'dateTime': (start + timedelta(hours=1)).isoformat()}},
+            {'id': 'b', 'start': {'date': '2024-05-01'}, 'end': {'date': '2024-05-02'}},
+            {'id': 'broken'},
+        ])
+        self.assertEqual(len(timeline), 2)
+        self.assertEqual(list(timeline.event_ids), ['b', 'a'])
+        self.assertEqual(timeline.calendars, ['primary'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from utils.timeparse import (get_zone, parse_date, parse_datetime, parse_event_bounds, parse_event_time,
+                             refresh_local_zone)
+
+
+class TestTimeParse(unittest.TestCase):
+    def test_rfc3339_variants(self):
+        expected = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+        self.assertEqual(parse_datetime('2024-05-01T09:30:00Z'), expected)
+        self.assertEqual(parse_datetime('2024-05-01T09:30:00.000Z'), expected)
+        self.assertEqual(parse_datetime('2024-05-01T05:30:00-04:00'), expected)
+        self.assertEqual(parse_datetime('2024-05-01T05:30:00-04:00').utcoffset(), timedelta(hours=-4))
+        # Naive input is taken as UTC
+        self.assertEqual(parse_datetime('2024-05-01T09:30:00'), expected)
+        self.assertIsNone(parse_datetime('not a time'))
+
+    def test_parses_are_memoized_and_zones_shared(self):
+        first = parse_datetime('2024-05-02T10:00:00+02:00')
+        self.assertIs(parse_datetime('2024-05-02T10:00:00+02:00'), first)
+        self.assertIs(parse_datetime('2024-06-02T11:00:00+02:00').tzinfo, first.tzinfo)
+
+    def test_all_day_dates_are_local_midnight(self):
+        start = parse_date('2024-05-01')
+        self.assertEqual(start, datetime(2024, 5, 1).astimezone())
+        self.assertIsNotNone(start.tzinfo)
+        self.assertIsNone(parse_date('2024-13-01'))
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), "time.tzset is not available")
+    def test_zone_change_drops_memoized_dates(self):
+        saved = os.environ.get('TZ')
+
+        def restore():
+            if saved is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = saved
+            refresh_local_zone()
+
+        self.addCleanup(restore)
+        os.environ['TZ'] = 'UTC'
+        refresh_local_zone()
+        self.assertEqual(parse_date('2024-05-01').utcoffset(), timedelta(0))
+        os.environ['TZ'] = 'Asia/Tokyo'
+        self.assertTrue(refresh_local_zone())
+        self.assertEqual(parse_date('2024-05-01').utcoffset(), timedelta(hours=9))
+        self.assertFalse(refresh_local_zone())
+
+    def test_event_objects(self):
+        self.assertIsNone(parse_event_time({}))
+        self.assertIsNone(parse_event_time(None))
+        event = {'start': {'dateTime': '2024-05-01T09:00:00Z'}, 'end': {'dateTime': '2024-05-01T10:00:00Z'}}
+        start, end = parse_event_bounds(event)
+        self.assertEqual(end - start, timedelta(hours=1))
+        self.assertEqual(parse_event_bounds({'start': {'date': '2024-05-01'}}), (None, None))
+
+    def test_zones_are_cached(self):
+        zone = get_zone('Europe/Paris')
+        self.assertIs(get_zone('Europe/Paris'), zone)
+        self.assertEqual(datetime(2024, 7, 1, tzinfo=zone).utcoffset(), timedelta(hours=2))
+        self.assertIsNone(get_zone('Not/AZone'))
+
+
+if __name__ == '__main__':
+    unittest.main()